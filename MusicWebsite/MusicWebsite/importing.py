@@ -0,0 +1,673 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from argparse import ArgumentParser
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from django.core.management.base import CommandError
+from django.db import DatabaseError, transaction
+
+# Name of the manifest file kept in the data root of an import
+MANIFEST_NAME: str = '.import_manifest.json'
+
+# Name of the quarantine list written to the data root of an import
+QUARANTINE_NAME: str = '.quarantine.json'
+
+# Common image extensions searched in every ID folder
+IMAGE_EXTENSIONS: List[str] = ['.jpg', '.png', '.jpeg', '.gif', '.webp']
+
+# Problems that keep a record out of the database
+INVALID_JSON: str = 'invalid json'
+MISSING_LYRICS: str = 'missing lyrics'
+QUARANTINE_PROBLEMS = (INVALID_JSON, MISSING_LYRICS)
+
+# Problems that are reported but still imported
+ID_MISMATCH: str = 'id mismatch'
+MISSING_IMAGE: str = 'missing image'
+
+# Progress callback of the import functions: log(message, level),
+# level being '', 'success', 'warning' or 'error'
+Log = Callable[..., None]
+
+# Records written per transaction by default
+CHUNK_SIZE: int = 500
+
+# Seconds between two progress lines in quiet mode
+PROGRESS_INTERVAL: float = 5.0
+
+
+class ImportManifest:
+    """
+    Remembers the data.json files imported by the previous run.
+
+    Each file is recorded with its modification time, size and SHA-256
+    hash. A file whose mtime and size are unchanged is not read at all;
+    one that was only touched is recognised by its hash. Only files
+    passed to `keep()` are written back by `save()`, so files that
+    failed to import are retried and deleted files are forgotten.
+
+    Attributes:
+        data_root (str): Folder holding the imported ID folders.
+        path (str): Location of the manifest file.
+    """
+
+    def __init__(self, data_root: str, full: bool = False) -> None:
+        """
+        Loads the manifest of `data_root`.
+
+        Args:
+            data_root (str): Folder holding the imported ID folders.
+            full (bool): Ignore the previous run and treat every file as
+                         changed; a fresh manifest is still saved.
+        """
+        self.data_root = data_root
+        self.path = os.path.join(data_root, MANIFEST_NAME)
+        self._previous: Dict[str, Dict[str, object]] = {}
+        self._checked: Dict[str, Dict[str, object]] = {}
+        self._kept: Dict[str, Dict[str, object]] = {}
+        if not full and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._previous = json.load(f)
+            except (OSError, ValueError):
+                self._previous = {}
+
+    def _key(self, path: str) -> str:
+        """Returns the manifest key of a file, relative to the data root."""
+        return os.path.relpath(path, self.data_root).replace('\\', '/')
+
+    def changed(self, path: str) -> bool:
+        """
+        Checks whether a file differs from the previous run.
+
+        Args:
+            path (str): Location of the data.json file.
+
+        Returns:
+            bool: True if the file is new or its content changed.
+        """
+        key = self._key(path)
+        stat = os.stat(path)
+        previous = self._previous.get(key)
+        if previous is not None \
+                and previous['mtime'] == stat.st_mtime_ns \
+                and previous['size'] == stat.st_size:
+            self._checked[key] = previous
+            return False
+
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self._checked[key] = {
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+        }
+        return previous is None or previous['sha256'] != digest
+
+    def keep(self, path: str) -> None:
+        """
+        Records a checked file as imported.
+
+        Args:
+            path (str): Location of the data.json file,
+                        passed to `changed()` before.
+        """
+        key = self._key(path)
+        self._kept[key] = self._checked[key]
+
+    def save(self) -> None:
+        """Writes the kept files as the manifest of the next run."""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._kept, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+def discover_files(data_root: str, log: Log) -> List[Tuple[str, int]]:
+    """
+    Finds the data.json file of every ID folder under `data_root`.
+
+    Args:
+        data_root (str): Folder holding the ID folders.
+        log (Log): Receives a warning for folders not named by an ID.
+
+    Returns:
+        List[Tuple[str, int]]: (json_file_path, kuwo_id) pairs.
+    """
+    files: List[Tuple[str, int]] = []
+
+    # os.walk traverses the directory tree (root, subdirectories, files)
+    for root, _, names in os.walk(data_root):
+        # Check if 'data.json' exists in the current directory
+        if 'data.json' not in names:
+            continue
+        json_file_path = os.path.join(root, 'data.json')
+        try:
+            # Extract the ID from the folder name
+            kuwo_id = int(os.path.basename(root))
+        except ValueError:
+            log(
+                'Skipping file with non-numeric parent folder name '
+                f'(expected ID): {json_file_path}.',
+                'warning'
+            )
+            continue
+        files.append((json_file_path, kuwo_id))
+    return files
+
+
+def select_changed(
+    files: Iterable[Tuple[str, int]],
+    manifest: ImportManifest,
+    existing_ids: Set[int]
+) -> Tuple[List[Tuple[str, int]], int]:
+    """
+    Drops the files unchanged since the previous import.
+
+    A file is kept when it is new or changed, or when its record is
+    missing from the database.
+
+    Args:
+        files (Iterable[Tuple[str, int]]): (json_file_path, kuwo_id) pairs.
+        manifest (ImportManifest): Manifest of the data root.
+        existing_ids (Set[int]): kuwo_ids already in the database.
+
+    Returns:
+        Tuple[List[Tuple[str, int]], int]: The files to import and the
+            number of unchanged files skipped.
+    """
+    changed: List[Tuple[str, int]] = []
+    unchanged_count: int = 0
+    for json_file_path, kuwo_id in files:
+        if not manifest.changed(json_file_path) and kuwo_id in existing_ids:
+            manifest.keep(json_file_path)
+            unchanged_count += 1
+        else:
+            changed.append((json_file_path, kuwo_id))
+    return changed, unchanged_count
+
+
+def find_image(folder: str) -> Optional[str]:
+    """
+    Returns the file name of the picture in an ID folder.
+
+    Args:
+        folder (str): The ID folder.
+
+    Returns:
+        Optional[str]: 'pic.<ext>' for the first common format found,
+                       None if there is none.
+    """
+    for ext in IMAGE_EXTENSIONS:
+        if os.path.exists(os.path.join(folder, f'pic{ext}')):
+            return f'pic{ext}'
+    return None
+
+
+@dataclass
+class RecordCheck:
+    """
+    Outcome of validating one data.json file.
+
+    Attributes:
+        path (str): Location of the data.json file.
+        kuwo_id (int): ID taken from the folder name.
+        data (Optional[Dict[str, Any]]): Parsed record with its id set
+                                         to the folder ID, None if the
+                                         file could not be parsed.
+        image (Optional[str]): Picture path relative to MEDIA_ROOT,
+                               None if no local picture was found.
+        problems (List[str]): Problems found, see the constants above.
+    """
+    path: str
+    kuwo_id: int
+    data: Optional[Dict[str, Any]] = None
+    image: Optional[str] = None
+    problems: List[str] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        """Whether the record can be imported."""
+        return not any(
+            problem in QUARANTINE_PROBLEMS for problem in self.problems
+        )
+
+
+def read_record(json_file_path: str, kuwo_id: int) -> RecordCheck:
+    """
+    Parses one data.json file and looks for its picture.
+
+    Nothing is written or deleted, so files can be read
+    concurrently and outside of any transaction.
+
+    Args:
+        json_file_path (str): Location of the data.json file.
+        kuwo_id (int): ID taken from the folder name.
+
+    Returns:
+        RecordCheck: The parsed record and its problems.
+    """
+    check = RecordCheck(path=json_file_path, kuwo_id=kuwo_id)
+    try:
+        with open(json_file_path, 'r', encoding='utf-8') as f:
+            check.data = json.load(f)
+        if not isinstance(check.data, dict):
+            raise ValueError('not a JSON object')
+    except ValueError:
+        check.data = None
+        check.problems.append(INVALID_JSON)
+        return check
+
+    # The folder ID is used for consistency
+    if check.data.get('id') != kuwo_id:
+        check.problems.append(ID_MISMATCH)
+        check.data['id'] = kuwo_id
+
+    folder = os.path.dirname(json_file_path)
+    picture = find_image(folder)
+    if picture is None:
+        check.problems.append(MISSING_IMAGE)
+    else:
+        # Relative to MEDIA_ROOT, with forward slashes for the ImageField
+        data_root = os.path.abspath(os.path.dirname(folder))
+        check.image = '/'.join(
+            [os.path.basename(data_root), str(kuwo_id), picture]
+        )
+    return check
+
+
+def validate_files(
+    files: Iterable[Tuple[str, int]],
+    validate: Callable[[str, int], RecordCheck],
+    workers: int = 8,
+    progress: Optional[Callable[[int], None]] = None
+) -> List[RecordCheck]:
+    """
+    Validates files in parallel, keeping their order.
+
+    Args:
+        files (Iterable[Tuple[str, int]]): (json_file_path, kuwo_id) pairs.
+        validate (Callable[[str, int], RecordCheck]): Validates one file.
+        workers (int): Number of validation threads.
+        progress (Optional[Callable[[int], None]]): Called with the
+            number of files validated so far.
+
+    Returns:
+        List[RecordCheck]: One check per file, in the order given.
+    """
+    files = list(files)
+    checks: List[RecordCheck] = []
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        for check in executor.map(lambda item: validate(*item), files):
+            checks.append(check)
+            if progress is not None:
+                progress(len(checks))
+    return checks
+
+
+def log_checks(checks: List[RecordCheck], noun: str, log: Log) -> None:
+    """
+    Reports every validated file and its problems.
+
+    Args:
+        checks (List[RecordCheck]): Validated files.
+        noun (str): 'song' or 'singer'.
+        log (Log): Progress callback.
+    """
+    for i, check in enumerate(checks):
+        log(f'Processing file ({i+1}/{len(checks)}): {check.path}')
+        if not check.valid:
+            log(
+                f' - Quarantined {noun} ID {check.kuwo_id}: '
+                f'{", ".join(check.problems)}.',
+                'warning'
+            )
+            continue
+        if ID_MISMATCH in check.problems:
+            log(
+                f' - ID mismatch for {check.path}: '
+                'using folder ID for consistency.',
+                'warning'
+            )
+        if MISSING_IMAGE in check.problems:
+            log(
+                f' - {noun.capitalize()} '
+                f'{check.data.get("name", "Unknown")} image file not '
+                'found locally in any common format!',
+                'warning'
+            )
+
+
+def write_quarantine(data_root: str, checks: List[RecordCheck]) -> str:
+    """
+    Writes the records kept out of the database to the quarantine list.
+
+    The files themselves are left in place, to be fixed, re-crawled
+    or deleted later.
+
+    Args:
+        data_root (str): Folder holding the ID folders.
+        checks (List[RecordCheck]): The invalid checks.
+
+    Returns:
+        str: Location of the quarantine list.
+    """
+    path = os.path.join(data_root, QUARANTINE_NAME)
+    entries = [
+        {
+            'kuwo_id': check.kuwo_id,
+            'path': check.path,
+            'problems': check.problems,
+        }
+        for check in checks
+    ]
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=1, ensure_ascii=False)
+    os.replace(temp_path, path)
+    return path
+
+
+def log_summary(noun: str, result: Dict[str, Any], log: Log) -> None:
+    """
+    Reports the counts returned by an import function.
+
+    Args:
+        noun (str): 'song' or 'singer'.
+        result (Dict[str, Any]): Counts of the import.
+        log (Log): Progress callback.
+    """
+    log(f'Total {noun} files processed: {result["total"]}', 'success')
+    log(
+        f'Successfully imported/updated {noun}s: '
+        f'{result["imported"]} ({result["created"]} new)',
+        'success'
+    )
+    log(f'Unchanged files skipped: {result["unchanged"]}', 'success')
+    log(f'Images successfully associated: {result["images"]}', 'success')
+    log(
+        f'{noun.capitalize()}s with missing local images: '
+        f'{result["missing_images"]}',
+        'warning'
+    )
+    if result['quarantined']:
+        log(
+            f'Quarantined {noun}s: {result["quarantined"]}, '
+            f'listed in {result["quarantine_path"]}',
+            'warning'
+        )
+    if result['failed']:
+        log(
+            f'{noun.capitalize()}s that failed to be written: '
+            f'{result["failed"]}, retried by the next import',
+            'error'
+        )
+
+
+def command_log(command: Any) -> Log:
+    """
+    Returns a progress callback writing to a management command's stdout.
+
+    Args:
+        command (BaseCommand): The running command.
+
+    Returns:
+        Log: Writes messages, styled by level.
+    """
+    styles = {
+        'success': command.style.SUCCESS,
+        'warning': command.style.WARNING,
+        'error': command.style.ERROR,
+    }
+
+    def log(message: str, level: str = '') -> None:
+        command.stdout.write(styles[level](message) if level else message)
+
+    return log
+
+
+def add_import_arguments(parser: ArgumentParser) -> None:
+    """
+    Adds the options shared by the import commands.
+
+    Args:
+        parser (ArgumentParser): The parser to
+        which arguments will be added.
+    """
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help=(
+            'Re-import every data.json file, not only the ones that '
+            'changed since the previous import.'
+        )
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Number of threads validating data.json files.'
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=CHUNK_SIZE,
+        help='Records written per transaction.'
+    )
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help=(
+            'Print a progress line every few seconds instead of '
+            'one line per file.'
+        )
+    )
+    parser.add_argument(
+        '--progress-interval',
+        type=float,
+        default=PROGRESS_INTERVAL,
+        help='Seconds between two progress lines in quiet mode.'
+    )
+
+
+class Progress:
+    """
+    Periodic progress line of one import phase.
+
+    Attributes:
+        label (str): Name of the phase, e.g. 'Validated songs'.
+        total (int): Number of items of the phase.
+    """
+
+    def __init__(
+        self,
+        log: Log,
+        label: str,
+        total: int,
+        interval: float = PROGRESS_INTERVAL
+    ) -> None:
+        self.label = label
+        self.total = total
+        self._log = log
+        self._interval = interval
+        self._start = time.monotonic()
+        self._last = self._start
+
+    def update(self, done: int) -> None:
+        """
+        Logs the progress if `interval` seconds passed since the last
+        line, or when the phase is complete.
+
+        Args:
+            done (int): Number of items done so far.
+        """
+        now = time.monotonic()
+        if done < self.total and now - self._last < self._interval:
+            return
+        self._last = now
+        elapsed = max(now - self._start, 1e-9)
+        percent = done / self.total * 100 if self.total else 100.0
+        self._log(
+            f'{self.label}: {done}/{self.total} ({percent:.0f}%), '
+            f'{done / elapsed:.0f}/s'
+        )
+
+
+def write_chunk(
+    chunk: List[RecordCheck],
+    write: Callable[[List[RecordCheck]], None],
+    noun: str,
+    log: Log
+) -> List[RecordCheck]:
+    """
+    Writes one chunk of records in its own transaction.
+
+    If the chunk fails, its records are retried one by one so a single
+    bad record only loses itself.
+
+    Args:
+        chunk (List[RecordCheck]): Valid records to write.
+        write (Callable[[List[RecordCheck]], None]): Upserts records.
+        noun (str): 'song' or 'singer'.
+        log (Log): Progress callback.
+
+    Returns:
+        List[RecordCheck]: The records written.
+    """
+    try:
+        with transaction.atomic():
+            write(chunk)
+        return chunk
+    except DatabaseError:
+        pass
+
+    written: List[RecordCheck] = []
+    for check in chunk:
+        try:
+            with transaction.atomic():
+                write([check])
+            written.append(check)
+        except DatabaseError as e:
+            log(f' - Failed to write {noun} {check.path}: {e}', 'error')
+    return written
+
+
+def run_import(
+    data_root: str,
+    noun: str,
+    log: Log,
+    existing_ids: Set[int],
+    validate: Callable[[str, int], RecordCheck],
+    write: Callable[[List[RecordCheck]], None],
+    full: bool = False,
+    workers: int = 8,
+    chunk_size: int = CHUNK_SIZE,
+    quiet: bool = False,
+    progress_interval: float = PROGRESS_INTERVAL
+) -> Dict[str, Any]:
+    """
+    Imports the data.json files of a data root.
+
+    New or changed files are validated in parallel; invalid records are
+    written to a quarantine list instead of being imported or deleted.
+    Valid records are written in chunks, each in its own transaction,
+    so the database is only locked briefly and a failure keeps the
+    chunks already committed. The manifest is saved after every chunk
+    and acts as the resume marker: an interrupted import continues
+    where it stopped when run again.
+
+    Args:
+        data_root (str): Folder holding the ID folders.
+        noun (str): 'song' or 'singer'.
+        log (Log): Progress callback.
+        existing_ids (Set[int]): kuwo_ids already in the database.
+        validate (Callable[[str, int], RecordCheck]): Validates one file.
+        write (Callable[[List[RecordCheck]], None]): Upserts valid records,
+            called inside a transaction.
+        full (bool): Re-import files unchanged since the previous import.
+        workers (int): Number of validation threads.
+        chunk_size (int): Records written per transaction.
+        quiet (bool): Replace per-file lines with periodic progress.
+        progress_interval (float): Seconds between two progress lines.
+
+    Returns:
+        Dict[str, Any]: Counts of the import, see log_summary, and
+            'ids', the kuwo_ids written.
+    """
+    if not os.path.isdir(data_root):
+        raise CommandError(
+            f'Error: {noun.capitalize()} data root directory does not '
+            f'exist or is not a directory: {data_root}'
+        )
+    if chunk_size < 1:
+        raise CommandError('Error: the chunk size must be at least 1')
+
+    log(f'Searching for data.json files in {data_root}...', 'success')
+    files = discover_files(data_root, log)
+    if not files:
+        raise CommandError(
+            f'Error: No data.json files found in {data_root} '
+            f'or its subdirectories.'
+        )
+    log(f'Found {len(files)} data.json files. Starting import...', 'success')
+
+    # Files unchanged since the previous import are skipped,
+    # unless their record is missing from the database
+    manifest = ImportManifest(data_root, full=full)
+    changed, unchanged_count = select_changed(files, manifest, existing_ids)
+    if unchanged_count:
+        log(f'Skipping {unchanged_count} unchanged files.')
+
+    # --- Validation Pass ---
+    # Files are only read here, so threads can overlap the I/O
+    # and nothing touches the database or deletes files
+    validated = Progress(
+        log, f'Validated {noun}s', len(changed), progress_interval
+    )
+    checks = validate_files(
+        changed, validate, workers, validated.update if quiet else None
+    )
+    if not quiet:
+        log_checks(checks, noun, log)
+    valid_checks = [check for check in checks if check.valid]
+
+    # --- Data Import using Chunked Transactions ---
+    written: List[RecordCheck] = []
+    imported = Progress(
+        log, f'Imported {noun}s', len(valid_checks), progress_interval
+    )
+    for start in range(0, len(valid_checks), chunk_size):
+        chunk = valid_checks[start:start + chunk_size]
+        written_chunk = write_chunk(chunk, write, noun, log)
+        written.extend(written_chunk)
+
+        # Remember the files of every committed chunk
+        for check in written_chunk:
+            manifest.keep(check.path)
+        manifest.save()
+
+        if quiet:
+            imported.update(start + len(chunk))
+        else:
+            log(
+                f'Committed {noun}s {start + 1}-{start + len(chunk)} '
+                f'of {len(valid_checks)}.'
+            )
+    manifest.save()
+
+    quarantined = [check for check in checks if not check.valid]
+    images = sum(check.image is not None for check in written)
+    return {
+        'total': len(files),
+        'imported': len(written),
+        'created': sum(check.kuwo_id not in existing_ids for check in written),
+        'unchanged': unchanged_count,
+        'images': images,
+        'missing_images': len(written) - images,
+        'quarantined': len(quarantined),
+        'quarantine_path': write_quarantine(data_root, quarantined),
+        'failed': len(valid_checks) - len(written),
+        'ids': [check.kuwo_id for check in written],
+    }
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,7 +41,8 @@ INSTALLED_APPS = [
     'singer',
     'song',
     'account',
-    'search'
+    'search',
+    'stats'
 ]
 
 MIDDLEWARE = [
@@ -76,12 +78,50 @@ WSGI_APPLICATION = 'MusicWebsite.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database profile, chosen with the MUSICWEBSITE_DB environment variable:
+# 'sqlite' (default) or 'postgres'
+DB_PROFILE = os.environ.get('MUSICWEBSITE_DB', 'sqlite')
+
+if DB_PROFILE == 'postgres':
+    # Connections are kept open between requests and checked before reuse;
+    # the search indexes need the pg_trgm extension, see the search app
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'musicwebsite'),
+            'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '600')),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+    INSTALLED_APPS.append('django.contrib.postgres')
+elif DB_PROFILE == 'sqlite':
+    # WAL lets the site keep reading while an import writes; every new
+    # connection sets the pragmas below. Writers take the write lock when
+    # their transaction begins, so they wait for each other through the
+    # busy timeout instead of failing halfway
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA mmap_size=268435456;'
+                    'PRAGMA busy_timeout=5000;'
+                ),
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
     }
-}
+else:
+    raise ValueError(
+        f"MUSICWEBSITE_DB must be 'sqlite' or 'postgres', not {DB_PROFILE!r}"
+    )
 
 
 # Password validation
@@ -117,8 +157,6 @@ TIME_ZONE = 'Asia/Shanghai'
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
-import os
-
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 STATICFILES_DIRS = [
@@ -30,6 +30,7 @@ urlpatterns = [
     path('account/', include('account.urls')), 
     path('search/', account_views.search_redirect_view, name='search_redirect'), 
     path("search/", include('search.urls', namespace='search')),
+    path('stats/', include('stats.urls')),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# Trigram indexes for the icontains lookups of search_result_view.
+# Django compares UPPER(column::text) on PostgreSQL, so the indexes are
+# built on that expression for the planner to use them.
+# (index name, table, column)
+TRIGRAM_INDEXES = [
+    ('search_song_name_trgm', 'song_song', 'name'),
+    ('search_song_lyrics_trgm', 'song_song', 'lyrics'),
+    ('search_singer_name_trgm', 'singer_singer', 'name'),
+    ('search_singer_info_trgm', 'singer_singer', 'info'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Creates pg_trgm and the search indexes; other databases are skipped."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" '
+            f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    """Drops the search indexes, keeping the extension."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('singer', '0002_alter_singer_image'),
+        ('song', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -1,3 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+from django.conf import settings
+from django.db import connection, connections
 from django.test import TestCase
 
-# Create your tests here.
+
+class DatabaseProfileTests(TestCase):
+    """
+    Tests for the database settings selected by MUSICWEBSITE_DB.
+    """
+
+    def open_connection(self, path):
+        # The test database lives in memory, where WAL is unavailable,
+        # so the profile is checked on a database file of its own
+        wrapper = type(connections['default'])(
+            {**connection.settings_dict, 'NAME': path}, alias = 'profile'
+        )
+        self.addCleanup(wrapper.close)
+        return wrapper.cursor()
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite profile')
+    def test_sqlite_connections_are_tuned(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        cursor = self.open_connection(os.path.join(directory, 'db.sqlite3'))
+
+        pragmas = {
+            pragma: cursor.execute(f'PRAGMA {pragma}').fetchone()[0]
+            for pragma in (
+                'journal_mode', 'synchronous', 'mmap_size', 'busy_timeout'
+            )
+        }
+        self.assertEqual(pragmas, {
+            'journal_mode': 'wal',
+            'synchronous': 1,
+            'mmap_size': 268435456,
+            'busy_timeout': 5000,
+        })
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite profile')
+    def test_sqlite_readers_do_not_block_imports(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'db.sqlite3')
+        writer = self.open_connection(path)
+        writer.execute('CREATE TABLE song (name TEXT)')
+        writer.execute("INSERT INTO song VALUES ('一')")
+
+        # A page being rendered holds a read snapshot while songs import
+        reader = self.open_connection(path)
+        reader.execute('BEGIN')
+        self.assertEqual(
+            reader.execute('SELECT COUNT(*) FROM song').fetchone()[0], 1
+        )
+        writer.execute('BEGIN IMMEDIATE')
+        writer.execute("INSERT INTO song VALUES ('二')")
+        writer.execute('COMMIT')
+
+        self.assertEqual(
+            reader.execute('SELECT COUNT(*) FROM song').fetchone()[0], 1
+        )
+        reader.execute('COMMIT')
+        self.assertEqual(
+            reader.execute('SELECT COUNT(*) FROM song').fetchone()[0], 2
+        )
+
+    @unittest.skipUnless(
+        connection.vendor == 'postgresql', 'PostgreSQL profile'
+    )
+    def test_postgres_connections_persist_and_search_is_indexed(self):
+        self.assertGreater(settings.DATABASES['default']['CONN_MAX_AGE'], 0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE indexname LIKE 'search\\_%%\\_trgm'"
+            )
+            indexes = {row[0] for row in cursor.fetchall()}
+        self.assertEqual(indexes, {
+            'search_song_name_trgm', 'search_song_lyrics_trgm',
+            'search_singer_name_trgm', 'search_singer_info_trgm',
+        })
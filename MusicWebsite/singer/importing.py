@@ -0,0 +1,166 @@
+from typing import Any, Dict, Iterable, List, Optional, Set
+from MusicWebsite.importing import (
+    CHUNK_SIZE, PROGRESS_INTERVAL, Log, RecordCheck, read_record, run_import
+)
+from .models import Singer
+
+# Singer fields written by an upsert; the image is only written
+# when a local picture was found
+SINGER_UPDATE_FIELDS: List[str] = [
+    'name', 'info', 'original_url', 'alias', 'fan_num', 'album_num',
+    'mv_num', 'music_num', 'birthday', 'birthplace', 'region', 'gender',
+    'weight', 'height', 'language', 'constellation', 'original_image_url',
+]
+
+def singer_fields(singer_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Maps a crawled singer record to Singer model fields.
+
+    Args:
+        singer_data (Dict[str, Any]): The record, as saved by the crawler.
+
+    Returns:
+        Dict[str, Any]: Field values, keyed by model field name.
+    """
+    kuwo_id: int = singer_data['id']
+    return {
+        'name': singer_data.get('name', 'Unknown Singer'),
+        'info': singer_data.get('info', ''),
+        # original_url is unique, so an empty one falls back to the id
+        'original_url': singer_data.get('original_url')
+        or f'https://star.kuwo.cn/star_index/{kuwo_id}.htm',
+        'alias': singer_data.get('aartist', ''),
+        'fan_num': singer_data.get('artistFans', 0),
+        'album_num': singer_data.get('albumNum', 0),
+        'mv_num': singer_data.get('mvNum', 0),
+        'music_num': singer_data.get('musicNum', 0),
+        'birthday': singer_data.get('birthday', ''),
+        'birthplace': singer_data.get('birthplace', ''),
+        'region': singer_data.get('region', ''),
+        'gender': singer_data.get('gender', ''),
+        'weight': singer_data.get('weight', ''),
+        'height': singer_data.get('height', ''),
+        'language': singer_data.get('language', ''),
+        'constellation': singer_data.get('constellation', ''),
+        'original_image_url': singer_data.get('pic', ''),
+    }
+
+def bulk_upsert_singers(
+    records: List[Dict[str, Any]],
+    images: Optional[Dict[int, str]] = None,
+    batch_size: int = 500
+) -> None:
+    """
+    Inserts or updates singers with one statement per batch.
+
+    Args:
+        records (List[Dict[str, Any]]): Crawled singer records,
+                                        one per kuwo_id.
+        images (Optional[Dict[int, str]]): Picture path per kuwo_id;
+                                           other singers keep their image.
+        batch_size (int): Rows per statement.
+    """
+    images = images or {}
+    with_image: List[Singer] = []
+    without_image: List[Singer] = []
+    for singer_data in records:
+        singer = Singer(kuwo_id=singer_data['id'], **singer_fields(singer_data))
+        if singer.kuwo_id in images:
+            singer.image = images[singer.kuwo_id]
+            with_image.append(singer)
+        else:
+            without_image.append(singer)
+
+    for singers, update_fields in (
+        (with_image, SINGER_UPDATE_FIELDS + ['image']),
+        (without_image, SINGER_UPDATE_FIELDS),
+    ):
+        if singers:
+            Singer.objects.bulk_create(
+                singers,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['kuwo_id'],
+                update_fields=update_fields,
+            )
+
+class SingerCache:
+    """
+    kuwo_ids of the singers in the database, fetched with one query.
+
+    Songs are linked with `singer_id` assignment, so the ids are all
+    an import needs. Singer imports add the ids they write, so a song
+    import running after them in the same process (import_all,
+    import_stream) never queries the singers again.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Optional[Set[int]] = None
+
+    def ids(self) -> Set[int]:
+        """Returns the known singer ids, loading them on first use."""
+        if self._ids is None:
+            self._ids = set(Singer.objects.values_list('kuwo_id', flat=True))
+        return self._ids
+
+    def add(self, kuwo_ids: Iterable[int]) -> None:
+        """Records singers written since the ids were loaded."""
+        self.ids().update(kuwo_ids)
+
+def import_singer_files(
+    singer_data_root: str,
+    log: Log,
+    full: bool = False,
+    workers: int = 8,
+    cache: Optional[SingerCache] = None,
+    chunk_size: int = CHUNK_SIZE,
+    quiet: bool = False,
+    progress_interval: float = PROGRESS_INTERVAL
+) -> Dict[str, Any]:
+    """
+    Imports the data.json files of a singer data root.
+
+    New or changed files are validated in parallel, then the valid
+    singers are upserted with their local pictures in chunked
+    transactions, see run_import.
+
+    Args:
+        singer_data_root (str): Folder holding the singer ID folders.
+        log (Log): Progress callback.
+        full (bool): Re-import files unchanged since the previous import.
+        workers (int): Number of validation threads.
+        cache (Optional[SingerCache]): Known singer ids, shared with
+                                       a following song import.
+        chunk_size (int): Singers written per transaction.
+        quiet (bool): Replace per-file lines with periodic progress.
+        progress_interval (float): Seconds between two progress lines.
+
+    Returns:
+        Dict[str, Any]: Counts of the import, see log_summary.
+    """
+    cache = cache or SingerCache()
+
+    def write(checks: List[RecordCheck]) -> None:
+        bulk_upsert_singers(
+            [check.data for check in checks],
+            {
+                check.kuwo_id: check.image
+                for check in checks if check.image is not None
+            }
+        )
+
+    result = run_import(
+        singer_data_root,
+        'singer',
+        log,
+        set(cache.ids()),
+        read_record,
+        write,
+        full=full,
+        workers=workers,
+        chunk_size=chunk_size,
+        quiet=quiet,
+        progress_interval=progress_interval,
+    )
+    cache.add(result['ids'])
+    return result
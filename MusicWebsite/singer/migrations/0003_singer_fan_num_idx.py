@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('singer', '0002_alter_singer_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='singer',
+            index=models.Index(fields=['-fan_num'], name='singer_fan_num_idx'),
+        ),
+    ]
@@ -107,6 +107,15 @@ class Singer(models.Model):
         verbose_name="constellation"
     )
     
+    class Meta:
+        indexes = [
+            # singer_list orders by popularity
+            models.Index(
+                fields = ['-fan_num'],
+                name = 'singer_fan_num_idx'
+            ),
+        ]
+
     def __str__(self) -> str:
         """
     Returns the string representation of the Singer object.
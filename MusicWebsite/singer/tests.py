@@ -1,3 +1,26 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from song.benchmark import generate_catalog
 
-# Create your tests here.
+
+class SingerListColumnTests(TestCase):
+    """
+    Tests for the columns loaded by singer_list.
+    """
+
+    def test_biographies_are_not_selected(self):
+        generate_catalog(120)
+        session = self.client.session
+        session['username'] = 'tester'
+        session.save()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('singer:singer_list'))
+        self.assertEqual(response.status_code, 200)
+
+        for query in queries.captured_queries:
+            self.assertNotIn('"singer_singer"."info"', query['sql'])
+        singer = response.context['singers'][0]
+        self.assertIn('info', singer.get_deferred_fields())
+        self.assertContains(response, singer.name)
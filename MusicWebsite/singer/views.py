@@ -4,8 +4,12 @@ from .models import Singer
 
 list_num: int = 12
 
+# Columns rendered by singer_list.html
+SINGER_LIST_FIELDS: list[str] = ['kuwo_id', 'name', 'image']
+
 def singer_list(request):
-    all_singers = Singer.objects.all().order_by('-fan_num')
+    # Biographies and profile details are only loaded by the detail view
+    all_singers = Singer.objects.only(*SINGER_LIST_FIELDS).order_by('-fan_num')
 
     paginator = Paginator(all_singers, list_num)
     page_number = request.GET.get('page')
@@ -0,0 +1,197 @@
+import random
+import time
+from typing import Any, Callable, Dict, List
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .models import Song
+from singer.models import Singer
+
+# Synthetic catalog sizes selectable by name
+SCALES: Dict[str, int] = {
+    '1k': 1000,
+    '10k': 10000,
+    '100k': 100000,
+}
+
+# Characters used to build synthetic Chinese names, lyrics and comments
+CHARSET: str = (
+    '爱想心走世界天你我他她们的是在有不这一个人时间风雨夜梦'
+    '光城市海花雪春秋月星路回家远方青春离开等待故事温柔孤独'
+)
+
+# Query used by the search benchmarks, common enough to hit every category
+SEARCH_QUERY: str = '爱'
+
+def _text(rng: random.Random, length: int) -> str:
+    """Returns `length` random characters from CHARSET."""
+    return ''.join(rng.choices(CHARSET, k = length))
+
+def generate_catalog(
+    song_count: int,
+    singer_count: int = 0,
+    seed: int = 0,
+    batch_size: int = 1000
+) -> None:
+    """
+    Fills the database with a synthetic catalog.
+
+    Sizes follow the crawled data: lyrics of 20-60 lines with 6-14
+    characters each, 0-20 comments of 10-80 characters per song and
+    singer biographies of a few hundred characters.
+
+    Args:
+        song_count (int): Number of songs to create.
+        singer_count (int): Number of singers, defaults to one singer
+                            per 12 songs.
+        seed (int): Seed of the random generator, for reproducible runs.
+        batch_size (int): Rows per INSERT statement.
+    """
+    rng = random.Random(seed)
+    singer_count = singer_count or max(1, song_count // 12)
+
+    singers = [
+        Singer(
+            kuwo_id = i + 1,
+            name = f'{_text(rng, 3)}{i}',
+            image = f'Singer/{i + 1}/pic.jpg',
+            info = _text(rng, rng.randint(100, 800)),
+            original_url = f'https://www.kuwo.cn/singer_detail/{i + 1}',
+            fan_num = rng.randint(0, 10_000_000),
+        )
+        for i in range(singer_count)
+    ]
+    Singer.objects.bulk_create(singers, batch_size = batch_size)
+
+    for start in range(0, song_count, batch_size):
+        songs = []
+        for i in range(start, min(start + batch_size, song_count)):
+            lyrics = '\n'.join(
+                _text(rng, rng.randint(6, 14))
+                for _ in range(rng.randint(20, 60))
+            )
+            comments = [
+                {
+                    'content': _text(rng, rng.randint(10, 80)),
+                    'username': _text(rng, 4),
+                    'time': f'2020-01-{rng.randint(1, 28):02d} 12:00:00',
+                }
+                for _ in range(rng.randint(0, 20))
+            ]
+            songs.append(Song(
+                kuwo_id = i + 1,
+                name = _text(rng, rng.randint(2, 8)),
+                image = f'Song/{i + 1}/pic.jpg',
+                original_url = f'https://www.kuwo.cn/play_detail/{i + 1}',
+                release_date = f'{rng.randint(1980, 2024)}-01-01',
+                duration = rng.randint(120, 360),
+                album_name = _text(rng, 4),
+                lyrics = lyrics,
+                comments = comments,
+                singer_id = rng.randint(1, singer_count),
+            ))
+        Song.objects.bulk_create(songs, batch_size = batch_size)
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of a non-empty list.
+
+    Args:
+        values (List[float]): Samples.
+        fraction (float): Percentile as a fraction, e.g. 0.9.
+
+    Returns:
+        float: The sample at that rank.
+    """
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+def measure(client: Client, url: str, repeat: int) -> Dict[str, Any]:
+    """
+    Requests a URL several times and summarizes latency and queries.
+
+    Args:
+        client (Client): Logged-in test client.
+        url (str): URL to request.
+        repeat (int): Number of timed requests (after one warm-up).
+
+    Returns:
+        Dict[str, Any]: Latency percentiles in milliseconds,
+                        number of queries per request and status code.
+    """
+    # Warm up template and URL caches
+    client.get(url)
+
+    latencies: List[float] = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'url': url,
+        'status': response.status_code,
+        'queries': len(queries.captured_queries),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p90_ms': round(percentile(latencies, 0.90), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'max_ms': round(max(latencies), 3),
+    }
+
+def benchmark_urls() -> Dict[str, str]:
+    """
+    URLs of the benchmarked views against the current catalog.
+
+    Returns:
+        Dict[str, str]: URL keyed by benchmark name.
+    """
+    song_id = Song.objects.order_by('kuwo_id').values_list(
+        'kuwo_id', flat = True
+    ).first()
+    search_url = reverse('search:search_results')
+    return {
+        'home_page_view': reverse('song:home_page'),
+        'singer_list': reverse('singer:singer_list'),
+        'song_detail_view': reverse(
+            'song:song_detail', kwargs = {'song_id': song_id}
+        ),
+        'search_result_view[song]':
+            f'{search_url}?q={SEARCH_QUERY}&type=song',
+        'search_result_view[singer]':
+            f'{search_url}?q={SEARCH_QUERY}&type=singer',
+    }
+
+def run_benchmarks(
+    repeat: int = 20,
+    log: Callable[[str], None] | None = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmarks every view against the catalog currently in the database.
+
+    Args:
+        repeat (int): Timed requests per view.
+        log (Callable[[str], None] | None): Receives a progress line
+                                            per view.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Measurements keyed by benchmark name.
+    """
+    client = Client()
+    session = client.session
+    session['username'] = 'benchmark'
+    session.save()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, url in benchmark_urls().items():
+        results[name] = measure(client, url, repeat)
+        if log:
+            log(
+                f'  {name}: p50 {results[name]["p50_ms"]} ms, '
+                f'p99 {results[name]["p99_ms"]} ms, '
+                f'{results[name]["queries"]} queries'
+            )
+    return results
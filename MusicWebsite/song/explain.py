@@ -0,0 +1,105 @@
+import re
+from typing import Dict, List
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from .benchmark import benchmark_urls
+
+# Plan lines reading a whole table, per database vendor. SQLite reports
+# 'SCAN <table>' without an index for a full scan, PostgreSQL 'Seq Scan'
+SEQUENTIAL_SCAN_PATTERNS: Dict[str, re.Pattern] = {
+    'sqlite': re.compile(
+        r'\bSCAN (?!.*\bUSING (?:COVERING )?INDEX\b)(?!CONSTANT ROW)'
+    ),
+    'postgresql': re.compile(r'\bSeq Scan on\b'),
+}
+
+# Plan lines sorting every row instead of reading an index in order
+SORT_PATTERNS: Dict[str, re.Pattern] = {
+    'sqlite': re.compile(r'\bUSE TEMP B-TREE FOR (?:ORDER|GROUP) BY\b'),
+    'postgresql': re.compile(r'^\s*(?:->\s*)?Sort\b'),
+}
+
+def capture_view_queries(
+    urls: Dict[str, str] | None = None
+) -> Dict[str, List[str]]:
+    """
+    Requests every view once and records the SELECT statements it runs.
+
+    The requests are made by a logged-in test client, so the test
+    environment must be set up; the session is deleted afterwards.
+
+    Args:
+        urls (Dict[str, str] | None): URL keyed by view name,
+                                      defaults to benchmark_urls().
+
+    Returns:
+        Dict[str, List[str]]: Distinct SELECT statements, with their
+                              parameters inlined, keyed by view name.
+
+    Raises:
+        ValueError: If a view does not answer with 200 OK.
+    """
+    urls = urls if urls is not None else benchmark_urls()
+    client = Client()
+    session = client.session
+    session['username'] = 'explain'
+    session.save()
+
+    queries: Dict[str, List[str]] = {}
+    try:
+        for name, url in urls.items():
+            with CaptureQueriesContext(connection) as captured:
+                response = client.get(url)
+            if response.status_code != 200:
+                raise ValueError(
+                    f'{name} answered {response.status_code} for {url}'
+                )
+            statements: List[str] = []
+            for query in captured.captured_queries:
+                sql = query['sql']
+                if sql.lstrip().upper().startswith('SELECT') \
+                        and 'django_session' not in sql \
+                        and sql not in statements:
+                    statements.append(sql)
+            queries[name] = statements
+    finally:
+        session.delete()
+    return queries
+
+def explain_query(sql: str) -> List[str]:
+    """
+    Returns the query plan of a SELECT statement, one line per step.
+
+    Args:
+        sql (str): The statement, with its parameters inlined.
+
+    Returns:
+        List[str]: Plan lines as printed by the database.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute(f'EXPLAIN {sql}')
+        return [row[0] for row in cursor.fetchall()]
+
+def find_problems(plan: List[str]) -> List[str]:
+    """
+    Picks the plan lines showing a sequential scan or a full sort.
+
+    Args:
+        plan (List[str]): Lines returned by explain_query.
+
+    Returns:
+        List[str]: The offending lines, stripped.
+    """
+    patterns = [
+        patterns[connection.vendor]
+        for patterns in (SEQUENTIAL_SCAN_PATTERNS, SORT_PATTERNS)
+        if connection.vendor in patterns
+    ]
+    return [
+        line.strip() for line in plan
+        if any(pattern.search(line) for pattern in patterns)
+    ]
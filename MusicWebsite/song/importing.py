@@ -0,0 +1,212 @@
+from typing import Any, Dict, Iterable, List, Optional, Set
+from django.db.models import F
+from MusicWebsite.importing import (
+    CHUNK_SIZE, MISSING_LYRICS, PROGRESS_INTERVAL, Log, RecordCheck,
+    read_record, run_import
+)
+from .models import Song
+from singer.importing import SingerCache
+from singer.models import Singer
+
+# Song fields written by an upsert; the image is only written
+# when a local picture was found
+SONG_UPDATE_FIELDS: List[str] = [
+    'name', 'original_url', 'release_date', 'duration', 'album_name',
+    'lyrics', 'comments', 'original_image_url', 'singer', 'singer_kuwo_id',
+]
+
+def song_fields(song_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Maps a crawled song record to Song model fields, except the singer.
+
+    Args:
+        song_data (Dict[str, Any]): The record, as saved by the crawler.
+
+    Returns:
+        Dict[str, Any]: Field values, keyed by model field name.
+    """
+    kuwo_id: int = song_data['id']
+    return {
+        'name': song_data.get('name', 'Unknown Song'),
+        # original_url is unique, so an empty one falls back to the id
+        'original_url': song_data.get('original_url')
+        or f'https://star.kuwo.cn/star_index/{kuwo_id}.htm',
+        'release_date': song_data.get('releasedate', ''),
+        'duration': song_data.get('duration', -1),
+        'album_name': song_data.get('album', ''),
+        'lyrics': str(song_data.get('lyrics') or ''),
+        'comments': song_data.get('comments') or [],
+        'original_image_url': song_data.get('pic', ''),
+    }
+
+def validate_song(
+    json_file_path: str,
+    kuwo_id: int,
+    data: Optional[Dict[str, Any]] = None
+) -> RecordCheck:
+    """
+    Parses one song's data.json file and checks its lyrics.
+
+    Args:
+        json_file_path (str): Location of the data.json file, or of the
+                              record when `data` is given.
+        kuwo_id (int): Song ID taken from the folder name.
+        data (Optional[Dict[str, Any]]): An already parsed record, e.g.
+            from the record stream; no file is read then.
+
+    Returns:
+        RecordCheck: The parsed record and its problems.
+    """
+    if data is None:
+        check = read_record(json_file_path, kuwo_id)
+    else:
+        check = RecordCheck(path=json_file_path, kuwo_id=kuwo_id, data=data)
+    if check.data is not None and not check.data.get('lyrics'):
+        check.problems.append(MISSING_LYRICS)
+    return check
+
+def bulk_upsert_songs(
+    records: List[Dict[str, Any]],
+    known_singers: Set[int],
+    images: Optional[Dict[int, str]] = None,
+    batch_size: int = 500
+) -> None:
+    """
+    Inserts or updates songs with one statement per batch.
+
+    Songs are linked to their singer by id, without fetching it;
+    songs whose singer is not in `known_singers` are stored without one
+    until link_songs finds it.
+
+    Args:
+        records (List[Dict[str, Any]]): Crawled song records,
+                                        one per kuwo_id.
+        known_singers (Set[int]): kuwo_ids of the singers in the database.
+        images (Optional[Dict[int, str]]): Picture path per kuwo_id;
+                                           other songs keep their image.
+        batch_size (int): Rows per statement.
+    """
+    images = images or {}
+    with_image: List[Song] = []
+    without_image: List[Song] = []
+    for song_data in records:
+        artist_id = song_data.get('artistid')
+        song = Song(
+            kuwo_id=song_data['id'],
+            singer_id=artist_id if artist_id in known_singers else None,
+            singer_kuwo_id=artist_id,
+            **song_fields(song_data)
+        )
+        if song.kuwo_id in images:
+            song.image = images[song.kuwo_id]
+            with_image.append(song)
+        else:
+            without_image.append(song)
+
+    for songs, update_fields in (
+        (with_image, SONG_UPDATE_FIELDS + ['image']),
+        (without_image, SONG_UPDATE_FIELDS),
+    ):
+        if songs:
+            Song.objects.bulk_create(
+                songs,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['kuwo_id'],
+                update_fields=update_fields,
+            )
+
+def link_songs(singer_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Links the stored songs whose singer was written after them.
+
+    Args:
+        singer_ids (Optional[Iterable[int]]): kuwo_ids of the singers
+            just written; every singer in the database by default.
+
+    Returns:
+        int: Number of songs linked.
+    """
+    if singer_ids is None:
+        singer_ids = Singer.objects.values('kuwo_id')
+    return Song.objects.filter(
+        singer__isnull=True, singer_kuwo_id__in=singer_ids
+    ).update(singer_id=F('singer_kuwo_id'))
+
+def import_song_files(
+    song_data_root: str,
+    log: Log,
+    full: bool = False,
+    workers: int = 8,
+    cache: Optional[SingerCache] = None,
+    chunk_size: int = CHUNK_SIZE,
+    quiet: bool = False,
+    progress_interval: float = PROGRESS_INTERVAL
+) -> Dict[str, Any]:
+    """
+    Imports the data.json files of a song data root.
+
+    New or changed files are validated in parallel; songs without
+    lyrics or with unparsable JSON are written to a quarantine list
+    instead of being imported or deleted. The valid songs are upserted
+    with their local pictures in chunked transactions, see run_import.
+    Stored songs whose singer was imported since are linked afterwards,
+    including songs whose file is unchanged.
+
+    Args:
+        song_data_root (str): Folder holding the song ID folders.
+        log (Log): Progress callback.
+        full (bool): Re-import files unchanged since the previous import.
+        workers (int): Number of validation threads.
+        cache (Optional[SingerCache]): Known singer ids, shared with
+                                       a preceding singer import.
+        chunk_size (int): Songs written per transaction.
+        quiet (bool): Replace per-file lines with periodic progress.
+        progress_interval (float): Seconds between two progress lines.
+
+    Returns:
+        Dict[str, Any]: Counts of the import, see log_summary.
+    """
+    cache = cache or SingerCache()
+
+    def write(checks: List[RecordCheck]) -> None:
+        # Songs are linked by id, checked against the singer ids
+        # loaded once for the whole run
+        known_singers = cache.ids()
+        if not quiet:
+            for check in checks:
+                artist_id: int = check.data.get('artistid', -1)
+                if artist_id not in known_singers:
+                    log(
+                        f' - Singer with kuwo_id {artist_id} '
+                        f'for song "{check.data.get("name", "Unknown")}" '
+                        'not found in database. '
+                        'Song will be imported without a linked singer.',
+                        'warning'
+                    )
+        bulk_upsert_songs(
+            [check.data for check in checks],
+            known_singers,
+            {
+                check.kuwo_id: check.image
+                for check in checks if check.image is not None
+            }
+        )
+
+    result = run_import(
+        song_data_root,
+        'song',
+        log,
+        set(Song.objects.values_list('kuwo_id', flat=True)),
+        validate_song,
+        write,
+        full=full,
+        workers=workers,
+        chunk_size=chunk_size,
+        quiet=quiet,
+        progress_interval=progress_interval,
+    )
+    linked = link_songs()
+    if linked:
+        log(f'Linked {linked} songs to singers imported after them.')
+    return result
@@ -0,0 +1,161 @@
+import json
+import platform
+import subprocess
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from typing import Any, Dict
+from argparse import ArgumentParser
+from ...benchmark import SCALES, generate_catalog, run_benchmarks
+from ...models import Song
+from singer.models import Singer
+
+
+class Command(BaseCommand):
+    """
+    Django management command to benchmark the list, detail and search views.
+
+    For every requested scale a synthetic catalog is generated in a
+    throwaway test database, each view is requested through the Django
+    test client and latency percentiles and query counts are reported.
+    The real database is never touched.
+    """
+    help = (
+        'Benchmarks the song, singer and search views against synthetic '
+        'catalogs and saves the results as JSON.'
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """
+        Adds command-line arguments for the benchmark_views command.
+
+        Args:
+            parser (ArgumentParser): The parser to
+            which arguments will be added.
+        """
+        parser.add_argument(
+            '--scales',
+            nargs='+',
+            default=['1k', '10k'],
+            help=f'Catalog sizes to benchmark, any of {list(SCALES)} '
+                 'or a plain number of songs.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Timed requests per view.'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default='benchmark_results.json',
+            help='Path of the JSON report.'
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            default='',
+            help='Optional: previous JSON report to compare p50 against.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """
+        Runs the benchmarks and writes the JSON report.
+
+        Args:
+            *args (Any): Positional arguments passed to the command.
+            **options (Any): Keyword arguments (from add_arguments)
+            passed to the command.
+        """
+        scales: Dict[str, int] = {}
+        for scale in options['scales']:
+            if scale in SCALES:
+                scales[scale] = SCALES[scale]
+            elif scale.isdigit():
+                scales[scale] = int(scale)
+            else:
+                raise CommandError(f'Unknown scale: {scale}')
+
+        report: Dict[str, Any] = {
+            'created_at': timezone.now().isoformat(),
+            'commit': self._git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'results': {},
+        }
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            for scale, song_count in scales.items():
+                Song.objects.all().delete()
+                Singer.objects.all().delete()
+
+                self.stdout.write(f'Generating {song_count} songs ({scale})...')
+                generate_catalog(song_count)
+
+                self.stdout.write(f'Benchmarking {scale}:')
+                report['results'][scale] = run_benchmarks(
+                    options['repeat'], log=self.stdout.write
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        self.stdout.write(
+            self.style.SUCCESS(f'Results saved to {options["output"]}')
+        )
+
+        if options['compare']:
+            self._compare(options['compare'], report)
+
+    def _git_commit(self) -> str:
+        """Returns the current commit hash, or '' outside a git checkout."""
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'],
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ''
+
+    def _compare(self, baseline_path: str, report: Dict[str, Any]) -> None:
+        """
+        Prints the p50 latency and query count changes against
+        a previous report.
+
+        Args:
+            baseline_path (str): Path of the previous JSON report.
+            report (Dict[str, Any]): The report of this run.
+        """
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline: Dict[str, Any] = json.load(f)
+
+        self.stdout.write(
+            f'\n--- Compared with {baseline.get("commit", "")[:10]} ---'
+        )
+        for scale, views in report['results'].items():
+            for name, result in views.items():
+                before = baseline['results'].get(scale, {}).get(name)
+                if before is None:
+                    continue
+                ratio = result['p50_ms'] / before['p50_ms'] \
+                    if before['p50_ms'] else 0.0
+                line = (
+                    f'{scale} {name}: p50 {before["p50_ms"]} -> '
+                    f'{result["p50_ms"]} ms (x{ratio:.2f}), queries '
+                    f'{before["queries"]} -> {result["queries"]}'
+                )
+                if ratio > 1.2 or result['queries'] > before['queries']:
+                    self.stdout.write(self.style.WARNING(line))
+                else:
+                    self.stdout.write(line)
@@ -0,0 +1,145 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from typing import Any, Dict, List
+from argparse import ArgumentParser
+from ...benchmark import SCALES, benchmark_urls, generate_catalog
+from ...explain import capture_view_queries, explain_query, find_problems
+
+
+class Command(BaseCommand):
+    """
+    Django management command to check the query plans of the views.
+
+    Every benchmarked view is requested once, and each SELECT it runs is
+    explained. Plans reading a whole table or sorting every row are
+    flagged: they get slower as the catalog grows, unlike index lookups.
+
+    By default the current database is explained. With --scale, a
+    synthetic catalog is generated in a throwaway test database instead,
+    as by benchmark_views.
+    """
+    help = (
+        'Runs EXPLAIN on the queries of the list, detail and search views '
+        'and flags sequential scans.'
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """
+        Adds command-line arguments for the explain_views command.
+
+        Args:
+            parser (ArgumentParser): The parser to
+            which arguments will be added.
+        """
+        parser.add_argument(
+            '--views',
+            nargs='+',
+            default=[],
+            help='Views to explain, by benchmark name; all by default.'
+        )
+        parser.add_argument(
+            '--scale',
+            type=str,
+            default='',
+            help=(
+                f'Optional: explain a synthetic catalog of this size, any of '
+                f'{list(SCALES)} or a plain number of songs.'
+            )
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Exit with an error when a query is flagged.'
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the full plan of every query.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """
+        Explains the view queries and reports the flagged ones.
+
+        Args:
+            *args (Any): Positional arguments passed to the command.
+            **options (Any): Keyword arguments (from add_arguments)
+            passed to the command.
+        """
+        scale: str = options['scale']
+        if scale and scale not in SCALES and not scale.isdigit():
+            raise CommandError(f'Unknown scale: {scale}')
+
+        # The test environment lets the test client reach the views
+        setup_test_environment()
+        try:
+            if not scale:
+                flagged = self._explain(options)
+            else:
+                old_name = connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True, serialize=False
+                )
+                try:
+                    song_count = SCALES.get(scale) or int(scale)
+                    self.stdout.write(f'Generating {song_count} songs...')
+                    generate_catalog(song_count)
+                    flagged = self._explain(options)
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            teardown_test_environment()
+
+        if not flagged:
+            self.stdout.write(self.style.SUCCESS(
+                '--- No sequential scans found ---'
+            ))
+            return
+        message = f'--- {flagged} queries with sequential scans or sorts ---'
+        if options['strict']:
+            raise CommandError(message)
+        self.stdout.write(self.style.WARNING(message))
+
+    def _explain(self, options: Dict[str, Any]) -> int:
+        """
+        Explains the queries of the selected views.
+
+        Args:
+            options (Dict[str, Any]): Options of the command.
+
+        Returns:
+            int: Number of flagged queries.
+        """
+        urls = benchmark_urls()
+        unknown = set(options['views']) - set(urls)
+        if unknown:
+            raise CommandError(
+                f'Unknown views: {sorted(unknown)}, use any of {list(urls)}'
+            )
+        if options['views']:
+            urls = {name: urls[name] for name in options['views']}
+
+        flagged: int = 0
+        try:
+            view_queries = capture_view_queries(urls)
+        except ValueError as e:
+            raise CommandError(f'Error: {e}')
+
+        for name, statements in view_queries.items():
+            self.stdout.write(self.style.SUCCESS(
+                f'\n{name}: {len(statements)} queries'
+            ))
+            for sql in statements:
+                plan: List[str] = explain_query(sql)
+                problems = find_problems(plan)
+                if problems:
+                    flagged += 1
+                    self.stdout.write(self.style.WARNING(f' - {sql}'))
+                    for line in problems:
+                        self.stdout.write(self.style.WARNING(f'     {line}'))
+                elif options['verbose_plans']:
+                    self.stdout.write(f' - {sql}')
+                if options['verbose_plans']:
+                    for line in plan:
+                        self.stdout.write(f'     | {line}')
+        return flagged
@@ -0,0 +1,93 @@
+import time
+from django.core.management.base import BaseCommand
+from typing import Any
+from argparse import ArgumentParser
+from MusicWebsite.importing import (
+    add_import_arguments, command_log, log_summary
+)
+from ...importing import import_song_files
+from singer.importing import SingerCache, import_singer_files
+
+
+class Command(BaseCommand):
+    """
+    Django management command to import singers, then songs, in one run.
+
+    Singers are imported first, so every song can be linked to its
+    singer. Both imports share one singer id cache: the singer ids are
+    loaded once and extended with the singers just written, so the song
+    import does not query them again.
+    """
+    help = (
+        'Imports scraped singer and song data, singers first, '
+        'with one summary.'
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """
+        Adds command-line arguments for the import_all command.
+
+        Args:
+            parser (ArgumentParser): The parser to
+            which arguments will be added.
+        """
+        parser.add_argument(
+            'singer_data_root',
+            type=str,
+            help=(
+                'The root directory containing singer ID folders '
+                '(e.g., D:\\code\\python\\BigHomework\\Singer)'
+            )
+        )
+        parser.add_argument(
+            'song_data_root',
+            type=str,
+            help=(
+                'The root directory containing song ID folders '
+                '(e.g., D:\\code\\python\\BigHomework\\Song)'
+            )
+        )
+        add_import_arguments(parser)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """
+        Imports the singers, then the songs, and reports both.
+
+        Args:
+            *args (Any): Positional arguments passed to the command.
+            **options (Any): Keyword arguments (from add_arguments)
+            passed to the command.
+        """
+        log = command_log(self)
+        cache = SingerCache()
+        start = time.perf_counter()
+
+        singer_result = import_singer_files(
+            options['singer_data_root'],
+            log,
+            full=options['full'],
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            quiet=options['quiet'],
+            progress_interval=options['progress_interval'],
+            cache=cache,
+        )
+        song_result = import_song_files(
+            options['song_data_root'],
+            log,
+            full=options['full'],
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            quiet=options['quiet'],
+            progress_interval=options['progress_interval'],
+            cache=cache,
+        )
+
+        # --- Final Summary ---
+        log('\n--- Data Import Summary ---', 'success')
+        log_summary('singer', singer_result, log)
+        log_summary('song', song_result, log)
+        log(
+            f'--- Import Complete in {time.perf_counter() - start:.1f}s ---',
+            'success'
+        )
@@ -0,0 +1,194 @@
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from typing import Any
+from argparse import ArgumentParser
+from MusicWebsite.importing import command_log
+from ...stream import append_quarantine, read_batch, upsert_records
+from singer.importing import SingerCache
+
+
+class Command(BaseCommand):
+    """
+    Django management command to import crawl results as they arrive.
+
+    The crawlers append every saved profile to a JSON Lines stream
+    when KUWO_STREAM is set. This command tails that file and upserts
+    new records in micro-batches, each in its own transaction, so the
+    site sees new data within seconds instead of after a full import.
+
+    The offset of the last committed line is kept next to the stream
+    in '<stream>.offset', so a restarted import resumes where it
+    stopped; replaying a batch is harmless because records are upserts.
+    Songs failing validation are listed in '<stream>.quarantine.json',
+    and records the database rejects are logged and skipped, so the
+    offset always moves past them.
+    Pictures are still associated by import_songs and import_singers.
+    """
+    help = (
+        'Tails the crawler record stream and upserts new songs and '
+        'singers in micro-batches.'
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """
+        Adds command-line arguments for the import_stream command.
+
+        Args:
+            parser (ArgumentParser): The parser to
+            which arguments will be added.
+        """
+        parser.add_argument(
+            'stream_path',
+            type=str,
+            help=(
+                'The JSON Lines stream written by the crawlers '
+                '(e.g., ..\\Stream\\records.jsonl)'
+            )
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Maximum number of records per transaction.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait for new records when the stream is idle.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Import the records available now and exit.'
+        )
+        parser.add_argument(
+            '--from-start',
+            action='store_true',
+            help='Ignore the saved offset and replay the whole stream.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """
+        Tails the stream until interrupted, or until its end with --once.
+
+        Args:
+            *args (Any): Positional arguments passed to the command.
+            **options (Any): Keyword arguments (from add_arguments)
+            passed to the command.
+        """
+        stream_path: str = options['stream_path']
+        offset_path: str = stream_path + '.offset'
+        batch_size: int = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        if options['once'] and not os.path.exists(stream_path):
+            raise CommandError(
+                f'Error: Record stream does not exist: {stream_path}'
+            )
+
+        offset: int = 0
+        if not options['from_start'] and os.path.exists(offset_path):
+            with open(offset_path, 'r', encoding='utf-8') as f:
+                offset = int(f.read().strip() or 0)
+
+        # Wait for the crawler to create the stream
+        while not os.path.exists(stream_path):
+            time.sleep(options['interval'])
+
+        if os.path.getsize(stream_path) < offset:
+            self.stdout.write(self.style.WARNING(
+                'Record stream is shorter than the saved offset, '
+                'replaying it from the start.'
+            ))
+            offset = 0
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Importing {stream_path} from offset {offset}...'
+        ))
+        total_singers: int = 0
+        total_songs: int = 0
+        total_failed: int = 0
+        total_quarantined: int = 0
+        quarantine_path: str = stream_path + '.quarantine.json'
+        log = command_log(self)
+        saved_offset: int = offset
+        cache = SingerCache()
+        try:
+            with open(stream_path, 'rb') as stream:
+                stream.seek(offset)
+                while True:
+                    entries, offset = read_batch(
+                        stream,
+                        batch_size,
+                        on_error=lambda message: self.stdout.write(
+                            self.style.WARNING(f' - {message}')
+                        )
+                    )
+                    if entries:
+                        result = upsert_records(
+                            entries, cache, log, source=stream_path
+                        )
+                        total_singers += result['singers']
+                        total_songs += result['songs']
+                        total_failed += result['failed']
+                        self.stdout.write(
+                            f' - Upserted {result["singers"]} singers and '
+                            f'{result["songs"]} songs (offset {offset})'
+                        )
+                        if result['quarantined']:
+                            total_quarantined += len(result['quarantined'])
+                            append_quarantine(
+                                quarantine_path, result['quarantined']
+                            )
+                            for check in result['quarantined']:
+                                log(
+                                    f' - Quarantined song ID {check.kuwo_id} '
+                                    f'({check.path}): '
+                                    f'{", ".join(check.problems)}.',
+                                    'warning'
+                                )
+                    if offset != saved_offset:
+                        self._save_offset(offset_path, offset)
+                        saved_offset = offset
+
+                    # Keep reading while the batch was full
+                    if len(entries) == batch_size:
+                        continue
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Interrupted.'))
+
+        if total_quarantined:
+            log(
+                f'Quarantined songs: {total_quarantined}, '
+                f'listed in {quarantine_path}',
+                'warning'
+            )
+        if total_failed:
+            log(
+                f'Records that failed to be written and were skipped: '
+                f'{total_failed}',
+                'error'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'--- Stream Import Complete: {total_singers} singers, '
+            f'{total_songs} songs ---'
+        ))
+
+    def _save_offset(self, offset_path: str, offset: int) -> None:
+        """
+        Records the offset of the last committed line.
+
+        Args:
+            offset_path (str): Location of the offset file.
+            offset (int): Byte offset just after the last committed line.
+        """
+        temp_path = offset_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(str(offset))
+        os.replace(temp_path, offset_path)
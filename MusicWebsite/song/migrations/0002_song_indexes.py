@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:18
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('singer', '0003_singer_fan_num_idx'),
+        ('song', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='song',
+            name='singer',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='songs', to='singer.singer', verbose_name='singer'),
+        ),
+        migrations.AddIndex(
+            model_name='song',
+            index=models.Index(fields=['singer', 'name'], name='song_singer_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='song',
+            index=models.Index(models.OrderBy(django.db.models.functions.text.Length(django.db.models.functions.comparison.Cast('comments', models.TextField())), descending=True), name='song_comments_length_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('singer', '0003_singer_fan_num_idx'),
+        ('song', '0002_song_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='song',
+            name='singer_kuwo_id',
+            field=models.IntegerField(blank=True, null=True, verbose_name='singer kuwo_id'),
+        ),
+        migrations.AddIndex(
+            model_name='song',
+            index=models.Index(condition=models.Q(('singer__isnull', True)), fields=['singer_kuwo_id'], name='song_unlinked_idx'),
+        ),
+    ]
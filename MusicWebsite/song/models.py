@@ -1,4 +1,10 @@
 from django.db import models
+from django.db.models.functions import Cast, Length
+
+# Size of the comments JSON, ordering the home page. It is cast to text
+# so LENGTH also works on PostgreSQL's jsonb; the view and the expression
+# index in Song.Meta must use this same expression for the index to apply
+COMMENTS_LENGTH = Length(Cast('comments', models.TextField()))
 
 class Song(models.Model):
     """
@@ -72,8 +78,36 @@ class Song(models.Model):
         null=True,
         blank=True,
         related_name='songs',
-        verbose_name="singer"
+        verbose_name="singer",
+        # Covered by the (singer, name) index in Meta
+        db_index=False
+    )
+
+    # Crawled singer id, kept so a song imported before its singer
+    # can be linked once the singer arrives
+    singer_kuwo_id = models.IntegerField(
+        blank = True,
+        null = True,
+        verbose_name = "singer kuwo_id"
     )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields = ['singer', 'name'],
+                name = 'song_singer_name_idx'
+            ),
+            models.Index(
+                COMMENTS_LENGTH.desc(),
+                name = 'song_comments_length_idx'
+            ),
+            # Only the songs still waiting for their singer
+            models.Index(
+                fields = ['singer_kuwo_id'],
+                name = 'song_unlinked_idx',
+                condition = models.Q(singer__isnull = True)
+            ),
+        ]
     
     def __str__(self) -> str:
         """
@@ -0,0 +1,153 @@
+import json
+import os
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+from MusicWebsite.importing import Log, RecordCheck, write_chunk
+from .importing import bulk_upsert_songs, link_songs, validate_song
+from singer.importing import SingerCache, bulk_upsert_singers
+
+def read_batch(
+    stream: BinaryIO,
+    max_records: int,
+    on_error: Optional[Callable[[str], None]] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Reads up to `max_records` complete lines from a record stream.
+
+    A trailing line without its newline is still being written by the
+    crawler; it is left in place and read again by the next call.
+
+    Args:
+        stream (BinaryIO): The stream, opened in binary mode.
+        max_records (int): Maximum number of records to return.
+        on_error (Optional[Callable[[str], None]]): Called with a message
+            for every malformed line, which is skipped.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], int]: The parsed lines, each with the
+            'offset' it starts at, and the offset just after the last
+            complete line.
+    """
+    entries: List[Dict[str, Any]] = []
+    offset: int = stream.tell()
+    while len(entries) < max_records:
+        line: bytes = stream.readline()
+        if not line.endswith(b'\n'):
+            stream.seek(offset)
+            break
+        line_offset = offset
+        offset += len(line)
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            if entry['kind'] not in ('song', 'singer'):
+                raise ValueError(f'unknown kind {entry["kind"]!r}')
+            entry['record']['id'] = int(entry['id'])
+            entry['offset'] = line_offset
+            entries.append(entry)
+        except (ValueError, KeyError, TypeError) as e:
+            if on_error is not None:
+                on_error(f'Skipping malformed line at {offset}: {e}')
+    return entries, offset
+
+def upsert_records(
+    entries: List[Dict[str, Any]],
+    cache: SingerCache,
+    log: Log,
+    source: str = ''
+) -> Dict[str, Any]:
+    """
+    Inserts or updates the singers and songs of a micro-batch.
+
+    Only the latest record of every id is written. Songs are validated
+    like import_songs does; the invalid ones are returned instead of
+    being written. Singers are written first, so songs of a singer
+    published in the same batch are linked to it; songs whose singer is
+    unknown are stored without one, and linked by the batch writing it.
+
+    Each kind is written in its own transaction. If one fails, its
+    records are retried one by one and the ones still failing are
+    logged and skipped, so a single bad record cannot stall the stream.
+
+    Args:
+        entries (List[Dict[str, Any]]): Lines returned by read_batch.
+        cache (SingerCache): Known singer ids, kept across batches.
+        log (Log): Receives the write failures.
+        source (str): Stream location, naming records as
+                      '<source>@<offset>' in messages and the quarantine.
+
+    Returns:
+        Dict[str, Any]: Numbers of 'singers' and 'songs' written and of
+            records that 'failed', and the 'quarantined' song checks.
+    """
+    singers: Dict[int, RecordCheck] = {}
+    songs: Dict[int, RecordCheck] = {}
+    for entry in entries:
+        record = entry['record']
+        location = f'{source}@{entry["offset"]}'
+        if entry['kind'] == 'singer':
+            singers[record['id']] = RecordCheck(
+                path=location, kuwo_id=record['id'], data=record
+            )
+        else:
+            songs[record['id']] = validate_song(location, record['id'], record)
+
+    written_singers = write_chunk(
+        list(singers.values()),
+        lambda checks: bulk_upsert_singers([check.data for check in checks]),
+        'singer',
+        log
+    ) if singers else []
+    cache.add(check.kuwo_id for check in written_singers)
+    if written_singers:
+        link_songs([check.kuwo_id for check in written_singers])
+
+    valid_songs = [check for check in songs.values() if check.valid]
+    written_songs = write_chunk(
+        valid_songs,
+        lambda checks: bulk_upsert_songs(
+            [check.data for check in checks], cache.ids()
+        ),
+        'song',
+        log
+    ) if valid_songs else []
+
+    return {
+        'singers': len(written_singers),
+        'songs': len(written_songs),
+        'failed': (
+            len(singers) - len(written_singers)
+            + len(valid_songs) - len(written_songs)
+        ),
+        'quarantined': [
+            check for check in songs.values() if not check.valid
+        ],
+    }
+
+def append_quarantine(path: str, checks: List[RecordCheck]) -> None:
+    """
+    Adds stream records kept out of the database to a quarantine list.
+
+    Unlike the list of a data root, which is rewritten by every import,
+    this one grows: each stream record is only read once.
+
+    Args:
+        path (str): Location of the quarantine list.
+        checks (List[RecordCheck]): The invalid checks.
+    """
+    entries: List[Dict[str, Any]] = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    entries.extend(
+        {
+            'kuwo_id': check.kuwo_id,
+            'path': check.path,
+            'problems': check.problems,
+        }
+        for check in checks
+    )
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=1, ensure_ascii=False)
+    os.replace(temp_path, path)
@@ -1,3 +1,375 @@
-from django.test import TestCase
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+from io import StringIO
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from .benchmark import (
+    benchmark_urls, generate_catalog, run_benchmarks, percentile
+)
+from .explain import capture_view_queries, explain_query, find_problems
+from .models import Song
+from singer.models import Singer
 
-# Create your tests here.
+
+class BenchmarkTests(TestCase):
+    """
+    Smoke tests keeping the benchmark suite runnable.
+    """
+
+    def test_percentile_nearest_rank(self):
+        samples = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(samples, 0.5), 50.0)
+        self.assertEqual(percentile(samples, 0.99), 99.0)
+        self.assertEqual(percentile([3.0], 0.9), 3.0)
+
+    def test_benchmark_reports_every_view(self):
+        generate_catalog(40, seed = 1)
+        self.assertEqual(Song.objects.count(), 40)
+
+        results = run_benchmarks(repeat = 2)
+
+        self.assertEqual(
+            set(results),
+            {
+                'home_page_view', 'singer_list', 'song_detail_view',
+                'search_result_view[song]', 'search_result_view[singer]',
+            }
+        )
+        for result in results.values():
+            self.assertEqual(result['status'], 200)
+            self.assertGreater(result['queries'], 0)
+            self.assertLessEqual(result['p50_ms'], result['max_ms'])
+
+
+class StreamImportTests(TestCase):
+    """
+    Tests for the micro-batch import of the crawler record stream.
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.stream_path = os.path.join(directory, 'records.jsonl')
+
+    def publish(self, kind, record, complete = True):
+        line = json.dumps(
+            {'kind': kind, 'id': record['id'], 'time': 0, 'record': record},
+            ensure_ascii = False
+        )
+        with open(self.stream_path, 'a', encoding = 'utf-8') as f:
+            f.write(line + '\n' if complete else line)
+
+    def import_stream(self):
+        call_command(
+            'import_stream', self.stream_path, once = True, stdout = StringIO()
+        )
+
+    def test_upserts_new_records_and_resumes_from_offset(self):
+        self.publish('singer', {'id': 7, 'name': '歌手', 'artistFans': 10})
+        self.publish('song', {
+            'id': 70, 'name': '旧名', 'artistid': 7, 'lyrics': '歌词',
+            'comments': None,
+        })
+        self.import_stream()
+
+        song = Song.objects.get(kuwo_id = 70)
+        self.assertEqual(song.singer.name, '歌手')
+        self.assertEqual(song.comments, [])
+
+        # Only the appended records are read again, the latest one wins
+        self.publish('song', {
+            'id': 70, 'name': '新名', 'artistid': 7, 'lyrics': '歌词',
+        })
+        self.publish('song', {
+            'id': 70, 'name': '最新', 'artistid': 7, 'lyrics': '歌词',
+        })
+        self.publish('song', {'id': 71, 'name': '半行'}, complete = False)
+        self.import_stream()
+
+        song.refresh_from_db()
+        self.assertEqual(song.name, '最新')
+        self.assertEqual(song.singer_id, 7)
+        self.assertFalse(Song.objects.filter(kuwo_id = 71).exists())
+        self.assertEqual(Singer.objects.get(kuwo_id = 7).fan_num, 10)
+
+    def test_songs_are_linked_to_singers_published_later(self):
+        self.publish('song', {
+            'id': 70, 'name': '先到', 'artistid': 7, 'lyrics': '歌词',
+        })
+        self.import_stream()
+        self.assertIsNone(Song.objects.get(kuwo_id = 70).singer_id)
+
+        self.publish('singer', {'id': 7, 'name': '歌手'})
+        self.import_stream()
+        self.assertEqual(Song.objects.get(kuwo_id = 70).singer_id, 7)
+
+    def test_rejected_records_are_skipped_and_invalid_songs_quarantined(self):
+        self.publish('singer', {'id': 7, 'name': '歌手'})
+        self.publish('singer', {'id': 8, 'name': '歌手'})
+        self.publish('song', {
+            'id': 70, 'name': '一', 'lyrics': '歌词',
+            'original_url': 'https://www.kuwo.cn/play_detail/1',
+        })
+        self.publish('song', {
+            'id': 71, 'name': '重复', 'lyrics': '歌词',
+            'original_url': 'https://www.kuwo.cn/play_detail/1',
+        })
+        self.publish('song', {'id': 72, 'name': '无词', 'lyrics': ''})
+        self.import_stream()
+
+        # Singer 8 and song 71 break unique constraints
+        self.assertEqual(
+            list(Singer.objects.values_list('kuwo_id', flat = True)), [7]
+        )
+        self.assertEqual(
+            list(Song.objects.values_list('kuwo_id', flat = True)), [70]
+        )
+        with open(
+            self.stream_path + '.quarantine.json', encoding = 'utf-8'
+        ) as f:
+            quarantine = json.load(f)
+        self.assertEqual(
+            [(entry['kuwo_id'], entry['problems']) for entry in quarantine],
+            [(72, ['missing lyrics'])]
+        )
+
+        # The stream moved past them
+        self.publish('song', {'id': 73, 'name': '新', 'lyrics': '歌词'})
+        self.import_stream()
+        self.assertTrue(Song.objects.filter(kuwo_id = 73).exists())
+        self.assertFalse(Song.objects.filter(kuwo_id = 71).exists())
+
+
+class ImportSongsTests(TestCase):
+    """
+    Tests for the incremental, validated import of import_songs.
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.song_root = os.path.join(directory, 'Song')
+        self.singer_root = os.path.join(directory, 'Singer')
+
+    def write_record(self, root, record):
+        os.makedirs(os.path.join(root, str(record['id'])), exist_ok = True)
+        path = os.path.join(root, str(record['id']), 'data.json')
+        with open(path, 'w', encoding = 'utf-8') as f:
+            json.dump(record, f, ensure_ascii = False)
+        return path
+
+    def write_song(self, kuwo_id, name, lyrics = '歌词', artistid = 0):
+        return self.write_record(self.song_root, {
+            'id': kuwo_id, 'name': name, 'lyrics': lyrics,
+            'artistid': artistid,
+            'original_url': f'https://www.kuwo.cn/play_detail/{kuwo_id}',
+        })
+
+    def import_songs(self, *args):
+        output = StringIO()
+        call_command('import_songs', self.song_root, *args, stdout = output)
+        return output.getvalue()
+
+    def test_only_changed_files_are_imported(self):
+        self.write_song(1, '一')
+        self.write_song(2, '二')
+        self.import_songs()
+
+        self.write_song(2, '二改')
+        output = self.import_songs()
+        self.assertIn('Unchanged files skipped: 1', output)
+        self.assertNotIn('Song/1/data.json', output)
+        self.assertEqual(Song.objects.get(kuwo_id = 2).name, '二改')
+
+        # A record missing from the database is imported again
+        Song.objects.filter(kuwo_id = 1).delete()
+        self.assertIn('Unchanged files skipped: 1', self.import_songs())
+        self.assertTrue(Song.objects.filter(kuwo_id = 1).exists())
+
+        self.assertIn('Unchanged files skipped: 0', self.import_songs('--full'))
+
+    def test_songs_without_lyrics_are_quarantined_not_deleted(self):
+        self.write_song(1, '有词')
+        path = self.write_song(2, '无词', lyrics = '')
+        with open(self.write_song(3, '坏'), 'w', encoding = 'utf-8') as f:
+            f.write('{broken')
+        self.import_songs()
+
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(Song.objects.get(kuwo_id = 1).lyrics, '歌词')
+        self.assertFalse(Song.objects.filter(kuwo_id__in = [2, 3]).exists())
+        with open(
+            os.path.join(self.song_root, '.quarantine.json'),
+            encoding = 'utf-8'
+        ) as f:
+            quarantine = {
+                entry['kuwo_id']: entry['problems'] for entry in json.load(f)
+            }
+        self.assertEqual(quarantine, {
+            2: ['missing image', 'missing lyrics'],
+            3: ['invalid json'],
+        })
+
+    def test_failed_chunk_is_retried_by_the_next_import(self):
+        for kuwo_id in range(1, 6):
+            self.write_song(kuwo_id, f'歌{kuwo_id}')
+        # original_url is unique, so song 5 cannot be written
+        Song.objects.create(
+            kuwo_id = 99, name = '已有', original_url = 'https://example.com/99'
+        )
+        self.write_record(self.song_root, {
+            'id': 5, 'name': '重复', 'lyrics': '歌词',
+            'original_url': 'https://example.com/99',
+        })
+        output = self.import_songs('--chunk-size', '2', '--quiet')
+
+        self.assertIn('Imported songs: 5/5 (100%)', output)
+        self.assertIn('failed to be written: 1', output)
+        self.assertNotIn('Committed songs', output)
+        self.assertEqual(Song.objects.count(), 5)
+        self.assertFalse(Song.objects.filter(kuwo_id = 5).exists())
+
+        # Only the failed song is read again once it is fixed
+        self.write_song(5, '歌5')
+        output = self.import_songs('--chunk-size', '2')
+        self.assertIn('Unchanged files skipped: 4', output)
+        self.assertIn('Committed songs 1-1 of 1.', output)
+        self.assertEqual(Song.objects.get(kuwo_id = 5).name, '歌5')
+
+    def test_unchanged_songs_are_linked_to_singers_imported_later(self):
+        self.write_song(1, '一', artistid = 7)
+        self.write_song(2, '二', artistid = 8)
+        self.import_songs()
+        self.assertIsNone(Song.objects.get(kuwo_id = 1).singer_id)
+
+        self.write_record(self.singer_root, {
+            'id': 7, 'name': '歌手',
+            'original_url': 'https://www.kuwo.cn/singer_detail/7',
+        })
+        call_command('import_singers', self.singer_root, stdout = StringIO())
+        output = self.import_songs()
+
+        self.assertIn('Unchanged files skipped: 2', output)
+        self.assertIn('Linked 1 songs', output)
+        self.assertEqual(Song.objects.get(kuwo_id = 1).singer_id, 7)
+        self.assertIsNone(Song.objects.get(kuwo_id = 2).singer_id)
+
+    def test_import_all_links_songs_with_one_singer_query(self):
+        for kuwo_id in (7, 8):
+            self.write_record(self.singer_root, {
+                'id': kuwo_id, 'name': f'歌手{kuwo_id}',
+                'original_url': f'https://www.kuwo.cn/singer_detail/{kuwo_id}',
+            })
+        for kuwo_id in range(1, 11):
+            self.write_song(kuwo_id, f'歌{kuwo_id}', artistid = 7 + kuwo_id % 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command(
+                'import_all', self.singer_root, self.song_root,
+                stdout = StringIO()
+            )
+
+        self.assertEqual(
+            Song.objects.filter(singer__kuwo_id = 8).count(), 5
+        )
+        singer_selects = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "singer_singer"' in query['sql']
+        ]
+        self.assertEqual(len(singer_selects), 1)
+
+
+class ExplainViewsTests(TestCase):
+    """
+    Tests for the query plans checked by explain_views.
+    """
+
+    # PostgreSQL reads tiny tables sequentially whatever their indexes
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite plans')
+    def test_list_views_are_served_by_indexes(self):
+        generate_catalog(120)
+        urls = benchmark_urls()
+        queries = capture_view_queries({
+            name: urls[name] for name in ('home_page_view', 'singer_list')
+        })
+
+        for name, statements in queries.items():
+            for sql in statements:
+                self.assertEqual(find_problems(explain_query(sql)), [], sql)
+
+        # A search on lyrics has no index to use
+        with CaptureQueriesContext(connection) as captured:
+            list(Song.objects.filter(lyrics__contains = '爱'))
+        plan = explain_query(captured.captured_queries[0]['sql'])
+        self.assertEqual(find_problems(plan), ['SCAN song_song'])
+
+
+class HomePageColumnTests(TestCase):
+    """
+    Tests for the columns loaded by home_page_view.
+    """
+
+    def test_large_text_columns_are_not_selected(self):
+        generate_catalog(40)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('song:home_page'))
+        self.assertEqual(response.status_code, 200)
+
+        # comments is only read inside the LENGTH() used for ordering
+        selected = re.compile(
+            r'"(?:song_song"\."(?:lyrics|comments)'
+            r'|singer_singer"\."info)"(?=,| FROM)'
+        )
+        page_queries = [
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "song_song"' in query['sql']
+        ]
+        self.assertEqual(len(queries.captured_queries), 2)
+        for sql in page_queries:
+            self.assertIsNone(selected.search(sql), sql)
+
+        song = response.context['songs'][0]
+        self.assertTrue(
+            {'lyrics', 'comments', 'album_name'} <= song.get_deferred_fields()
+        )
+        self.assertIn('info', song.singer.get_deferred_fields())
+
+
+class CrawlerBrowserTests(SimpleTestCase):
+    """
+    Tests for the third-party scope of the crawler browser profiles.
+    """
+
+    def setUp(self):
+        # The crawlers live next to the site in the repository root
+        project_root = str(settings.BASE_DIR.parent)
+        if project_root not in sys.path:
+            sys.path.append(project_root)
+
+    def test_only_kuwo_hosts_are_first_party(self):
+        from crawler_browser import SINGER_PROFILE
+        third_party = re.compile(SINGER_PROFILE.third_party_scope())
+
+        for url in (
+            'https://www.kuwo.cn/singers',
+            'https://kuwo.cn',
+            'http://comment.kuwo.cn:8080/com.s?type=get_comment',
+        ):
+            self.assertIsNone(third_party.match(url), url)
+        for url in (
+            'https://evilkuwo.cn/',
+            'https://kuwo.cn.example.com/',
+            'https://kuwo.cn@example.com/',
+            'https://example.com/kuwo.cn/',
+        ):
+            self.assertIsNotNone(third_party.match(url), url)
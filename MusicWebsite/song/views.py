@@ -1,19 +1,25 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import Song
+from .models import COMMENTS_LENGTH, Song
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.views.generic import ListView
-from django.db.models.functions import Length
 import datetime
 from django.urls import reverse
 import uuid
 
 list_num: int = 30
 
+# Columns rendered by home_page.html
+SONG_LIST_FIELDS: list[str] = ['kuwo_id', 'name', 'image', 'singer__name']
+
 def home_page_view(request):
     """
     Show songs in home page.
     """
-    all_songs = Song.objects.annotate(comments_length=Length('comments')).order_by('-comments_length') 
+    # Only the columns shown by the list are loaded: lyrics and comments
+    # stay in the database, and singers come with the same query
+    all_songs = Song.objects.select_related('singer').only(
+        *SONG_LIST_FIELDS
+    ).annotate(comments_length=COMMENTS_LENGTH).order_by('-comments_length')
 
     paginator = Paginator(all_songs, list_num)
     page_number = request.GET.get('page')
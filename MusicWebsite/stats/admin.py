@@ -0,0 +1,23 @@
+from django.contrib import admin
+from .models import SingerStat, SongRhymeStat, TopWord
+
+@admin.register(SingerStat)
+class SingerStatAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the SingerStat model.
+    """
+    list_display = ('singer', 'song_count', 'comment_count')
+
+@admin.register(SongRhymeStat)
+class SongRhymeStatAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the SongRhymeStat model.
+    """
+    list_display = ('song', 'line_count', 'overall_repetition', 'max_dominance')
+
+@admin.register(TopWord)
+class TopWordAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the TopWord model.
+    """
+    list_display = ('rank', 'word', 'count')
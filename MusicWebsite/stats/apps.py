@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class StatsConfig(AppConfig):
+    """
+    App configuration for the stats application.
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'stats'
@@ -0,0 +1,212 @@
+import os
+import sys
+from collections import Counter
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from typing import Any, Dict
+from argparse import ArgumentParser
+from song.models import Song
+from singer.models import Singer
+from ...models import (
+    StatsSummary, SingerStat, ReleaseYearStat,
+    LyricLengthStat, SongRhymeStat, TopWord
+)
+
+# The analysis modules (segmentation, rhyme, word_frequency)
+# live next to the crawlers in the repository root
+PROJECT_ROOT: str = str(settings.BASE_DIR.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+
+class Command(BaseCommand):
+    """
+    Django management command to materialize the aggregate tables
+    read by the stats page.
+
+    All heavy work (scanning songs, rhyme analysis, word segmentation)
+    happens here, so the page itself only reads a few small tables.
+    Rhyme features and word frequencies are cached on disk by song
+    and lyric hash, so reruns only analyze new or changed lyrics.
+    """
+    help = 'Computes aggregate statistics for the stats page.'
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """
+        Adds command-line arguments for the compute_stats command.
+
+        Args:
+            parser (ArgumentParser): The parser to
+            which arguments will be added.
+        """
+        parser.add_argument(
+            '--cache_dir',
+            type=str,
+            default=os.path.join(PROJECT_ROOT, 'Cache'),
+            help='Directory of the token, rhyme and word frequency caches.'
+        )
+        parser.add_argument(
+            '--length_bucket',
+            type=int,
+            default=200,
+            help='Width (in characters) of the lyric length buckets.'
+        )
+        parser.add_argument(
+            '--top_words',
+            type=int,
+            default=100,
+            help='Number of most frequent words to store.'
+        )
+        parser.add_argument(
+            '--min_lyric_lines',
+            type=int,
+            default=20,
+            help='Songs with fewer lyric lines get no rhyme scores.'
+        )
+        parser.add_argument(
+            '--chinese_ratio',
+            type=float,
+            default=0.7,
+            help='Songs below this Chinese character ratio '
+                 'get no rhyme scores.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """
+        Scans the catalog once and rewrites every stats table.
+
+        Args:
+            *args (Any): Positional arguments passed to the command.
+            **options (Any): Keyword arguments (from add_arguments)
+            passed to the command.
+        """
+        from segmentation import TokenCache
+        from rhyme import RhymeStore
+        from word_frequency import FrequencyStore, get_stopwords
+
+        cache_dir: str = options['cache_dir']
+        bucket: int = options['length_bucket']
+        if bucket <= 0:
+            raise CommandError(
+                f'Error: --length_bucket must be positive, got {bucket}'
+            )
+
+        # --- Single pass over the songs ---
+        singer_songs: Counter = Counter()
+        singer_comments: Counter = Counter()
+        years: Counter = Counter()
+        lengths: Counter = Counter()
+        lyrics_by_id: Dict[int, str] = {}
+        comment_count: int = 0
+        song_count: int = 0
+
+        rows = Song.objects.values_list(
+            'kuwo_id', 'singer_id', 'release_date', 'lyrics', 'comments'
+        )
+        for kuwo_id, singer_id, release_date, lyrics, comments in \
+                rows.iterator(chunk_size=500):
+            song_count += 1
+            num_comments = len(comments or [])
+            comment_count += num_comments
+            if singer_id is not None:
+                singer_songs[singer_id] += 1
+                singer_comments[singer_id] += num_comments
+
+            year = (release_date or '')[:4]
+            if year.isdigit() and int(year) > 0:
+                years[int(year)] += 1
+
+            lyrics = lyrics or ''
+            lengths[len(lyrics) // bucket * bucket] += 1
+            if lyrics:
+                lyrics_by_id[kuwo_id] = lyrics
+
+        self.stdout.write(f'Scanned {song_count} songs.')
+
+        # --- Rhyme scores ---
+        with RhymeStore(os.path.join(cache_dir, 'rhyme.sqlite3')) as store:
+            updated = store.update_features(lyrics_by_id)
+            features = [
+                feature for feature in store.load_features()
+                if feature.song_id in lyrics_by_id
+                and feature.line_count >= options['min_lyric_lines']
+                and feature.chinese_ratio >= options['chinese_ratio']
+            ]
+        self.stdout.write(f'Rhyme features recomputed for {updated} songs.')
+
+        # --- Word frequencies ---
+        with TokenCache(
+            os.path.join(cache_dir, 'tokens.sqlite3')
+        ) as token_cache, FrequencyStore(
+            os.path.join(cache_dir, 'word_frequency.sqlite3'),
+            stopwords=get_stopwords(os.path.join(PROJECT_ROOT, 'stopwords.txt')),
+            token_cache=token_cache
+        ) as store:
+            updated = store.update(lyrics_by_id, prune=True)
+            top_words = store.most_common(options['top_words'])
+        self.stdout.write(f'Word frequencies recomputed for {updated} songs.')
+
+        # --- Replace the stats tables in one short transaction ---
+        rhyme_count: int = len(features)
+        with transaction.atomic():
+            for model in (
+                SingerStat, ReleaseYearStat, LyricLengthStat,
+                SongRhymeStat, TopWord, StatsSummary
+            ):
+                model.objects.all().delete()
+
+            SingerStat.objects.bulk_create(
+                SingerStat(
+                    singer_id=singer_id,
+                    song_count=singer_songs[singer_id],
+                    comment_count=singer_comments[singer_id],
+                )
+                for singer_id in singer_songs
+            )
+            ReleaseYearStat.objects.bulk_create(
+                ReleaseYearStat(year=year, song_count=count)
+                for year, count in years.items()
+            )
+            LyricLengthStat.objects.bulk_create(
+                LyricLengthStat(
+                    bucket_start=start,
+                    bucket_end=start + bucket,
+                    song_count=count,
+                )
+                for start, count in lengths.items()
+            )
+            SongRhymeStat.objects.bulk_create(
+                (
+                    SongRhymeStat(
+                        song_id=feature.song_id,
+                        line_count=feature.line_count,
+                        overall_repetition=feature.overall_repetition,
+                        max_dominance=feature.max_dominance,
+                    )
+                    for feature in features
+                ),
+                batch_size=500
+            )
+            TopWord.objects.bulk_create(
+                TopWord(rank=rank, word=word[:50], count=count)
+                for rank, (word, count) in enumerate(top_words, start=1)
+            )
+            StatsSummary.objects.create(
+                computed_at=timezone.now(),
+                song_count=song_count,
+                singer_count=Singer.objects.count(),
+                comment_count=comment_count,
+                rhyme_song_count=rhyme_count,
+                avg_overall_repetition=(
+                    sum(f.overall_repetition for f in features) / rhyme_count
+                    if rhyme_count else 0.0
+                ),
+                avg_max_dominance=(
+                    sum(f.max_dominance for f in features) / rhyme_count
+                    if rhyme_count else 0.0
+                ),
+            )
+
+        self.stdout.write(self.style.SUCCESS('--- Stats Computed ---'))
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('singer', '0002_alter_singer_image'),
+        ('song', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LyricLengthStat',
+            fields=[
+                ('bucket_start', models.IntegerField(primary_key=True, serialize=False, verbose_name='bucket start')),
+                ('bucket_end', models.IntegerField(verbose_name='bucket end')),
+                ('song_count', models.IntegerField(default=0, verbose_name='number of songs')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReleaseYearStat',
+            fields=[
+                ('year', models.IntegerField(primary_key=True, serialize=False, verbose_name='year')),
+                ('song_count', models.IntegerField(default=0, verbose_name='number of songs')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SingerStat',
+            fields=[
+                ('singer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stat', serialize=False, to='singer.singer', verbose_name='singer')),
+                ('song_count', models.IntegerField(default=0, verbose_name='number of songs')),
+                ('comment_count', models.IntegerField(db_index=True, default=0, verbose_name='number of comments')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SongRhymeStat',
+            fields=[
+                ('song', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rhyme_stat', serialize=False, to='song.song', verbose_name='song')),
+                ('line_count', models.IntegerField(default=0, verbose_name='number of lyric lines')),
+                ('overall_repetition', models.FloatField(default=0.0, verbose_name='overall rhyme repetition')),
+                ('max_dominance', models.FloatField(db_index=True, default=0.0, verbose_name='max rhyme dominance')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StatsSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('computed_at', models.DateTimeField(verbose_name='computed at')),
+                ('song_count', models.IntegerField(default=0, verbose_name='number of songs')),
+                ('singer_count', models.IntegerField(default=0, verbose_name='number of singers')),
+                ('comment_count', models.IntegerField(default=0, verbose_name='number of comments')),
+                ('rhyme_song_count', models.IntegerField(default=0, verbose_name='number of songs with rhyme scores')),
+                ('avg_overall_repetition', models.FloatField(default=0.0, verbose_name='average overall rhyme repetition')),
+                ('avg_max_dominance', models.FloatField(default=0.0, verbose_name='average max rhyme dominance')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TopWord',
+            fields=[
+                ('rank', models.IntegerField(primary_key=True, serialize=False, verbose_name='rank')),
+                ('word', models.CharField(max_length=50, verbose_name='word')),
+                ('count', models.IntegerField(default=0, verbose_name='count')),
+            ],
+        ),
+    ]
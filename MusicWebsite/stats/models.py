@@ -0,0 +1,170 @@
+from django.db import models
+
+# These tables are filled by `manage.py compute_stats` and only read by
+# the stats page, so the page never aggregates over songs or comments.
+
+class StatsSummary(models.Model):
+    """
+    Catalog-wide totals of the latest compute_stats run (a single row).
+    """
+
+    computed_at = models.DateTimeField(
+        verbose_name = "computed at"
+    )
+    song_count = models.IntegerField(
+        default = 0,
+        verbose_name = "number of songs"
+    )
+    singer_count = models.IntegerField(
+        default = 0,
+        verbose_name = "number of singers"
+    )
+    comment_count = models.IntegerField(
+        default = 0,
+        verbose_name = "number of comments"
+    )
+    rhyme_song_count = models.IntegerField(
+        default = 0,
+        verbose_name = "number of songs with rhyme scores"
+    )
+    avg_overall_repetition = models.FloatField(
+        default = 0.0,
+        verbose_name = "average overall rhyme repetition"
+    )
+    avg_max_dominance = models.FloatField(
+        default = 0.0,
+        verbose_name = "average max rhyme dominance"
+    )
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the StatsSummary object.
+        """
+        return f"Stats computed at {self.computed_at}"
+
+class SingerStat(models.Model):
+    """
+    Number of songs and comments of a singer.
+    """
+
+    singer = models.OneToOneField(
+        'singer.Singer',
+        on_delete = models.CASCADE,
+        primary_key = True,
+        related_name = 'stat',
+        verbose_name = "singer"
+    )
+    song_count = models.IntegerField(
+        default = 0,
+        verbose_name = "number of songs"
+    )
+    comment_count = models.IntegerField(
+        default = 0,
+        db_index = True,
+        verbose_name = "number of comments"
+    )
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the SingerStat object.
+        """
+        return f"{self.singer_id}: {self.comment_count}"
+
+class ReleaseYearStat(models.Model):
+    """
+    Number of songs released in a year.
+    """
+
+    year = models.IntegerField(
+        primary_key = True,
+        verbose_name = "year"
+    )
+    song_count = models.IntegerField(
+        default = 0,
+        verbose_name = "number of songs"
+    )
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the ReleaseYearStat object.
+        """
+        return f"{self.year}: {self.song_count}"
+
+class LyricLengthStat(models.Model):
+    """
+    Number of songs whose lyric length falls in [bucket_start, bucket_end).
+    """
+
+    bucket_start = models.IntegerField(
+        primary_key = True,
+        verbose_name = "bucket start"
+    )
+    bucket_end = models.IntegerField(
+        verbose_name = "bucket end"
+    )
+    song_count = models.IntegerField(
+        default = 0,
+        verbose_name = "number of songs"
+    )
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the LyricLengthStat object.
+        """
+        return f"[{self.bucket_start}, {self.bucket_end}): {self.song_count}"
+
+class SongRhymeStat(models.Model):
+    """
+    Rhyme scores of a song, see the rhyme module for definitions.
+    """
+
+    song = models.OneToOneField(
+        'song.Song',
+        on_delete = models.CASCADE,
+        primary_key = True,
+        related_name = 'rhyme_stat',
+        verbose_name = "song"
+    )
+    line_count = models.IntegerField(
+        default = 0,
+        verbose_name = "number of lyric lines"
+    )
+    overall_repetition = models.FloatField(
+        default = 0.0,
+        verbose_name = "overall rhyme repetition"
+    )
+    max_dominance = models.FloatField(
+        default = 0.0,
+        db_index = True,
+        verbose_name = "max rhyme dominance"
+    )
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the SongRhymeStat object.
+        """
+        return f"{self.song_id}: {self.max_dominance:.3f}"
+
+class TopWord(models.Model):
+    """
+    One of the most frequent words in the lyrics.
+    """
+
+    rank = models.IntegerField(
+        primary_key = True,
+        verbose_name = "rank"
+    )
+    word = models.CharField(
+        max_length = 50,
+        verbose_name = "word"
+    )
+    count = models.IntegerField(
+        default = 0,
+        verbose_name = "count"
+    )
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the TopWord object.
+        """
+        return f"{self.rank}. {self.word}"
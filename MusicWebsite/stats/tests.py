@@ -0,0 +1,80 @@
+import shutil
+import tempfile
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from song.benchmark import generate_catalog
+from .models import SingerStat, StatsSummary, TopWord
+
+
+class ComputeStatsTests(TestCase):
+    """
+    Tests for the tables materialized by compute_stats and the page
+    reading them.
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        generate_catalog(100, singer_count = 10)
+
+    def compute_stats(self):
+        output = StringIO()
+        call_command(
+            'compute_stats', cache_dir = self.cache_dir,
+            min_lyric_lines = 1, stdout = output
+        )
+        return output.getvalue()
+
+    def test_tables_are_computed_then_reused(self):
+        output = self.compute_stats()
+        self.assertIn('Scanned 100 songs.', output)
+        self.assertIn('Word frequencies recomputed for 100 songs.', output)
+
+        summary = StatsSummary.objects.get()
+        self.assertEqual(summary.song_count, 100)
+        self.assertEqual(summary.singer_count, 10)
+        self.assertEqual(
+            sum(SingerStat.objects.values_list('song_count', flat = True)),
+            100
+        )
+        self.assertEqual(
+            summary.comment_count,
+            sum(SingerStat.objects.values_list('comment_count', flat = True))
+        )
+        ranks = list(TopWord.objects.order_by('rank').values_list(
+            'rank', 'count'
+        ))
+        self.assertEqual(ranks[0][0], 1)
+        self.assertEqual(
+            [count for _, count in ranks],
+            sorted((count for _, count in ranks), reverse = True)
+        )
+
+        # Unchanged lyrics are not analyzed again
+        output = self.compute_stats()
+        self.assertIn('Rhyme features recomputed for 0 songs.', output)
+        self.assertIn('Word frequencies recomputed for 0 songs.', output)
+        self.assertEqual(StatsSummary.objects.count(), 1)
+
+    def test_length_bucket_must_be_positive(self):
+        for bucket in (0, -200):
+            with self.assertRaises(CommandError):
+                call_command(
+                    'compute_stats', cache_dir = self.cache_dir,
+                    length_bucket = bucket, stdout = StringIO()
+                )
+        self.assertFalse(StatsSummary.objects.exists())
+
+    def test_stats_page_reads_a_fixed_number_of_queries(self):
+        self.compute_stats()
+        session = self.client.session
+        session['username'] = 'tester'
+        session.save()
+
+        # Session lookup, then one query per precomputed table
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse('stats:stats_page'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, TopWord.objects.get(rank = 1).word)
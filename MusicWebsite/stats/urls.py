@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'stats'
+
+urlpatterns = [
+    path('', views.stats_page_view, name='stats_page'),
+]
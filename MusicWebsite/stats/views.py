@@ -0,0 +1,46 @@
+from django.shortcuts import render, redirect
+from .models import (
+    StatsSummary, SingerStat, ReleaseYearStat,
+    LyricLengthStat, SongRhymeStat, TopWord
+)
+
+top_singer_num: int = 20
+top_rhyme_num: int = 10
+top_word_num: int = 50
+
+def stats_page_view(request):
+    """
+    Show the statistics computed by `manage.py compute_stats`.
+
+    Only the precomputed tables are read, each with a bounded number of
+    rows, so the page costs the same regardless of catalog size.
+    """
+    if 'username' not in request.session or not request.session['username']:
+        return redirect('/account/')
+
+    summary = StatsSummary.objects.order_by('-computed_at').first()
+
+    top_singers = SingerStat.objects.select_related('singer').only(
+        'song_count', 'comment_count', 'singer__kuwo_id', 'singer__name'
+    ).order_by('-comment_count')[:top_singer_num]
+
+    top_rhyme_songs = SongRhymeStat.objects.select_related('song').only(
+        'line_count', 'overall_repetition', 'max_dominance',
+        'song__kuwo_id', 'song__name'
+    ).order_by('-max_dominance')[:top_rhyme_num]
+
+    years = list(ReleaseYearStat.objects.order_by('year'))
+    lengths = list(LyricLengthStat.objects.order_by('bucket_start'))
+    top_words = list(TopWord.objects.order_by('rank')[:top_word_num])
+
+    context = {
+        'summary': summary,
+        'top_singers': top_singers,
+        'top_rhyme_songs': top_rhyme_songs,
+        'years': years,
+        'max_year_count': max((y.song_count for y in years), default=1),
+        'lengths': lengths,
+        'max_length_count': max((l.song_count for l in lengths), default=1),
+        'top_words': top_words,
+    }
+    return render(request, 'stats/stats_page.html', context)
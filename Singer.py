@@ -1,12 +1,13 @@
-from dataclasses import dataclass, field, asdict
-import os
+from dataclasses import dataclass, field
 import requests
-import json
+from record_io import BatchWriter
+from record_store import get_store
+from record_stream import publish
 
 # Define the base directory for saving singer data
 save_dir = './Singer/'
 
-@dataclass
+@dataclass(slots = True)
 class SingerProfile:
     """
     Represents detailed information of a singer.
@@ -52,21 +53,63 @@ class SingerProfile:
     info: str = ''
     song_list: list = field(default_factory = list)
     original_url: str = ''
+
+    def to_dict(self) -> dict:
+        """
+        Returns the profile as plain data, in field order,
+        without the deep copy made by `asdict`.
+
+        Returns:
+            dict: The record written by save_to_local.
+        """
+        return {
+            'name': self.name,
+            'id': self.id,
+            'aartist': self.aartist,
+            'artistFans': self.artistFans,
+            'albumNum': self.albumNum,
+            'mvNum': self.mvNum,
+            'musicNum': self.musicNum,
+            'pic': self.pic,
+            'birthday': self.birthday,
+            'birthplace': self.birthplace,
+            'region': self.region,
+            'gender': self.gender,
+            'weight': self.weight,
+            'height': self.height,
+            'language': self.language,
+            'constellation': self.constellation,
+            'info': self.info,
+            'song_list': list(self.song_list),
+            'original_url': self.original_url,
+        }
     
-    def save_to_local(self):
-        """Saves singer's profile data to a JSON file."""
-        
-        # Construct singer-specific folder path
-        os.makedirs(save_dir + str(self.id), exist_ok = True)
-        
-        json_file_path = save_dir + str(self.id) + '/data.json'
-        with open(json_file_path, 'w', encoding='utf-8') as f:
-            json.dump(asdict(self), f, indent=4, ensure_ascii=False)
+    def save_to_local(
+        self,
+        compact: bool = False,
+        writer: BatchWriter | None = None
+    ):
+        """
+        Saves singer's profile data to the record store.
+
+        With the folder backend the JSON file is written to a temporary
+        name and renamed into place, so an interrupted save never leaves
+        a corrupt data.json behind; with the SQLite backend the record
+        is written in one transaction. The record is also published to
+        the record stream when one is configured.
+
+        Args:
+            compact (bool): Write compact JSON instead of indented JSON.
+            writer (BatchWriter | None): Buffer the write in a batch
+                                         writer (using its encoding)
+                                         instead of syncing it now.
+        """
+        record = self.to_dict()
+        get_store('singer').save(self.id, record, compact, writer)
+        publish('singer', record)
             
     def save_picture(self):
         """Downloads and saves the singer's profile picture."""
         response = requests.get(self.pic)
         category = self.pic.split('.')[-1]
-        with open(save_dir + str(self.id) + '/pic.' + category, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        get_store('singer').save_picture(self.id, category, response.content)
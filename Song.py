@@ -1,12 +1,16 @@
 from dataclasses import dataclass, field, asdict
-import os
-import requests
 import json
+import requests
+import time
+import tracemalloc
+from record_io import BatchWriter
+from record_store import get_store
+from record_stream import publish
 
 # Define the base directory for saving singer data
 save_dir = './Song/'
 
-@dataclass
+@dataclass(slots = True)
 class CommentProfile:
     """
     Represents detailed information for a single song comment.
@@ -19,8 +23,16 @@ class CommentProfile:
     content: str = ''
     username: str = ''
     time: str = ''
-    
-@dataclass
+
+    def to_dict(self) -> dict:
+        """Returns the comment as plain data, in field order."""
+        return {
+            'content': self.content,
+            'username': self.username,
+            'time': self.time,
+        }
+
+@dataclass(slots = True)
 class SongProfile:
     """
     Represents detailed information for a song.
@@ -52,21 +64,143 @@ class SongProfile:
     original_url: str = ''
     lyrics: str = ''
     comments: list = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SongProfile':
+        """
+        Builds a profile from a stored record.
+
+        Comments are turned into slotted CommentProfile objects, which
+        take a fraction of the memory of the dicts they are read as;
+        missing comments become an empty list.
+
+        Args:
+            data (dict): The record, as saved by save_to_local.
+
+        Returns:
+            SongProfile: The profile.
+        """
+        data = dict(data)
+        data['comments'] = [
+            CommentProfile(**comment) if isinstance(comment, dict) else comment
+            for comment in data.get('comments') or []
+        ]
+        return cls(**data)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the profile as plain data, in field order.
+
+        Unlike `asdict`, nothing is deep-copied: the strings are shared
+        and only the comment list is rebuilt. Comments may be
+        CommentProfile objects or dicts read from an older record.
+
+        Returns:
+            dict: The record written by save_to_local.
+        """
+        return {
+            'name': self.name,
+            'id': self.id,
+            'artist': self.artist,
+            'artistid': self.artistid,
+            'pic': self.pic,
+            'releasedate': self.releasedate,
+            'duration': self.duration,
+            'album': self.album,
+            'original_url': self.original_url,
+            'lyrics': self.lyrics,
+            'comments': [
+                comment.to_dict() if isinstance(comment, CommentProfile)
+                else comment
+                for comment in self.comments
+            ],
+        }
     
-    def save_to_local(self):
-        """Saves song's profile data to a JSON file."""
-        
-        # Construct singer-specific folder path
-        os.makedirs(save_dir + str(self.id), exist_ok = True)
-        
-        json_file_path = save_dir + str(self.id) + '/data.json'
-        with open(json_file_path, 'w', encoding='utf-8') as f:
-            json.dump(asdict(self), f, indent=4, ensure_ascii=False)
+    def save_to_local(
+        self,
+        compact: bool = False,
+        writer: BatchWriter | None = None
+    ):
+        """
+        Saves song's profile data to the record store.
+
+        With the folder backend the JSON file is written to a temporary
+        name and renamed into place, so an interrupted save never leaves
+        a corrupt data.json behind; with the SQLite backend the record
+        is written in one transaction. The record is also published to
+        the record stream when one is configured.
+
+        Args:
+            compact (bool): Write compact JSON instead of indented JSON.
+            writer (BatchWriter | None): Buffer the write in a batch
+                                         writer (using its encoding)
+                                         instead of syncing it now.
+        """
+        record = self.to_dict()
+        get_store('song').save(self.id, record, compact, writer)
+        publish('song', record)
             
     def save_picture(self):
         """Downloads and saves the singer's profile picture."""
         response = requests.get(self.pic)
         category = self.pic.split('.')[-1]
-        with open(save_dir + str(self.id) + '/pic.' + category, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
\ No newline at end of file
+        get_store('song').save_picture(self.id, category, response.content)
+
+if __name__ == '__main__':
+    # Compare memory and serialization time of 100k comments
+    COMMENT_NUM = 100_000
+    SONG_NUM = 1000
+    comment_data = [
+        {
+            'content': f'这首歌真好听 {i}',
+            'username': f'user{i % 5000}',
+            'time': '2024-01-01 12:00:00',
+        }
+        for i in range(COMMENT_NUM)
+    ]
+    per_song = COMMENT_NUM // SONG_NUM
+
+    def song_records(comments: list) -> list[dict]:
+        return [
+            {
+                'name': f'song {i}',
+                'id': i,
+                'lyrics': '歌词 ' * 200,
+                'comments': comments[i * per_song:(i + 1) * per_song],
+            }
+            for i in range(SONG_NUM)
+        ]
+
+    def measure_memory(build) -> tuple[object, int]:
+        tracemalloc.start()
+        built = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return built, size
+
+    # Strings are shared by both representations, so only the
+    # containers holding them are measured
+    _, dict_size = measure_memory(
+        lambda: [dict(comment) for comment in comment_data]
+    )
+    _, slot_size = measure_memory(
+        lambda: [CommentProfile(**comment) for comment in comment_data]
+    )
+    print(f'{COMMENT_NUM} comments as dicts: {dict_size / 2**20:.1f} MiB')
+    print(f'{COMMENT_NUM} comments slotted: {slot_size / 2**20:.1f} MiB')
+
+    songs = [
+        SongProfile.from_dict(record) for record in song_records(comment_data)
+    ]
+    for name, serialize in (
+        ('asdict', asdict),
+        ('to_dict', SongProfile.to_dict),
+    ):
+        start = time.perf_counter()
+        for song in songs:
+            json.dumps(serialize(song), ensure_ascii = False)
+        elapsed = time.perf_counter() - start
+        print(
+            f'{name} + json.dumps of {COMMENT_NUM} comments: '
+            f'{elapsed * 1000:.0f} ms'
+        )
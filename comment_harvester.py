@@ -0,0 +1,359 @@
+from Song import SongProfile, CommentProfile
+from record_store import get_store
+from response_decoder import loads
+from crawl_metrics import CrawlMetrics
+from rate_limiter import AdaptiveRateLimiter, classify_status
+from rate_limiter import OK, EMPTY, TIMEOUT
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import argparse
+import json
+import math
+import os
+import requests
+from requests.adapters import HTTPAdapter
+
+# Paginated comment API, newest first
+COMMENT_URL = 'https://comment.kuwo.cn/com.s'
+
+# Comments per page requested from the API
+PAGE_SIZE = 30
+
+# Default maximum number of comments kept per song
+MAX_COMMENTS = 300
+
+# Attempts per page before it is given up
+PAGE_ATTEMPTS = 3
+
+# Define the folder of the harvested comment streams, one
+# '<song_id>.jsonl' per song, whatever the record store backend
+comments_dir = './Comments/'
+
+# Spans and retry/failure counters of the harvest
+metrics = CrawlMetrics()
+
+HEADERS = {
+    'User-Agent': (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36"
+    ),
+    'Referer': 'https://www.kuwo.cn/',
+}
+
+def comment_key(comment: CommentProfile) -> tuple[str, str, str]:
+    """Returns the identity used to deduplicate comments."""
+    return (comment.username, comment.time, comment.content)
+
+def parse_comments(data: dict) -> list[CommentProfile]:
+    """
+    Converts the rows of a comment API response into profiles.
+
+    Args:
+        data (dict): Decoded response of the comment API.
+
+    Returns:
+        list[CommentProfile]: Comments of the page, empty if malformed.
+    """
+    comment_list: list[CommentProfile] = []
+    for comment in data.get('rows') or []:
+        try:
+            comment_list.append(CommentProfile(
+                content = comment['msg'],
+                username = comment['u_name'],
+                time = comment['time']
+            ))
+        except (KeyError, TypeError):
+            continue
+    return comment_list
+
+def fetch_page(
+    session: requests.Session,
+    song_id: int,
+    page: int,
+    rows: int = PAGE_SIZE,
+    limiter: AdaptiveRateLimiter | None = None
+) -> dict | None:
+    """
+    Downloads one page of a song's comments.
+
+    Args:
+        session (requests.Session): HTTP session shared by the workers.
+        song_id (int): kuwo_id of the song.
+        page (int): 1-based page number.
+        rows (int): Comments per page.
+        limiter (AdaptiveRateLimiter | None): Limiter shared by the
+                                              workers, every attempt
+                                              takes one of its slots.
+
+    Returns:
+        dict | None: The decoded response, None after PAGE_ATTEMPTS failures.
+    """
+    params = {
+        'type': 'get_comment',
+        'f': 'web',
+        'page': page,
+        'rows': rows,
+        'digest': 15,
+        'sid': song_id,
+        'uid': 0,
+        'prod': 'newWeb',
+        'httpsStatus': 1,
+    }
+    for attempt in range(PAGE_ATTEMPTS):
+        if attempt:
+            metrics.count('retries')
+        if limiter is not None:
+            with metrics.measure('throttle'):
+                limiter.acquire()
+        outcome = TIMEOUT
+        try:
+            with metrics.measure('navigate'):
+                response = session.get(
+                    COMMENT_URL, params = params, timeout = 10
+                )
+            outcome = classify_status(response.status_code)
+            response.raise_for_status()
+            with metrics.measure('decode'):
+                data = loads(response.content)
+            if not isinstance(data, dict):
+                outcome = EMPTY
+                continue
+            return data
+        except (requests.RequestException, ValueError):
+            if outcome == OK:
+                outcome = EMPTY
+            continue
+        finally:
+            if limiter is not None:
+                limiter.release(outcome)
+    metrics.fail('page')
+    return None
+
+def comments_path(song_id: int) -> str:
+    """Returns the location of a song's harvested comment stream."""
+    return os.path.join(comments_dir, f'{song_id}.jsonl')
+
+class SongComments:
+    """
+    Deduplicated comments of one song, streamed to a JSONL file.
+
+    Comments are appended to `<song_id>.jsonl.tmp` in `comments_dir`
+    as pages arrive, and the file is renamed to `<song_id>.jsonl` once
+    the song is finished, so an interrupted run never leaves a partial
+    file behind under the final name. A song with a failed page is
+    aborted instead, keeping the comments of an earlier harvest.
+
+    Attributes:
+        song_id (int): kuwo_id of the song.
+        limit (int): Maximum number of comments kept.
+        count (int): Number of comments written so far.
+        pages (int): Number of pages still expected.
+        failed (bool): Whether a page could not be downloaded.
+    """
+    def __init__(self, song_id: int, limit: int):
+        self.song_id = song_id
+        self.limit = limit
+        self.count = 0
+        self.pages = 0
+        self.failed = False
+        self._seen: set[tuple[str, str, str]] = set()
+        self._path = comments_path(song_id)
+        os.makedirs(comments_dir, exist_ok = True)
+        self._file = open(self._path + '.tmp', 'w', encoding = 'utf-8')
+
+    def add(self, comments: list[CommentProfile]) -> int:
+        """
+        Writes the comments that were not seen before.
+
+        Args:
+            comments (list[CommentProfile]): Comments of one page.
+
+        Returns:
+            int: Number of comments written.
+        """
+        written = 0
+        for comment in comments:
+            if self.count >= self.limit:
+                break
+            key = comment_key(comment)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            self._file.write(
+                json.dumps(comment.to_dict(), ensure_ascii = False) + '\n'
+            )
+            self.count += 1
+            written += 1
+        return written
+
+    def finish(self):
+        """Closes the stream and publishes it under its final name."""
+        self._file.close()
+        os.replace(self._path + '.tmp', self._path)
+
+    def abort(self):
+        """Closes the stream and discards it."""
+        self._file.close()
+        os.remove(self._path + '.tmp')
+
+def harvest(
+    song_ids: list[int],
+    max_comments: int = MAX_COMMENTS,
+    workers: int = 8,
+    rows: int = PAGE_SIZE
+) -> dict[int, int]:
+    """
+    Harvests the paginated comments of many songs concurrently.
+
+    The first page of every song tells how many comments exist; the
+    remaining pages, capped by `max_comments`, are then queued on the
+    same thread pool, so slow songs never hold back the others.
+    Results are written from the calling thread only.
+
+    Args:
+        song_ids (list[int]): kuwo_ids of the songs.
+        max_comments (int): Maximum number of comments kept per song.
+        workers (int): Concurrent HTTP requests.
+        rows (int): Comments per page.
+
+    Returns:
+        dict[int, int]: Number of comments written per song, songs
+                        with a failed page are left out.
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount('https://', HTTPAdapter(pool_maxsize = workers))
+
+    # Adapt the request rate to how the comment API responds
+    limiter = AdaptiveRateLimiter(
+        rate = 2.0, concurrency = min(2, workers), max_concurrency = workers
+    )
+
+    # Songs in progress are bounded, each of them holds an open file
+    max_active = workers * 2
+    queue = iter(song_ids)
+    songs: dict[int, SongComments] = {}
+    counts: dict[int, int] = {}
+    pending = {}
+
+    def submit(song_id: int, page: int):
+        songs[song_id].pages += 1
+        future = pool.submit(
+            fetch_page, session, song_id, page, rows, limiter
+        )
+        pending[future] = (song_id, page)
+
+    def start_songs():
+        while len(songs) < max_active:
+            song_id = next(queue, None)
+            if song_id is None:
+                return
+            songs[song_id] = SongComments(song_id, max_comments)
+            submit(song_id, 1)
+
+    with ThreadPoolExecutor(max_workers = workers) as pool:
+        start_songs()
+        while pending:
+            done, _ = wait(pending, return_when = FIRST_COMPLETED)
+            for future in done:
+                song_id, page = pending.pop(future)
+                song = songs[song_id]
+                song.pages -= 1
+                data = future.result()
+
+                if isinstance(data, dict):
+                    with metrics.measure('save'):
+                        song.add(parse_comments(data))
+                    if page == 1:
+                        # Queue the rest of the pages within the cap
+                        try:
+                            total = int(data.get('total') or 0)
+                        except (TypeError, ValueError):
+                            total = 0
+                        last_page = min(
+                            math.ceil(total / rows),
+                            math.ceil(max_comments / rows)
+                        )
+                        for next_page in range(2, last_page + 1):
+                            submit(song_id, next_page)
+                else:
+                    song.failed = True
+
+                if song.pages == 0:
+                    del songs[song_id]
+                    if song.failed:
+                        # A partial stream must not replace a complete one
+                        song.abort()
+                        metrics.fail('song')
+                        continue
+                    song.finish()
+                    metrics.count('songs')
+                    counts[song_id] = song.count
+            start_songs()
+    return counts
+
+def read_comments(song_id: int) -> list[CommentProfile]:
+    """
+    Reads the harvested comments of a song.
+
+    Args:
+        song_id (int): kuwo_id of the song.
+
+    Returns:
+        list[CommentProfile]: Harvested comments, empty if there are none.
+    """
+    path = comments_path(song_id)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding = 'utf-8') as f:
+        return [CommentProfile(**json.loads(line)) for line in f if line.strip()]
+
+def merge_into_profile(song_id: int) -> int:
+    """
+    Appends harvested comments to the comments saved in the song's
+    record, skipping the ones already there.
+
+    Args:
+        song_id (int): kuwo_id of the song.
+
+    Returns:
+        int: Number of comments in the profile afterwards.
+    """
+    song_profile = SongProfile.from_dict(get_store('song').load(song_id))
+
+    comments = song_profile.comments
+    seen = {comment_key(comment) for comment in comments}
+    for comment in read_comments(song_id):
+        if comment_key(comment) not in seen:
+            seen.add(comment_key(comment))
+            comments.append(comment)
+
+    song_profile.save_to_local()
+    return len(comments)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description = 'Harvest paginated comments of crawled songs.'
+    )
+    parser.add_argument(
+        'song_ids', nargs = '*', type = int,
+        help = 'kuwo_ids of the songs, every stored song by default'
+    )
+    parser.add_argument('--max-comments', type = int, default = MAX_COMMENTS)
+    parser.add_argument('--workers', type = int, default = 8)
+    parser.add_argument(
+        '--merge', action = 'store_true',
+        help = 'Append the harvested comments to each stored song profile'
+    )
+    args = parser.parse_args()
+
+    song_ids = args.song_ids or get_store('song').ids()
+    metrics.start_reporter()
+    try:
+        harvest(song_ids, args.max_comments, args.workers)
+    finally:
+        print(metrics.report())
+
+    if args.merge:
+        for song_id in song_ids:
+            merge_into_profile(song_id)
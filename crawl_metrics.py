@@ -0,0 +1,300 @@
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import threading
+import time
+
+# Define the default location of the exported item traces
+metrics_path = './Cache/crawl_metrics.jsonl'
+
+# Spans recorded by the crawlers
+SPANS = ('throttle', 'navigate', 'wait', 'decode', 'save', 'image')
+
+# Window of the live throughput, in seconds
+THROUGHPUT_WINDOW = 60.0
+
+class CrawlMetrics:
+    """
+    Per-item timing spans, counters and throughput of a crawl.
+
+    Every crawled item (a singer, a song) is wrapped in `item()`;
+    spans measured with `measure()` inside it are added both to the
+    global totals and to that item's trace, which is written as one
+    JSON line when the item ends. Spans measured outside any item on
+    the current thread, e.g. decoding in selenium-wire's threads, only
+    count towards the totals.
+
+    Thread-safe, so one instance can be shared by all crawler threads.
+    """
+    def __init__(self):
+        self._totals: dict[str, float] = defaultdict(float)
+        self._counts: dict[str, int] = defaultdict(int)
+        self._counters: dict[str, int] = defaultdict(int)
+        self._finished: deque[float] = deque()
+        # Span time measured inside items, the rest of item time is "other"
+        self._in_items = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started = time.perf_counter()
+        self._sink = None
+
+    def export_jsonl(self, path: str = metrics_path):
+        """
+        Writes every finished item as a JSON line to `path` (appending).
+
+        Args:
+            path (str): Location of the JSON lines file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+        self._sink = open(path, 'a', encoding = 'utf-8', buffering = 1)
+
+    def _emit(self, record: dict):
+        """Writes one record to the JSON lines sink, if any."""
+        if self._sink is not None:
+            line = json.dumps(record, ensure_ascii = False) + '\n'
+            with self._lock:
+                self._sink.write(line)
+
+    @contextmanager
+    def item(self, kind: str, key):
+        """
+        Traces the processing of one item.
+
+        Args:
+            kind (str): Kind of item, e.g. 'singer' or 'song'.
+            key: Identifier of the item, e.g. its kuwo id.
+        """
+        trace = {
+            'kind': kind,
+            'key': key,
+            'time': time.time(),
+            'ok': True,
+            'spans': defaultdict(float),
+        }
+        self._local.trace = trace
+        start = time.perf_counter()
+        try:
+            yield trace
+        except BaseException as error:
+            self.fail(type(error).__name__)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self._local.trace = None
+            with self._lock:
+                self._totals['item'] += elapsed
+                self._counts['item'] += 1
+                if trace['ok']:
+                    self._counters['items_ok'] += 1
+                self._finished.append(time.monotonic())
+            trace['duration'] = round(elapsed, 4)
+            trace['spans'] = {
+                name: round(value, 4) for name, value in trace['spans'].items()
+            }
+            self._emit(trace)
+
+    @contextmanager
+    def measure(self, span: str):
+        """
+        Times the enclosed block under `span`.
+
+        Args:
+            span (str): Name the duration is accumulated under,
+                        one of SPANS for the standard report.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            trace = getattr(self._local, 'trace', None)
+            with self._lock:
+                self._totals[span] += elapsed
+                self._counts[span] += 1
+                if trace is not None:
+                    self._in_items += elapsed
+            if trace is not None:
+                trace['spans'][span] += elapsed
+
+    def count(self, name: str, value: int = 1):
+        """
+        Increments a counter, e.g. 'retries'.
+
+        Args:
+            name (str): Name of the counter.
+            value (int): Amount to add.
+        """
+        with self._lock:
+            self._counters[name] += value
+
+    def fail(self, reason: str = ''):
+        """
+        Marks the current item as failed.
+
+        Args:
+            reason (str): Short description stored in the item's trace.
+        """
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace['ok'] = False
+            trace['reason'] = reason
+        self.count('failures')
+
+    def throughput(self) -> float:
+        """Returns items finished per second over the recent window."""
+        now = time.monotonic()
+        with self._lock:
+            cutoff = now - THROUGHPUT_WINDOW
+            while self._finished and self._finished[0] < cutoff:
+                self._finished.popleft()
+            recent = len(self._finished)
+        window = min(THROUGHPUT_WINDOW, time.perf_counter() - self._started)
+        return recent / window if window > 0 else 0.0
+
+    def snapshot(self) -> dict:
+        """
+        Returns a consistent copy of every metric.
+
+        Returns:
+            dict: Elapsed time, throughput, span totals and counts,
+                  and counters.
+        """
+        throughput = self.throughput()
+        with self._lock:
+            return {
+                'elapsed': time.perf_counter() - self._started,
+                'throughput': throughput,
+                'totals': dict(self._totals),
+                'counts': dict(self._counts),
+                'counters': dict(self._counters),
+                'in_items': self._in_items,
+            }
+
+    def summary(self) -> str:
+        """Returns a one-line live summary."""
+        data = self.snapshot()
+        counters = data['counters']
+        return (
+            f'[{data["elapsed"]:.0f}s] {data["counts"].get("item", 0)} items, '
+            f'{data["throughput"]:.2f}/s, '
+            f'{counters.get("failures", 0)} failures, '
+            f'{counters.get("retries", 0)} retries'
+        )
+
+    def report(self) -> str:
+        """
+        Summarizes where the item time went.
+
+        Returns:
+            str: A multi-line human readable report.
+        """
+        data = self.snapshot()
+        totals, counts = data['totals'], data['counts']
+        items = counts.get('item', 0)
+        item_time = totals.get('item', 0.0)
+        per_item = item_time / items if items else 0.0
+        lines = [
+            '--- Crawl Timing ---',
+            f'Elapsed: {data["elapsed"]:.1f}s, '
+            f'items: {items} ({per_item:.2f}s per item)',
+        ]
+        for span in SPANS:
+            if span in totals:
+                share = totals[span] / item_time * 100 if item_time else 0.0
+                lines.append(
+                    f'{span.capitalize()}: {totals[span]:.1f}s over '
+                    f'{counts[span]} spans ({share:.0f}% of item time)'
+                )
+        other = max(item_time - data['in_items'], 0.0)
+        lines.append(f'Other: {other:.1f}s')
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f'{name}: {value}')
+        return '\n'.join(lines)
+
+    def prometheus(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics page.
+        """
+        data = self.snapshot()
+        lines = [
+            '# TYPE crawl_span_seconds_total counter',
+            *(
+                f'crawl_span_seconds_total{{span="{span}"}} {value:.6f}'
+                for span, value in sorted(data['totals'].items())
+            ),
+            '# TYPE crawl_span_count_total counter',
+            *(
+                f'crawl_span_count_total{{span="{span}"}} {value}'
+                for span, value in sorted(data['counts'].items())
+            ),
+            '# TYPE crawl_events_total counter',
+            *(
+                f'crawl_events_total{{name="{name}"}} {value}'
+                for name, value in sorted(data['counters'].items())
+            ),
+            '# TYPE crawl_throughput_items_per_second gauge',
+            f'crawl_throughput_items_per_second {data["throughput"]:.6f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def serve_prometheus(self, port: int) -> ThreadingHTTPServer:
+        """
+        Serves `/metrics` on localhost from a daemon thread.
+
+        Args:
+            port (int): Local port to listen on.
+
+        Returns:
+            ThreadingHTTPServer: The running server.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header(
+                    'Content-Type', 'text/plain; version=0.0.4'
+                )
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        threading.Thread(target = server.serve_forever, daemon = True).start()
+        return server
+
+    def start_reporter(self, interval: float = 30.0):
+        """
+        Prints the live summary every `interval` seconds
+        from a daemon thread.
+
+        Args:
+            interval (float): Seconds between two summaries.
+        """
+        def report_forever():
+            while True:
+                time.sleep(interval)
+                print(self.summary())
+
+        threading.Thread(target = report_forever, daemon = True).start()
+
+    def close(self):
+        """Writes the final totals to the JSON lines sink and closes it."""
+        if self._sink is not None:
+            self._emit({'kind': 'summary', **self.snapshot()})
+            self._sink.close()
+            self._sink = None
@@ -0,0 +1,398 @@
+from crawler_browser import create_driver, SINGER_PROFILE
+from crawl_metrics import metrics_path
+from response_capture import ResponseCapture
+from singer_crawler import crawl_singer_paced, get_page_detail, metrics
+from singer_crawler import wait_until
+from rate_limiter import AdaptiveRateLimiter, LimiterManager
+from record_store import get_store
+from singer_crawler import (
+    PAGE_MAX, POPULAR_SINGER_NUM, NORMAL_SINGER_NUM, WORKERS
+)
+from dataclasses import dataclass, field
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+import argparse
+import json
+import multiprocessing
+import queue
+
+# Name of the listing tab holding every singer
+ALL_CATEGORY = '全部'
+
+def parse_pages(spec: str) -> list[int]:
+    """
+    Parses a page range specification such as "1-3,5,8-10".
+
+    Args:
+        spec (str): Comma separated pages and inclusive ranges.
+
+    Returns:
+        list[int]: Sorted distinct page numbers.
+
+    Raises:
+        ValueError: If the specification is malformed.
+    """
+    pages = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+            if start < 1 or end < start:
+                raise ValueError(f'Invalid page range: {part}')
+            pages.update(range(start, end + 1))
+        else:
+            page = int(part)
+            if page < 1:
+                raise ValueError(f'Invalid page: {part}')
+            pages.add(page)
+    return sorted(pages)
+
+@dataclass
+class Tier:
+    """
+    Number of songs kept per singer for a group of listing pages.
+
+    Attributes:
+        pages (list[int]): Listing pages of the tier.
+        songs (int): Maximum number of songs per singer.
+    """
+    pages: list[int] = field(default_factory = list)
+    songs: int = 10
+
+@dataclass
+class CrawlPlan:
+    """
+    Describes which singers to crawl and how to split the work.
+    The defaults reproduce the crawl of `singer_crawler.py`.
+
+    Attributes:
+        pages (list[int]): Listing pages to crawl in every category.
+        tiers (list[Tier]): Song caps by listing page, the first
+                            matching tier wins.
+        default_songs (int): Song cap of pages outside every tier.
+        categories (list[str]): Listing tabs to crawl, e.g. '华语女'.
+        regions (list[str]): Only keep singers whose region is listed,
+                             every region if empty.
+        workers (int): Worker processes, each with its own browser.
+        unit_size (int): Singers per work unit.
+        skip_existing (bool): Skip singers already saved in ./Singer,
+                              which makes an interrupted plan resumable.
+        metrics_file (str): JSON lines file every worker appends
+                            its item traces to.
+        metrics_port (int | None): First local port serving /metrics,
+                                   worker i uses metrics_port + i.
+    """
+    pages: list[int] = field(
+        default_factory = lambda: list(range(1, PAGE_MAX + 1))
+    )
+    tiers: list[Tier] = field(
+        default_factory = lambda: [
+            Tier([1], POPULAR_SINGER_NUM),
+            Tier(list(range(2, PAGE_MAX + 1)), NORMAL_SINGER_NUM),
+        ]
+    )
+    default_songs: int = NORMAL_SINGER_NUM
+    categories: list[str] = field(default_factory = lambda: [ALL_CATEGORY])
+    regions: list[str] = field(default_factory = list)
+    workers: int = WORKERS
+    unit_size: int = 10
+    skip_existing: bool = True
+    metrics_file: str = metrics_path
+    metrics_port: int | None = None
+
+    def song_cap(self, page: int) -> int:
+        """Returns the number of songs kept for singers of a page."""
+        for tier in self.tiers:
+            if page in tier.pages:
+                return tier.songs
+        return self.default_songs
+
+    @classmethod
+    def from_dict(cls, config: dict) -> 'CrawlPlan':
+        """
+        Builds a plan from a configuration dictionary, where pages
+        may be given as range specifications.
+
+        Args:
+            config (dict): Parsed configuration, e.g. from a JSON file.
+
+        Returns:
+            CrawlPlan: The plan, defaults filling missing keys.
+        """
+        config = dict(config)
+        if isinstance(config.get('pages'), str):
+            config['pages'] = parse_pages(config['pages'])
+        if 'tiers' in config:
+            config['tiers'] = [
+                Tier(
+                    parse_pages(tier['pages'])
+                    if isinstance(tier['pages'], str) else tier['pages'],
+                    tier['songs']
+                )
+                for tier in config['tiers']
+            ]
+        return cls(**config)
+
+@dataclass
+class WorkUnit:
+    """
+    An independent batch of singers processed by one worker.
+
+    Attributes:
+        index (int): Position of the unit in the plan.
+        singers (list[tuple[int, str, int]]): (id, name, song cap).
+    """
+    index: int = 0
+    singers: list = field(default_factory = list)
+
+def list_singers(plan: CrawlPlan) -> list[tuple[int, str, int]]:
+    """
+    Listing phase: reads every planned listing page of every category.
+
+    Pages are walked in order so the next page number is always
+    visible in the pagination bar.
+
+    Args:
+        plan (CrawlPlan): The crawl plan.
+
+    Returns:
+        list[tuple[int, str, int]]: (id, name, page) of each distinct
+                                    singer, in listing order.
+    """
+    driver = create_driver(SINGER_PROFILE)
+    capture = ResponseCapture(driver)
+    singers: dict[int, tuple[int, str, int]] = {}
+    wanted = set(plan.pages)
+    try:
+        for category in plan.categories:
+            driver.get('https://www.kuwo.cn/singers')
+            if category != ALL_CATEGORY:
+                path = f'//*[normalize-space(text())="{category}"]'
+                wait_until(
+                    driver, EC.element_to_be_clickable((By.XPATH, path))
+                ).click()
+
+            for page in range(1, max(plan.pages) + 1):
+                singer_dict = get_page_detail(
+                    page = page, driver = driver, capture = capture
+                )
+                if page not in wanted:
+                    continue
+                for id, name in singer_dict.items():
+                    singers.setdefault(id, (id, name, page))
+                print(f'{category} page {page}: {len(singer_dict)} singers')
+    finally:
+        driver.quit()
+    return list(singers.values())
+
+def shard(
+    plan: CrawlPlan,
+    singers: list[tuple[int, str, int]]
+) -> list[WorkUnit]:
+    """
+    Splits the listed singers into work units of `plan.unit_size`.
+
+    Args:
+        plan (CrawlPlan): The crawl plan.
+        singers (list[tuple[int, str, int]]): Output of `list_singers`.
+
+    Returns:
+        list[WorkUnit]: Units holding (id, name, song cap) tuples.
+    """
+    if plan.skip_existing:
+        existing = set(get_store('singer').ids())
+        singers = [singer for singer in singers if singer[0] not in existing]
+    jobs = [(id, name, plan.song_cap(page)) for id, name, page in singers]
+    return [
+        WorkUnit(index, jobs[start:start + plan.unit_size])
+        for index, start in enumerate(range(0, len(jobs), plan.unit_size))
+    ]
+
+def run_worker(
+    units: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    plan: CrawlPlan,
+    index: int,
+    limiter: AdaptiveRateLimiter
+):
+    """
+    Worker process: owns one browser and processes units until it
+    reads the stop marker (None).
+
+    Args:
+        units (multiprocessing.Queue): WorkUnits to process.
+        results (multiprocessing.Queue): Receives (unit index, saved,
+                                         skipped, failed singer ids).
+        plan (CrawlPlan): The crawl plan.
+        index (int): Position of the worker, used for its metrics port.
+        limiter (AdaptiveRateLimiter): Proxy to the limiter shared by
+                                       every worker process.
+    """
+    metrics.export_jsonl(plan.metrics_file)
+    if plan.metrics_port is not None:
+        metrics.serve_prometheus(plan.metrics_port + index)
+
+    driver = create_driver(SINGER_PROFILE)
+    capture = ResponseCapture(driver, metrics = metrics)
+    region_filter = frozenset(plan.regions) or None
+    try:
+        while True:
+            unit = units.get()
+            if unit is None:
+                break
+            saved, skipped, failed = [], [], []
+            for id, name, song_num in unit.singers:
+                status = crawl_singer_paced(
+                    id, song_num, driver, capture, limiter, region_filter
+                )
+                if status is None:
+                    skipped.append(id)
+                elif status:
+                    saved.append(id)
+                else:
+                    failed.append(id)
+            results.put((unit.index, saved, skipped, failed))
+            print(f'Worker {index}: {metrics.summary()}')
+    finally:
+        driver.quit()
+        print(f'Worker {index}\n{metrics.report()}')
+        metrics.close()
+
+def execute(plan: CrawlPlan, units: list[WorkUnit]) -> list[int]:
+    """
+    Processes work units with `plan.workers` worker processes.
+
+    Args:
+        plan (CrawlPlan): The crawl plan.
+        units (list[WorkUnit]): Units produced by `shard`.
+
+    Returns:
+        list[int]: Ids of the singers that failed.
+    """
+    if not units:
+        return []
+    unit_queue = multiprocessing.Queue()
+    result_queue = multiprocessing.Queue()
+    for unit in units:
+        unit_queue.put(unit)
+    workers = min(plan.workers, len(units))
+    for _ in range(workers):
+        unit_queue.put(None)
+
+    # One limiter, served by a manager process, paces every worker
+    manager = LimiterManager()
+    manager.start()
+    limiter = manager.AdaptiveRateLimiter(
+        concurrency = min(2, workers), max_concurrency = workers
+    )
+
+    processes = [
+        multiprocessing.Process(
+            target = run_worker,
+            args = (unit_queue, result_queue, plan, i, limiter)
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    failed: list[int] = []
+    done = 0
+    while done < len(units):
+        try:
+            index, saved, skipped, unit_failed = result_queue.get(timeout = 5)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                print('Workers stopped before finishing every unit')
+                break
+            continue
+        done += 1
+        failed += unit_failed
+        print(
+            f'Unit {index} done ({done}/{len(units)}): {len(saved)} saved, '
+            f'{len(skipped)} filtered out, {len(unit_failed)} failed'
+        )
+
+    for process in processes:
+        process.join()
+    print(limiter.state())
+    manager.shutdown()
+    return failed
+
+def build_plan(args: argparse.Namespace) -> CrawlPlan:
+    """Builds the plan from a config file and command line overrides."""
+    config = {}
+    if args.config:
+        with open(args.config, 'r', encoding = 'utf-8') as f:
+            config = json.load(f)
+    if args.pages:
+        config['pages'] = args.pages
+    if args.tier:
+        config['tiers'] = []
+        for tier in args.tier:
+            pages, songs = tier.rsplit(':', 1)
+            config['tiers'].append({'pages': pages, 'songs': int(songs)})
+    for key in ('default_songs', 'workers', 'unit_size'):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    if args.category:
+        config['categories'] = args.category
+    if args.region:
+        config['regions'] = args.region
+    if args.no_skip_existing:
+        config['skip_existing'] = False
+    if args.metrics_file:
+        config['metrics_file'] = args.metrics_file
+    if args.metrics_port is not None:
+        config['metrics_port'] = args.metrics_port
+    return CrawlPlan.from_dict(config)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description = 'Crawl singers and their songs according to a plan.'
+    )
+    parser.add_argument('--config', help = 'JSON file with plan settings')
+    parser.add_argument('--pages', help = 'Listing pages, e.g. "1-20"')
+    parser.add_argument(
+        '--tier', action = 'append',
+        help = 'Song cap for pages, e.g. "1:20" or "2-10:10", repeatable'
+    )
+    parser.add_argument('--default-songs', dest = 'default_songs', type = int)
+    parser.add_argument(
+        '--category', action = 'append',
+        help = 'Listing tab to crawl, e.g. "华语女", repeatable'
+    )
+    parser.add_argument(
+        '--region', action = 'append',
+        help = 'Only keep singers of this region, repeatable'
+    )
+    parser.add_argument('--workers', type = int)
+    parser.add_argument('--unit-size', dest = 'unit_size', type = int)
+    parser.add_argument(
+        '--no-skip-existing', dest = 'no_skip_existing',
+        action = 'store_true', help = 'Crawl singers already saved again'
+    )
+    parser.add_argument(
+        '--metrics-file', dest = 'metrics_file',
+        help = 'JSON lines file receiving the item traces'
+    )
+    parser.add_argument(
+        '--metrics-port', dest = 'metrics_port', type = int,
+        help = 'Serve /metrics on localhost from this port upwards'
+    )
+    parser.add_argument(
+        '--dry-run', dest = 'dry_run', action = 'store_true',
+        help = 'Print the plan without crawling'
+    )
+    args = parser.parse_args()
+
+    plan = build_plan(args)
+    print(plan)
+    if not args.dry_run:
+        units = shard(plan, list_singers(plan))
+        print(f'{len(units)} work units')
+        failed = execute(plan, units)
+        for id in failed:
+            print(f'Failed: id = {id}')
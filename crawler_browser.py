@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+from seleniumwire import webdriver
+import json
+import re
+import sys
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36"
+)
+
+# URL patterns blocked inside Chrome, before they reach the proxy
+IMAGE_PATTERNS = [
+    '*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.svg*', '*.ico*'
+]
+FONT_PATTERNS = ['*.woff*', '*.ttf*', '*.otf*', '*.eot*']
+MEDIA_PATTERNS = ['*.mp3*', '*.m4a*', '*.aac*', '*.flac*', '*.mp4*', '*.ogg*']
+STYLESHEET_PATTERNS = ['*.css*']
+
+@dataclass
+class BrowserProfile:
+    """
+    Describes how a crawler browser is launched.
+
+    Attributes:
+        headless (bool): Run Chrome without a window.
+        block_images (bool): Skip pictures, the crawlers download the
+                             cover and singer pictures themselves.
+        block_fonts (bool): Skip web fonts.
+        block_media (bool): Skip audio and video.
+        block_stylesheets (bool): Skip CSS; keep it when the crawler
+                                  clicks through the page layout.
+        block_third_party (bool): Abort requests to hosts outside
+                                  `allowed_domain` (analytics, ads).
+        allowed_domain (str): First-party domain of the crawled site.
+    """
+    headless: bool = True
+    block_images: bool = True
+    block_fonts: bool = True
+    block_media: bool = True
+    block_stylesheets: bool = False
+    block_third_party: bool = True
+    allowed_domain: str = 'kuwo.cn'
+
+    def blocked_patterns(self) -> list[str]:
+        """Returns the URL patterns Chrome should not load."""
+        patterns = []
+        if self.block_images:
+            patterns += IMAGE_PATTERNS
+        if self.block_fonts:
+            patterns += FONT_PATTERNS
+        if self.block_media:
+            patterns += MEDIA_PATTERNS
+        if self.block_stylesheets:
+            patterns += STYLESHEET_PATTERNS
+        return patterns
+
+    def third_party_scope(self) -> str:
+        """
+        Returns a regular expression matching third-party URLs.
+
+        The host must be the allowed domain or one of its subdomains,
+        matched label by label, so lookalikes such as 'evilkuwo.cn'
+        or 'kuwo.cn.example.com' are third-party.
+        """
+        domain = re.escape(self.allowed_domain)
+        return rf'^https?://(?!(?:[\w-]+\.)*{domain}(?::\d+)?(?:[/?#]|$))'
+
+# Crawler profiles: the singer crawler clicks through the listing
+# and needs the layout, the song crawler only loads the play page
+FULL_PROFILE = BrowserProfile(
+    headless = False, block_images = False, block_fonts = False,
+    block_media = False, block_third_party = False
+)
+SINGER_PROFILE = BrowserProfile()
+SONG_PROFILE = BrowserProfile(block_stylesheets = True)
+
+def create_driver(profile: BrowserProfile = SINGER_PROFILE) -> webdriver.Chrome:
+    """
+    Launches a Chrome driver configured by a profile.
+
+    Images are disabled through Chrome preferences, other resource
+    types through the DevTools blocked URL list, and third-party
+    requests are aborted by a selenium-wire request interceptor. A
+    ResponseCapture created afterwards adds its endpoints to the
+    third-party scope rather than replacing it.
+
+    Args:
+        profile (BrowserProfile): How to configure the browser.
+
+    Returns:
+        webdriver.Chrome: The configured driver.
+    """
+    # Configure Chrome browser options for scraping
+    chrome_options = webdriver.ChromeOptions()
+    if profile.headless:
+        chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920x1080")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--mute-audio")
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    if profile.block_images:
+        chrome_options.add_experimental_option(
+            'prefs', {'profile.managed_default_content_settings.images': 2}
+        )
+
+    driver = webdriver.Chrome(options = chrome_options)
+
+    patterns = profile.blocked_patterns()
+    if patterns:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+    if profile.block_third_party:
+        third_party = re.compile(profile.third_party_scope())
+
+        def abort_third_party(request):
+            """Aborts requests leaving the crawled site."""
+            if third_party.match(request.url):
+                request.abort()
+
+        driver.scopes = [third_party.pattern]
+        driver.request_interceptor = abort_third_party
+
+    return driver
+
+def measure_page(driver: webdriver.Chrome, url: str) -> dict:
+    """
+    Loads a page and reads its load time and transferred bytes
+    from the browser's Performance API.
+
+    Args:
+        driver (webdriver.Chrome): Driver to load the page with.
+        url (str): Page to load.
+
+    Returns:
+        dict: Load time in milliseconds, transferred bytes
+              and number of loaded resources.
+    """
+    driver.get(url)
+    return driver.execute_script("""
+        const nav = performance.getEntriesByType('navigation')[0];
+        const resources = performance.getEntriesByType('resource');
+        let bytes = nav ? nav.transferSize : 0;
+        for (const entry of resources) {
+            bytes += entry.transferSize;
+        }
+        return {
+            load_ms: nav ? nav.loadEventEnd - nav.startTime : 0,
+            bytes: bytes,
+            resources: resources.length
+        };
+    """)
+
+if __name__ == '__main__':
+    # Compare an unrestricted browser with the crawler profiles, e.g.
+    # python crawler_browser.py https://www.kuwo.cn/play_detail/100062
+    target_url = sys.argv[1] if len(sys.argv) > 1 else \
+        'https://www.kuwo.cn/singers'
+
+    results = {}
+    for profile_name, profile in (
+        ('full', FULL_PROFILE),
+        ('singer', SINGER_PROFILE),
+        ('song', SONG_PROFILE),
+    ):
+        driver = create_driver(profile)
+        try:
+            # The first load warms DNS and the proxy certificate
+            measure_page(driver, target_url)
+            results[profile_name] = measure_page(driver, target_url)
+        finally:
+            driver.quit()
+
+    print(json.dumps(results, indent = 4))
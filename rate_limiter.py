@@ -0,0 +1,164 @@
+from multiprocessing.managers import BaseManager
+import math
+import threading
+import time
+
+# Outcomes reported back to the limiter after each request
+OK = 'ok'
+TIMEOUT = 'timeout'
+THROTTLED = 'throttled'
+EMPTY = 'empty'
+
+def classify_status(status: int | None) -> str:
+    """
+    Maps an HTTP status code to a limiter outcome.
+
+    Args:
+        status (int | None): Status code, None if there was no response.
+
+    Returns:
+        str: THROTTLED for 429 and 5xx, TIMEOUT without a response,
+             OK otherwise.
+    """
+    if status is None:
+        return TIMEOUT
+    if status == 429 or status >= 500:
+        return THROTTLED
+    return OK
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose rate and concurrency window adapt AIMD-style.
+
+    Every healthy outcome adds `increase` requests per second to the
+    rate and grows the concurrency window by about one slot per window
+    of successes; every timeout, throttling status or empty payload
+    multiplies both by `decrease` and pauses growth for `cooldown`
+    seconds. A burst of failures from requests that were already in
+    flight only counts as one decrease per second.
+
+    Thread-safe; share one instance between the threads of a crawler,
+    or serve it with `LimiterManager` to share it between processes.
+
+    Attributes:
+        min_rate (float): Lowest rate, in requests per second.
+        max_rate (float): Highest rate, in requests per second.
+        max_concurrency (int): Largest concurrency window.
+    """
+    def __init__(
+        self,
+        rate: float = 1.0,
+        min_rate: float = 0.2,
+        max_rate: float = 10.0,
+        concurrency: int = 2,
+        max_concurrency: int = 8,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        cooldown: float = 10.0
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self._rate = rate
+        self._window = float(concurrency)
+        self._increase = increase
+        self._decrease = decrease
+        self._cooldown = cooldown
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._active = 0
+        self._growth_after = 0.0
+        self._last_decrease = float('-inf')
+        self._outcomes: dict[str, int] = {}
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float):
+        """Adds the tokens earned since the last update, at most one."""
+        self._tokens = min(
+            1.0, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """
+        Blocks until a token and a concurrency slot are available.
+
+        Args:
+            timeout (float | None): Maximum number of seconds to block.
+
+        Returns:
+            bool: Whether a slot was acquired; release() it afterwards.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                has_slot = self._active < math.floor(self._window)
+                if has_slot and self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self._active += 1
+                    return True
+
+                # Sleep until the next token, or until a slot is released
+                wait = (1.0 - self._tokens) / self._rate if has_slot else None
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return False
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._condition.wait(wait)
+
+    def release(self, outcome: str = OK):
+        """
+        Frees a slot and adapts rate and concurrency to the outcome.
+
+        Args:
+            outcome (str): OK, TIMEOUT, THROTTLED or EMPTY.
+        """
+        with self._condition:
+            now = time.monotonic()
+            self._active = max(0, self._active - 1)
+            self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+
+            if outcome == OK:
+                if now >= self._growth_after:
+                    self._rate = min(self.max_rate, self._rate + self._increase)
+                    self._window = min(
+                        float(self.max_concurrency),
+                        self._window + 1.0 / self._window
+                    )
+            elif now - self._last_decrease >= 1.0:
+                self._last_decrease = now
+                self._growth_after = now + self._cooldown
+                self._rate = max(self.min_rate, self._rate * self._decrease)
+                self._window = max(1.0, self._window * self._decrease)
+            self._condition.notify_all()
+
+    def state(self) -> dict:
+        """
+        Returns the current rate, window and outcome counts.
+
+        Returns:
+            dict: 'rate', 'concurrency', 'active' and 'outcomes'.
+        """
+        with self._condition:
+            return {
+                'rate': round(self._rate, 3),
+                'concurrency': math.floor(self._window),
+                'active': self._active,
+                'outcomes': dict(self._outcomes),
+            }
+
+class LimiterManager(BaseManager):
+    """
+    Serves one AdaptiveRateLimiter to several worker processes.
+
+    Usage:
+        manager = LimiterManager()
+        manager.start()
+        limiter = manager.AdaptiveRateLimiter(rate = 2.0)
+        # pass `limiter` to multiprocessing.Process arguments
+    """
+
+LimiterManager.register('AdaptiveRateLimiter', AdaptiveRateLimiter)
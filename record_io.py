@@ -0,0 +1,161 @@
+from contextlib import contextmanager
+import json
+import os
+import threading
+
+def encode_record(record: dict, compact: bool = False) -> bytes:
+    """
+    Encodes a profile as UTF-8 JSON.
+
+    Args:
+        record (dict): The profile as plain data.
+        compact (bool): Drop indentation and spaces after separators,
+                        which makes lyric-heavy records noticeably smaller.
+
+    Returns:
+        bytes: The encoded record.
+    """
+    if compact:
+        text = json.dumps(record, ensure_ascii = False, separators = (',', ':'))
+    else:
+        text = json.dumps(record, ensure_ascii = False, indent = 4)
+    return text.encode('utf-8')
+
+def _temp_path(path: str) -> str:
+    """Returns a temporary name next to `path`, unique per thread."""
+    return f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+@contextmanager
+def atomic_open(path: str, mode: str = 'wb', fsync: bool = True):
+    """
+    Opens a temporary file that replaces `path` once the block succeeds.
+
+    Readers see either the old file or the complete new one, never a
+    partially written file; if the block fails the temporary file is
+    removed and `path` is left untouched.
+
+    Args:
+        path (str): Final location of the file.
+        mode (str): Write mode of the temporary file, 'wb' or 'w'.
+        fsync (bool): Flush the data to disk before renaming, and the
+                      rename once done.
+    """
+    temp_path = _temp_path(path)
+    encoding = None if 'b' in mode else 'utf-8'
+    try:
+        with open(temp_path, mode, encoding = encoding) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        if fsync:
+            _fsync_directory(os.path.dirname(path))
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def atomic_write(path: str, data: bytes, fsync: bool = True):
+    """
+    Writes `data` to `path` through a temporary file and a rename.
+
+    Args:
+        path (str): Final location of the file.
+        data (bytes): Complete content of the file.
+        fsync (bool): Flush the data to disk before renaming, and the
+                      rename once done.
+    """
+    with atomic_open(path, 'wb', fsync) as f:
+        f.write(data)
+
+class BatchWriter:
+    """
+    Buffers encoded records and writes them atomically in batches.
+
+    A flush writes and syncs every buffered record to its temporary
+    file, renames them into place, then syncs each parent directory
+    once for the whole batch, so the renames are durable too. Records
+    still in the buffer when the process dies are lost, but never
+    half-written; records of a failed flush stay buffered.
+
+    Thread-safe, so crawler threads can share one writer. Use it as a
+    context manager or call `flush()` before exiting.
+
+    Attributes:
+        batch_size (int): Buffered records that trigger a flush.
+        compact (bool): Encoding used by profiles saved through the writer.
+    """
+    def __init__(self, batch_size: int = 100, compact: bool = False):
+        self.batch_size = batch_size
+        self.compact = compact
+        self._pending: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def add(self, path: str, data: bytes):
+        """
+        Buffers a file write, replacing an earlier one to the same path.
+
+        Args:
+            path (str): Final location of the file.
+            data (bytes): Complete content of the file.
+        """
+        with self._lock:
+            self._pending[path] = data
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        """Writes every buffered record to disk."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        """
+        Writes the buffer; the caller holds the lock.
+
+        The buffer is only cleared once every record is in place, so a
+        failed flush keeps the records for the next one.
+        """
+        if not self._pending:
+            return
+        written = []
+        try:
+            for path, data in self._pending.items():
+                temp_path = _temp_path(path)
+                with open(temp_path, 'wb') as f:
+                    written.append((temp_path, path))
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+            for temp_path, path in written:
+                os.replace(temp_path, path)
+            for directory in {os.path.dirname(path) for _, path in written}:
+                _fsync_directory(directory)
+        except BaseException:
+            for temp_path, _ in written:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            raise
+        self._pending.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+def _fsync_directory(directory: str):
+    """
+    Makes the renames inside `directory` durable.
+
+    Windows cannot open a directory for syncing and commits renames on
+    its own, so nothing is done there.
+    """
+    if os.name == 'nt':
+        return
+    fd = os.open(directory or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,343 @@
+from record_io import BatchWriter, atomic_write, encode_record
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+# Define the folder of each record kind in the folder layout
+FOLDER_ROOTS = {
+    'song': './Song/',
+    'singer': './Singer/',
+}
+
+# Define the default location of the single-file store
+store_path = './Store/records.sqlite3'
+
+# Define the backend profiles are saved to and read from,
+# 'folder' (one folder per id) or 'sqlite' (one file for everything)
+backend = os.environ.get('KUWO_STORE', 'folder')
+
+# Picture extensions looked up in the folder layout
+PICTURE_EXTENSIONS = ('jpg', 'png', 'jpeg', 'gif', 'webp')
+
+class FolderStore:
+    """
+    Records as `<root>/<id>/data.json` with the picture next to it,
+    the layout written by the crawlers and read by the import commands.
+
+    Attributes:
+        root (str): Folder holding one sub-folder per id.
+    """
+    def __init__(self, root: str):
+        self.root = root
+
+    def _folder(self, id: int) -> str:
+        return os.path.join(self.root, str(id))
+
+    def ids(self) -> list[int]:
+        """Returns the ids of every stored record, in ascending order."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            int(entry.name) for entry in os.scandir(self.root)
+            if entry.name.isdigit()
+            and os.path.exists(os.path.join(entry.path, 'data.json'))
+        )
+
+    def load(self, id: int) -> dict | None:
+        """Reads one record, None if it does not exist."""
+        path = os.path.join(self._folder(id), 'data.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding = 'utf-8') as f:
+            return json.load(f)
+
+    def records(self):
+        """
+        Iterates over every record.
+
+        Yields:
+            tuple[int, dict]: Id and record, in ascending id order.
+        """
+        for id in self.ids():
+            record = self.load(id)
+            if record is not None:
+                yield id, record
+
+    def save(
+        self,
+        id: int,
+        record: dict,
+        compact: bool = False,
+        writer: BatchWriter | None = None
+    ):
+        """
+        Writes one record atomically.
+
+        Args:
+            id (int): Id of the record.
+            record (dict): The record.
+            compact (bool): Write compact JSON instead of indented JSON.
+            writer (BatchWriter | None): Buffer the write in a batch writer.
+        """
+        os.makedirs(self._folder(id), exist_ok = True)
+        path = os.path.join(self._folder(id), 'data.json')
+        if writer is not None:
+            writer.add(path, encode_record(record, writer.compact))
+        else:
+            atomic_write(path, encode_record(record, compact))
+
+    def save_picture(self, id: int, extension: str, data: bytes):
+        """Writes the picture of a record as `pic.<extension>`."""
+        os.makedirs(self._folder(id), exist_ok = True)
+        path = os.path.join(self._folder(id), f'pic.{extension}')
+        atomic_write(path, data, fsync = False)
+
+    def picture(self, id: int) -> tuple[str, bytes] | None:
+        """Reads the picture of a record as (extension, data)."""
+        for extension in PICTURE_EXTENSIONS:
+            path = os.path.join(self._folder(id), f'pic.{extension}')
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    return extension, f.read()
+        return None
+
+    def close(self):
+        """Nothing to release for the folder layout."""
+
+class SQLiteStore:
+    """
+    Records and pictures of one kind in a single SQLite file.
+
+    Records are kept in primary key order, so enumerating or loading
+    the whole corpus is one sequential scan instead of thousands of
+    directory lookups and file opens. Song and singer stores can share
+    the same file. The connection is shared by all threads.
+
+    Attributes:
+        path (str): Location of the SQLite database file.
+        kind (str): Record kind, 'song' or 'singer'.
+    """
+    def __init__(self, path: str, kind: str):
+        self.path = path
+        self.kind = kind
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread = False)
+        with self._conn:
+            self._conn.execute('PRAGMA journal_mode = WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS records ('
+                'kind TEXT NOT NULL, id INTEGER NOT NULL, data TEXT NOT NULL, '
+                'PRIMARY KEY (kind, id)) WITHOUT ROWID'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS pictures ('
+                'kind TEXT NOT NULL, id INTEGER NOT NULL, '
+                'extension TEXT NOT NULL, data BLOB NOT NULL, '
+                'PRIMARY KEY (kind, id))'
+            )
+
+    def ids(self) -> list[int]:
+        """Returns the ids of every stored record, in ascending order."""
+        with self._lock:
+            return [
+                id for (id,) in self._conn.execute(
+                    'SELECT id FROM records WHERE kind = ? ORDER BY id',
+                    (self.kind,)
+                )
+            ]
+
+    def load(self, id: int) -> dict | None:
+        """Reads one record, None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM records WHERE kind = ? AND id = ?',
+                (self.kind, id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def records(self):
+        """
+        Iterates over every record with one sequential scan.
+
+        Yields:
+            tuple[int, dict]: Id and record, in ascending id order.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, data FROM records WHERE kind = ? ORDER BY id',
+                (self.kind,)
+            ).fetchall()
+        for id, data in rows:
+            yield id, json.loads(data)
+
+    def save(
+        self,
+        id: int,
+        record: dict,
+        compact: bool = True,
+        writer = None
+    ):
+        """
+        Writes one record in its own transaction.
+
+        Args:
+            id (int): Id of the record.
+            record (dict): The record.
+            compact (bool): Accepted for symmetry, records are always
+                            stored compactly.
+            writer: Ignored, SQLite commits are already atomic.
+        """
+        self.save_many([(id, record)])
+
+    def save_many(self, records):
+        """
+        Writes many records in one transaction.
+
+        Args:
+            records (Iterable[tuple[int, dict]]): Ids and records.
+        """
+        rows = [
+            (self.kind, id, encode_record(record, True).decode('utf-8'))
+            for id, record in records
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO records VALUES (?, ?, ?)', rows
+            )
+
+    def save_picture(self, id: int, extension: str, data: bytes):
+        """Stores the picture of a record."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pictures VALUES (?, ?, ?, ?)',
+                (self.kind, id, extension, data)
+            )
+
+    def picture(self, id: int) -> tuple[str, bytes] | None:
+        """Reads the picture of a record as (extension, data)."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT extension, data FROM pictures '
+                'WHERE kind = ? AND id = ?',
+                (self.kind, id)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def close(self):
+        """Closes the underlying database connection."""
+        self._conn.close()
+
+_stores: dict[tuple[str, str, int], FolderStore | SQLiteStore] = {}
+_stores_lock = threading.Lock()
+
+def get_store(
+    kind: str,
+    store_backend: str | None = None
+) -> FolderStore | SQLiteStore:
+    """
+    Returns the store of a record kind, shared by the threads of a
+    process; worker processes open their own connection.
+
+    Args:
+        kind (str): 'song' or 'singer'.
+        store_backend (str | None): 'folder' or 'sqlite',
+                                    the module's `backend` if None.
+
+    Returns:
+        FolderStore | SQLiteStore: The store, created on first use.
+    """
+    store_backend = store_backend or backend
+    with _stores_lock:
+        key = (kind, store_backend, os.getpid())
+        if key not in _stores:
+            if store_backend == 'folder':
+                _stores[key] = FolderStore(FOLDER_ROOTS[kind])
+            elif store_backend == 'sqlite':
+                _stores[key] = SQLiteStore(store_path, kind)
+            else:
+                raise ValueError(f'Unknown storage backend: {store_backend}')
+        return _stores[key]
+
+def migrate(
+    kind: str,
+    source: FolderStore | SQLiteStore,
+    target: FolderStore | SQLiteStore,
+    pictures: bool = True,
+    batch_size: int = 500
+) -> int:
+    """
+    Copies every record (and picture) of one kind between stores.
+
+    Args:
+        kind (str): 'song' or 'singer', for progress messages.
+        source (FolderStore | SQLiteStore): Store to read from.
+        target (FolderStore | SQLiteStore): Store to write to.
+        pictures (bool): Also copy the pictures.
+        batch_size (int): Records written per transaction or sync.
+
+    Returns:
+        int: Number of records copied.
+    """
+    copied = 0
+    batch = []
+
+    def write_batch():
+        if isinstance(target, SQLiteStore):
+            target.save_many(batch)
+        else:
+            with BatchWriter(batch_size = len(batch)) as writer:
+                for id, record in batch:
+                    target.save(id, record, writer = writer)
+        batch.clear()
+
+    for id, record in source.records():
+        batch.append((id, record))
+        if pictures:
+            picture = source.picture(id)
+            if picture is not None:
+                target.save_picture(id, *picture)
+        copied += 1
+        if len(batch) >= batch_size:
+            write_batch()
+            print(f'{kind}: {copied} records copied')
+    if batch:
+        write_batch()
+    print(f'{kind}: {copied} records copied')
+    return copied
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description = 'Copy records between the folder layout '
+                      'and the single-file SQLite store.'
+    )
+    parser.add_argument('source', choices = ('folder', 'sqlite'))
+    parser.add_argument('target', choices = ('folder', 'sqlite'))
+    parser.add_argument(
+        '--kind', choices = ('song', 'singer', 'all'), default = 'all'
+    )
+    parser.add_argument(
+        '--store', default = store_path,
+        help = 'Location of the SQLite store'
+    )
+    parser.add_argument(
+        '--no-pictures', dest = 'pictures', action = 'store_false',
+        help = 'Copy the records only'
+    )
+    args = parser.parse_args()
+    if args.source == args.target:
+        parser.error('source and target must differ')
+
+    store_path = args.store
+    kinds = ('singer', 'song') if args.kind == 'all' else (args.kind,)
+    for kind in kinds:
+        migrate(
+            kind,
+            get_store(kind, args.source),
+            get_store(kind, args.target),
+            pictures = args.pictures
+        )
@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+import time
+
+# Define the location of the record stream read by `import_stream`;
+# set KUWO_STREAM to publish every saved profile, unset disables it
+stream_path = os.environ.get('KUWO_STREAM') or None
+
+class RecordStream:
+    """
+    Append-only JSON Lines stream of saved profiles.
+
+    Every line holds one record with its kind, id and publication time:
+    `{"kind": "song", "id": 1, "time": ..., "record": {...}}`. Lines
+    are written with a single append, so threads and worker processes
+    can publish to the same file without interleaving.
+
+    Attributes:
+        path (str): Location of the JSON Lines file.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()
+
+    def publish(self, kind: str, record: dict):
+        """
+        Appends one record to the stream.
+
+        Args:
+            kind (str): 'song' or 'singer'.
+            record (dict): The profile as saved by save_to_local.
+        """
+        line = json.dumps(
+            {
+                'kind': kind,
+                'id': record['id'],
+                'time': time.time(),
+                'record': record,
+            },
+            ensure_ascii = False
+        ) + '\n'
+        with self._lock:
+            os.write(self._fd, line.encode('utf-8'))
+
+    def close(self):
+        """Closes the stream file."""
+        os.close(self._fd)
+
+_streams: dict[tuple[str, int], RecordStream] = {}
+_streams_lock = threading.Lock()
+
+def publish(kind: str, record: dict):
+    """
+    Publishes a saved profile to the record stream, if one is configured.
+
+    Args:
+        kind (str): 'song' or 'singer'.
+        record (dict): The profile as saved by save_to_local.
+    """
+    if stream_path is None:
+        return
+    with _streams_lock:
+        key = (stream_path, os.getpid())
+        if key not in _streams:
+            _streams[key] = RecordStream(stream_path)
+        stream = _streams[key]
+    stream.publish(kind, record)
@@ -0,0 +1,167 @@
+from dataclasses import dataclass
+from urllib.parse import parse_qs, urlsplit
+from seleniumwire import webdriver
+from response_decoder import decode_response
+from crawl_metrics import CrawlMetrics
+from contextlib import nullcontext
+import re
+import threading
+
+@dataclass(frozen = True)
+class Endpoint:
+    """
+    A kuwo API endpoint whose responses are worth keeping.
+
+    Attributes:
+        kind (str): Name the decoded responses are stored under.
+        pattern (str): Regular expression matching the request URL.
+        key_param (str): Query parameter identifying the item
+                         (singer id, song id or page number).
+    """
+    kind: str
+    pattern: str
+    key_param: str
+
+# API endpoints used by the singer and song crawlers
+ENDPOINTS: tuple[Endpoint, ...] = (
+    Endpoint(
+        'artist_list', r'wapi\.kuwo\.cn/api/www/artist/artistInfo\?', 'pn'
+    ),
+    Endpoint(
+        'artist_info', r'kuwo\.cn/api/www/artist/artist\?', 'artistid'
+    ),
+    Endpoint(
+        'artist_music', r'kuwo\.cn/api/www/artist/artistMusic\?', 'artistid'
+    ),
+    Endpoint('lyric', r'/getlyric\?', 'musicId'),
+    Endpoint('comment', r'comment\.kuwo\.cn/.*type=get_rec_comment', 'sid'),
+)
+
+class ResponseCapture:
+    """
+    Records decoded responses of the API endpoints of interest.
+
+    The capture adds those endpoints to `driver.scopes`, keeping any
+    scope set up by the browser profile: with third-party blocking, those
+    requests are also in scope, so the request interceptor can abort them.
+    Other first-party assets stay out of scope and are neither stored nor
+    inspected. Every matching API response is decoded exactly once in a
+    response interceptor; crawlers then look responses up by endpoint
+    kind and item id instead of scanning `driver.requests`.
+
+    Attributes:
+        endpoints (tuple[Endpoint, ...]): Endpoints being recorded.
+        metrics (CrawlMetrics | None): Receives the 'decode' spans.
+    """
+    def __init__(
+        self,
+        driver: webdriver.Chrome,
+        endpoints: tuple[Endpoint, ...] = ENDPOINTS,
+        metrics: CrawlMetrics | None = None
+    ):
+        self.endpoints = endpoints
+        self.metrics = metrics
+        self._patterns = [
+            (endpoint, re.compile(endpoint.pattern)) for endpoint in endpoints
+        ]
+        self._responses: dict[tuple[str, int | str | None], object] = {}
+        self._statuses: dict[tuple[str, int | str | None], int] = {}
+        self._lock = threading.Lock()
+        # Notified whenever a response is recorded
+        self._arrived = threading.Condition(self._lock)
+        self._driver = driver
+
+        # Keep scopes set up by the browser profile, e.g. for blocking
+        driver.scopes = list(driver.scopes) + [
+            endpoint.pattern for endpoint in endpoints
+        ]
+        driver.response_interceptor = self._intercept
+
+    def _intercept(self, request, response):
+        """Stores the decoded body of an in-scope API response."""
+        for endpoint, pattern in self._patterns:
+            if pattern.search(request.url):
+                break
+        else:
+            return
+
+        query = parse_qs(urlsplit(request.url).query)
+        values = query.get(endpoint.key_param)
+        key = values[0] if values else None
+        if key is not None and key.isdigit():
+            key = int(key)
+
+        try:
+            with (
+                self.metrics.measure('decode') if self.metrics
+                else nullcontext()
+            ):
+                data = decode_response(response.body, response.headers)
+        except ValueError:
+            # Truncated or non-JSON body, e.g. an error page; it still
+            # counts as arrived so waiters can react to its status
+            data = None
+
+        with self._arrived:
+            self._responses[(endpoint.kind, key)] = data
+            self._statuses[(endpoint.kind, key)] = response.status_code
+            self._arrived.notify_all()
+
+    def get(self, kind: str, key: int | str | None):
+        """
+        Looks up a decoded response.
+
+        Args:
+            kind (str): Endpoint kind, e.g. 'lyric'.
+            key (int | str | None): Value of the endpoint's key parameter.
+
+        Returns:
+            The parsed JSON document, or None if it was not captured.
+        """
+        with self._lock:
+            return self._responses.get((kind, key))
+
+    def status(self, kind: str, key: int | str | None) -> int | None:
+        """
+        Looks up the HTTP status of a captured response.
+
+        Args:
+            kind (str): Endpoint kind, e.g. 'lyric'.
+            key (int | str | None): Value of the endpoint's key parameter.
+
+        Returns:
+            int | None: The status code, or None if nothing arrived.
+        """
+        with self._lock:
+            return self._statuses.get((kind, key))
+
+    def wait_for(
+        self,
+        kind: str,
+        key: int | str | None,
+        timeout: float = 10.0
+    ):
+        """
+        Blocks until a response is captured, returning as soon as it lands.
+
+        Args:
+            kind (str): Endpoint kind, e.g. 'lyric'.
+            key (int | str | None): Value of the endpoint's key parameter.
+            timeout (float): Maximum number of seconds to wait.
+
+        Returns:
+            The parsed JSON document, or None if it did not arrive in time
+            or could not be decoded.
+        """
+        with self._arrived:
+            self._arrived.wait_for(
+                lambda: (kind, key) in self._responses, timeout
+            )
+            return self._responses.get((kind, key))
+
+    def clear(self):
+        """Forgets every recorded response, including selenium-wire's."""
+        with self._lock:
+            self._responses.clear()
+            self._statuses.clear()
+        del self._driver.requests
@@ -0,0 +1,289 @@
+from collections import Counter
+from dataclasses import dataclass
+import os
+import re
+import sqlite3
+from pypinyin import pinyin, Style
+from segmentation import text_hash
+
+# Define the default location of the rhyme feature database
+cache_path = './Cache/rhyme.sqlite3'
+
+# Define a normalization map for finals (using a moderately expanded version)
+YUNMU_NORMALIZATION = {
+    # Nasal ending -ang series
+    'ang': 'ang_rhyme', 'iang': 'ang_rhyme', 'uang': 'ang_rhyme',
+    # Nasal ending -an series
+    'an': 'an_rhyme', 'ian': 'an_rhyme', 'uan': 'an_rhyme',
+    # Nasal ending -eng series
+    'eng': 'eng_rhyme', 'ing': 'eng_rhyme', 'ueng': 'eng_rhyme',
+    # Nasal ending -ong series
+    'ong': 'ong_rhyme', 'iong': 'ong_rhyme',
+    # Nasal ending -en series
+    'en': 'en_rhyme', 'in': 'en_rhyme', 'uen': 'en_rhyme', 'un': 'en_rhyme',
+
+    # Main vowels and compound finals
+    'a': 'a_rhyme', 'ia': 'a_rhyme', 'ua': 'a_rhyme',
+    'o': 'o_rhyme', 'uo': 'o_rhyme',
+    'e': 'e_rhyme', 'ie': 'e_rhyme', 'ue': 'e_rhyme',
+    'i': 'i_rhyme', 'v': 'i_rhyme', # 'v' is the pinyin representation for 'ü'
+    'u': 'u_rhyme',
+
+    # Compound finals -ao series
+    'ao': 'ao_rhyme', 'iao': 'ao_rhyme',
+    # Compound finals -ou series
+    'ou': 'ou_rhyme', 'iou': 'ou_rhyme', 'iu': 'ou_rhyme',
+    # Compound finals -ai series
+    'ai': 'ai_rhyme', 'uai': 'ai_rhyme',
+    # Compound finals -ei series
+    'ei': 'ei_rhyme', 'uei': 'ei_rhyme', 'ui': 'ei_rhyme',
+
+    'er': 'er_rhyme', # Erhua rhyme
+}
+
+@dataclass
+class RhymeFeatures:
+    """
+    Rhyme statistics of a single song.
+
+    Attributes:
+        song_id (int): kuwo_id of the song.
+        lyric_hash (str): Hash of the lyrics the features were computed from.
+        line_count (int): Number of lyric lines after cleaning.
+        chinese_ratio (float): Proportion of Chinese characters.
+        overall_repetition (float): sum(count - 1 for repeated finals) / total.
+        max_dominance (float): Count of the most common final / total.
+    """
+    song_id: int = -1
+    lyric_hash: str = ''
+    line_count: int = 0
+    chinese_ratio: float = 0.0
+    overall_repetition: float = 0.0
+    max_dominance: float = 0.0
+
+def is_chinese(char: str) -> bool:
+    """Checks whether a character is a common Chinese character."""
+    return '一' <= char <= '龥'
+
+def clean_lyrics(lyrics: str) -> list[str]:
+    """
+    Cleans lyrics by removing lines containing colons,
+    content within parentheses, and empty lines.
+
+    Args:
+        lyrics (str): Raw lyrics of a song.
+
+    Returns:
+        list[str]: Processed lyric lines.
+    """
+    if not lyrics:
+        return []
+    cleaned_lines = []
+    for line in lyrics.split('\n'):
+        # Remove lines containing Chinese or English colons
+        if ':' not in line and '：' not in line:
+            # Remove parentheses and their content, e.g., "(lalala)"
+            line = re.sub(r'\(.*?\)', '', line)
+            line = re.sub(r'（.*?）', '', line)
+            cleaned_lines.append(line.strip())
+    # Filter out empty lines
+    return list(filter(None, cleaned_lines))
+
+def get_chinese_char_ratio(lyrics_lines: list[str]) -> float:
+    """
+    Calculates the proportion of Chinese characters in the lyrics.
+
+    Args:
+        lyrics_lines (list[str]): A list of cleaned lyric lines.
+
+    Returns:
+        float: Number of Chinese characters / Total non-whitespace
+               characters, 0 if there are none.
+    """
+    total_chars = 0
+    chinese_chars = 0
+    for line in lyrics_lines:
+        for char in line:
+            if not char.isspace():
+                total_chars += 1
+                if is_chinese(char):
+                    chinese_chars += 1
+    return chinese_chars / total_chars if total_chars > 0 else 0
+
+def last_chinese_char(line: str) -> str:
+    """Returns the last Chinese character of a line, or ''."""
+    for char in reversed(line):
+        if is_chinese(char):
+            return char
+    return ''
+
+def calculate_rhyme_scores(
+    cleaned_lyrics_lines: list[str],
+    finals: dict[str, str]
+) -> tuple[float, float]:
+    """
+    Calculates two rhyme scores for lyrics: overall repetition
+    and maximum final dominance.
+
+    Args:
+        cleaned_lyrics_lines (list[str]): Cleaned lyric lines.
+        finals (dict[str, str]): Character to normalized final table,
+            must cover the last Chinese character of every line.
+
+    Returns:
+        tuple[float, float]: (overall_repetition_score, max_dominance_score)
+    """
+    normalized_yunmus = []
+    for line in cleaned_lyrics_lines:
+        yunmu = finals.get(last_chinese_char(line), '')
+        if yunmu:
+            normalized_yunmus.append(yunmu)
+
+    if not normalized_yunmus:
+        return 0.0, 0.0
+
+    yunmu_counts = Counter(normalized_yunmus)
+    total_yunmus = len(normalized_yunmus)
+
+    sum_of_duplicates = sum(
+        count - 1 for count in yunmu_counts.values() if count > 1
+    )
+    max_count = max(yunmu_counts.values())
+    return sum_of_duplicates / total_yunmus, max_count / total_yunmus
+
+class RhymeStore:
+    """
+    SQLite-backed character→final table and per-song rhyme feature table.
+
+    The final table only ever grows: characters seen for the first time
+    are resolved with a single pypinyin call for the whole batch, every
+    other lookup is a dictionary access.
+
+    Attributes:
+        path (str): Location of the SQLite database file.
+        finals (dict[str, str]): In-memory copy of the final table.
+    """
+    def __init__(self, path: str = cache_path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+        self._conn = sqlite3.connect(path)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS finals ('
+                'char TEXT PRIMARY KEY, final TEXT NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS rhyme_features ('
+                'song_id INTEGER PRIMARY KEY, lyric_hash TEXT NOT NULL, '
+                'line_count INTEGER NOT NULL, chinese_ratio REAL NOT NULL, '
+                'overall_repetition REAL NOT NULL, '
+                'max_dominance REAL NOT NULL)'
+            )
+        self.finals: dict[str, str] = dict(
+            self._conn.execute('SELECT char, final FROM finals')
+        )
+
+    def ensure_finals(self, chars: set[str]):
+        """
+        Adds the normalized finals of unseen characters to the table.
+
+        Args:
+            chars (set[str]): Chinese characters that need a final.
+        """
+        missing = sorted(char for char in chars if char not in self.finals)
+        if not missing:
+            return
+
+        # A list input is treated as pre-segmented words, so every
+        # character is looked up on its own in one library call
+        raw_finals = pinyin(
+            missing, style = Style.FINALS, heteronym = False, strict = False
+        )
+        new_finals = {}
+        for char, raw in zip(missing, raw_finals):
+            raw_yunmu = raw[0] if raw else ''
+            new_finals[char] = YUNMU_NORMALIZATION.get(raw_yunmu, raw_yunmu)
+
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO finals (char, final) VALUES (?, ?)',
+                new_finals.items()
+            )
+        self.finals.update(new_finals)
+
+    def update_features(self, songs: dict[int, str]) -> int:
+        """
+        Recomputes rhyme features of new songs and songs whose lyrics
+        changed since the last run.
+
+        Args:
+            songs (dict[int, str]): Lyrics keyed by song id.
+
+        Returns:
+            int: Number of songs whose features were (re)computed.
+        """
+        known_hashes = dict(self._conn.execute(
+            'SELECT song_id, lyric_hash FROM rhyme_features'
+        ))
+
+        pending: list[tuple[int, str, list[str]]] = []
+        last_chars: set[str] = set()
+        for song_id, lyrics in songs.items():
+            lyric_hash = text_hash(lyrics or '')
+            if known_hashes.get(song_id) == lyric_hash:
+                continue
+            lines = clean_lyrics(lyrics)
+            pending.append((song_id, lyric_hash, lines))
+            for line in lines:
+                char = last_chinese_char(line)
+                if char:
+                    last_chars.add(char)
+
+        if not pending:
+            return 0
+
+        # Build the final table from the distinct characters of this batch
+        self.ensure_finals(last_chars)
+
+        rows = []
+        for song_id, lyric_hash, lines in pending:
+            overall, dominance = calculate_rhyme_scores(lines, self.finals)
+            rows.append((
+                song_id, lyric_hash, len(lines),
+                get_chinese_char_ratio(lines), overall, dominance
+            ))
+
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO rhyme_features VALUES '
+                '(?, ?, ?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+    def load_features(self) -> list[RhymeFeatures]:
+        """
+        Reads the whole feature table.
+
+        Returns:
+            list[RhymeFeatures]: Rhyme features of every known song.
+        """
+        return [
+            RhymeFeatures(*row)
+            for row in self._conn.execute(
+                'SELECT song_id, lyric_hash, line_count, chinese_ratio, '
+                'overall_repetition, max_dominance FROM rhyme_features'
+            )
+        ]
+
+    def close(self):
+        """Closes the underlying database connection."""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,195 @@
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import os
+import sqlite3
+import jieba
+
+# Define the default location of the persistent token cache
+cache_path = './Cache/tokens.sqlite3'
+
+# Texts shorter than this are segmented in-process,
+# a worker pool only pays off for larger batches
+PARALLEL_THRESHOLD = 64
+
+_dictionary_loaded: bool = False
+_default_cache = None
+
+def load_dictionary():
+    """
+    Loads jieba's dictionary once per process.
+
+    jieba loads its dictionary lazily on the first call to `cut`, which
+    costs about a second. Calling this up front (or as a process pool
+    initializer) moves that cost out of the first segmentation.
+    """
+    global _dictionary_loaded
+    if not _dictionary_loaded:
+        jieba.initialize()
+        _dictionary_loaded = True
+
+def text_hash(text: str) -> str:
+    """
+    Computes the cache key of a text.
+
+    Args:
+        text (str): The text to be segmented.
+
+    Returns:
+        str: SHA-1 hex digest of the UTF-8 encoded text.
+    """
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def _cut(text: str) -> list[str]:
+    """Segments a single text without touching the cache."""
+    load_dictionary()
+    return jieba.lcut(text)
+
+class TokenCache:
+    """
+    SQLite-backed store of token streams keyed by text hash.
+
+    Identical lyrics (covers, re-releases, repeated runs of the notebook)
+    share one entry, so each distinct text is segmented exactly once.
+
+    Attributes:
+        path (str): Location of the SQLite database file.
+    """
+    def __init__(self, path: str = cache_path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS tokens ('
+            'hash TEXT PRIMARY KEY, tokens TEXT NOT NULL)'
+        )
+        self._conn.commit()
+
+    def get_many(self, hashes: list[str]) -> dict[str, list[str]]:
+        """
+        Looks up cached token streams.
+
+        Args:
+            hashes (list[str]): Text hashes to look up.
+
+        Returns:
+            dict[str, list[str]]: Token streams of the hashes that are
+                                  present in the cache.
+        """
+        found: dict[str, list[str]] = {}
+        unique = list(set(hashes))
+        # Stay below SQLite's limit on bound parameters
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._conn.execute(
+                f'SELECT hash, tokens FROM tokens '
+                f'WHERE hash IN ({placeholders})',
+                chunk
+            )
+            for key, tokens in rows:
+                found[key] = json.loads(tokens)
+        return found
+
+    def put_many(self, entries: dict[str, list[str]]):
+        """
+        Stores token streams in one transaction.
+
+        Args:
+            entries (dict[str, list[str]]): Token streams keyed by text hash.
+        """
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO tokens (hash, tokens) VALUES (?, ?)',
+                [
+                    (key, json.dumps(tokens, ensure_ascii = False))
+                    for key, tokens in entries.items()
+                ]
+            )
+
+    def close(self):
+        """Closes the underlying database connection."""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def get_default_cache() -> TokenCache:
+    """Returns the process-wide cache opened on `cache_path`."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TokenCache(cache_path)
+    return _default_cache
+
+def segment_many(
+    texts: list[str],
+    workers: int | None = None,
+    cache: TokenCache | None = None
+) -> list[list[str]]:
+    """
+    Segments many texts, reusing cached results where possible.
+
+    Cache misses are deduplicated and, for large batches, segmented by a
+    process pool whose workers each load the dictionary once.
+
+    Args:
+        texts (list[str]): Texts to segment.
+        workers (int | None): Number of worker processes; defaults to
+                              the number of CPUs. 1 disables the pool.
+        cache (TokenCache | None): Cache to use, defaults to the cache
+                                   returned by `get_default_cache`.
+
+    Returns:
+        list[list[str]]: Token streams in the same order as `texts`.
+    """
+    if cache is None:
+        cache = get_default_cache()
+
+    hashes = [text_hash(text) for text in texts]
+    known = cache.get_many(hashes)
+
+    # Segment every distinct uncached text once
+    missing: dict[str, str] = {}
+    for key, text in zip(hashes, texts):
+        if key not in known:
+            missing[key] = text
+
+    if missing:
+        keys = list(missing.keys())
+        values = list(missing.values())
+        if workers == 1 or len(values) < PARALLEL_THRESHOLD:
+            results = [_cut(text) for text in values]
+        else:
+            with ProcessPoolExecutor(
+                max_workers = workers,
+                initializer = load_dictionary
+            ) as executor:
+                pool_size = workers or os.cpu_count() or 1
+                chunksize = max(1, len(values) // (pool_size * 4))
+                results = list(
+                    executor.map(_cut, values, chunksize = chunksize)
+                )
+        computed = dict(zip(keys, results))
+        cache.put_many(computed)
+        known.update(computed)
+
+    return [known[key] for key in hashes]
+
+def segment(text: str, cache: TokenCache | None = None) -> list[str]:
+    """
+    Segments a single text, reusing the cached result if there is one.
+
+    Args:
+        text (str): Text to segment.
+        cache (TokenCache | None): Cache to use, defaults to the cache
+                                   returned by `get_default_cache`.
+
+    Returns:
+        list[str]: The tokens, identical to `jieba.lcut(text)`.
+    """
+    return segment_many([text], workers = 1, cache = cache)[0]
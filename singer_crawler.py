@@ -1,14 +1,18 @@
-import json
 from Singer import SingerProfile
 from Song import SongProfile
+from response_capture import ResponseCapture
+from crawler_browser import create_driver, SINGER_PROFILE
+from crawl_metrics import CrawlMetrics
+from record_io import BatchWriter
+from rate_limiter import AdaptiveRateLimiter, classify_status, OK, EMPTY
 from dataclasses import fields
 from selenium.webdriver.common.by import By
 from seleniumwire import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
-import gzip
-import io
+import selenium.common.exceptions as exceptions
+import queue
+import threading
 
 # Extract field names from SingerProfile 
 # and SongProfile dataclass for data filtering
@@ -20,15 +24,44 @@ NORMAL_SINGER_NUM = 10
 PAGE_MAX = 3
 SINGER_NUM = 60
 
+# Number of browsers fetching singer details in parallel
+WORKERS = 4
+
+# Maximum number of seconds to wait for an element or an API response
+WAIT_TIMEOUT = 10
+
+# Attempts per singer before it is given up
+SINGER_ATTEMPTS = 3
+
 possible_extensions: list[str] = ['jpg', 'png', 'jpeg', 'gif', 'webp']
 
+# Set to a port to expose /metrics on localhost while crawling
+METRICS_PORT: int | None = None
+
+# Shared spans, counters and throughput of the crawl
+metrics = CrawlMetrics()
+
+def wait_until(driver: webdriver.Chrome, condition):
+    """
+    Waits until an expected condition holds, counting the time as waiting.
+
+    Args:
+        driver (webdriver.Chrome): Chrome driver to poll.
+        condition: A selenium expected condition.
+
+    Returns:
+        The value returned by the condition, usually the element.
+    """
+    with metrics.measure('wait'):
+        return WebDriverWait(driver, WAIT_TIMEOUT).until(condition)
+
 def get_singer_detail(
     id: int,
-    name: str,
-    page: int,
     song_num: int,
-    driver: webdriver.Chrome
-    ) -> SingerProfile:
+    driver: webdriver.Chrome,
+    capture: ResponseCapture,
+    regions: frozenset[str] | None = None
+    ) -> SingerProfile | None:
     """
     Scrape singer details from Kuwo Music
     using Selenium web automation.
@@ -36,183 +69,166 @@ def get_singer_detail(
     This function extracts detailed information about a specific singer 
     including their profile data and song list,
     and returns a structured SingerProfile object.
+    The singer's page is opened directly by id, so workers never
+    have to go back through the singers listing.
     
     Args:
         id (int): Target id of the singer
-        name (str): Target name of the singer
-        page (int): Target page number on the singers listing
-                    (1-based indexing)
         song_num (int): Maximum number of songs
                         to retrieve from the singer's catalog
         driver (webdriver.Chrome): Chrome driver to mimic real
-                                   human                
+                                   human
+        capture (ResponseCapture): Response capture attached to `driver`
+        regions (frozenset[str] | None): Only keep singers from these
+                                         regions, checked before any
+                                         song is saved
     Returns:
-        SingerProfile: Complete singer profile
-                       containing biographical information
-                       and a curated list of their songs
+        SingerProfile | None: Complete singer profile
+                              containing biographical information
+                              and a curated list of their songs,
+                              None if the singer's region is filtered out
     """
     
-    # Navigate to the specified page number
-    path = f'//li[@data-v-9fcc0c74][./span[text()="{page}"]]'
-    page_button = WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.XPATH, path))
-    )
-    driver.execute_script("arguments[0].scrollIntoView(true);", page_button)
-    time.sleep(0.5)
-    WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, path))
-            ).click()
-    time.sleep(1)
-    
-    # Clean former requests
-    if hasattr(driver, 'requests'):
-        del driver.requests
+    # Clean former responses
+    capture.clear()
     
     # Navigate to the singer's detailed profile page
-    artist_button_xpath = f'//span[text()="{name}"]'
-    artist_button = WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.XPATH, artist_button_xpath))
-    )
-    
-    driver.execute_script("arguments[0].scrollIntoView(true);", artist_button)
-    time.sleep(0.5)
-
-    WebDriverWait(driver, 10).until(
-        EC.element_to_be_clickable((By.XPATH, artist_button_xpath))
-    ).click()
-    time.sleep(1)
+    with metrics.measure('navigate'):
+        driver.get(f'https://www.kuwo.cn/singer_detail/{id}')
     
-    # Define API endpoints for detailed singer information
-    artist_info_substring = (
-        "kuwo.cn/api/www/artist/artist?artistid=" 
-        + str(id)
-        + '&'
-    )
-    music_info_substring = (
-        "kuwo.cn/api/www/artist/artistMusic?artistid=" 
-        + str(id)
-        +'&'
-    )
+    # Skip singers outside the wanted regions before saving their songs
+    if regions:
+        with metrics.measure('wait'):
+            artist_info = capture.wait_for('artist_info', id, WAIT_TIMEOUT)
+        if artist_info is None:
+            raise TimeoutError
+        if artist_info['data']['country'] not in regions:
+            return None
     
     # Initialize list to store the singer's songs
     song_list = []
     
-    # Extract song list from music API response
-    for request in driver.requests:
-        if music_info_substring in request.url:
-            with gzip.open(io.BytesIO(request.response.body), 'rb') as f:
-                decompressed_data = f.read().decode('utf-8')
-                datalist = json.loads(decompressed_data)['data']['list']
-                
-                # Collect song names from the API response
-                for i, song_data in enumerate(datalist):
-                    
-                    # Test whether the pic_end is legal
-                    pic_end = song_data['pic'].split('.')[-1]
-                    if(pic_end in possible_extensions):
-                        if i < song_num:
-                            song_list.append(song_data['rid'])
-                        
-                            # Filter data to include only fields defined
-                            # in SongProfile dataclass
-                            filtered_data = {
-                                key: value
-                                for key, value in song_data.items() 
-                                if key in target_song_keys
-                                }
-                        
-                            # Modify names
-                            filtered_data['id'] = song_data['rid']
-                        
-                            # Add orignal url of the song
-                            filtered_data['original_url'] = (
-                                'https://www.kuwo.cn/play_detail/'
-                                f'{song_data['rid']}'
-                            )
-                            
-                            # Ensure song's singer is correct
-                            filtered_data['artistid'] = id
-                        
-                            # Create the complete song profile object
-                            song_profile = SongProfile(**filtered_data)
-
-                            song_profile.save_to_local()
-                            song_profile.save_picture()
-                    else:
-                        # Choose another song
-                        song_num += 1
-                            
+    # The singer's songs are made durable together with one sync
+    writer = BatchWriter(batch_size = max(song_num, 1))
     
-    # Process detailed artist information and create SingerProfile object
-    for request in driver.requests:
-        if artist_info_substring in request.url:
-            with gzip.open(io.BytesIO(request.response.body), 'rb') as f:
-                decompressed_data = f.read().decode('utf-8')
-                data = json.loads(decompressed_data)['data']
-                
-                # Check whether the singer is needed
-                if data['id'] != id:
-                    raise TimeoutError
-                
-                # Clean up HTML entities in the biographical information
-                info = data['info'].replace('&nbsp;', ' ')
-                data['info'] = info
-                aartist = data['aartist'].replace('&nbsp;', ' ')
-                data['aartist'] = aartist
-                artist = data['name'].replace('&nbsp;', ' ')
-                data['name'] = artist
-                
-                # Filter data to include only fields defined
-                # in SingerProfile dataclass
-                filtered_data = {
-                    key: value
-                    for key, value in data.items() 
-                    if key in target_singer_keys
-                }
-                
-                filtered_data['song_list'] = song_list
+    # Extract song list from music API response as soon as it arrives
+    with metrics.measure('wait'):
+        music_info = capture.wait_for('artist_music', id, WAIT_TIMEOUT)
+    if music_info is not None:
+        datalist = music_info['data']['list']
+        
+        # Collect song names from the API response
+        for i, song_data in enumerate(datalist):
+            
+            # Test whether the pic_end is legal
+            pic_end = song_data['pic'].split('.')[-1]
+            if(pic_end in possible_extensions):
+                if i < song_num:
+                    song_list.append(song_data['rid'])
                 
-                # Add orignal url of the singer
-                filtered_data['original_url'] = (
-                    'https://www.kuwo.cn/singer_detail/'
-                    + str(id)
-                )
+                    # Filter data to include only fields defined
+                    # in SongProfile dataclass
+                    filtered_data = {
+                        key: value
+                        for key, value in song_data.items() 
+                        if key in target_song_keys
+                        }
                 
-                # Modify names
-                filtered_data['gender'] = data['gener']
-                filtered_data['height'] = data['tall']
-                filtered_data['region'] = data['country']
+                    # Modify names
+                    filtered_data['id'] = song_data['rid']
                 
-                # Create and return the complete singer profile object
-                singer_profile = SingerProfile(**filtered_data)
+                    # Add orignal url of the song
+                    filtered_data['original_url'] = (
+                        'https://www.kuwo.cn/play_detail/'
+                        f'{song_data['rid']}'
+                    )
+                    
+                    # Ensure song's singer is correct
+                    filtered_data['artistid'] = id
                 
-                driver.back()
-                time.sleep(1)
-                return singer_profile
+                    # Create the complete song profile object
+                    song_profile = SongProfile(**filtered_data)
+
+                    with metrics.measure('save'):
+                        song_profile.save_to_local(writer = writer)
+                    with metrics.measure('image'):
+                        song_profile.save_picture()
+            else:
+                # Choose another song
+                song_num += 1
+        
+        with metrics.measure('save'):
+            writer.flush()
+    
+    # Process detailed artist information and create SingerProfile object
+    with metrics.measure('wait'):
+        artist_info = capture.wait_for('artist_info', id, WAIT_TIMEOUT)
+    if artist_info is not None:
+        data = artist_info['data']
+        
+        # Check whether the singer is needed
+        if data['id'] != id:
+            raise TimeoutError
+        
+        # Clean up HTML entities in the biographical information
+        info = data['info'].replace('&nbsp;', ' ')
+        data['info'] = info
+        aartist = data['aartist'].replace('&nbsp;', ' ')
+        data['aartist'] = aartist
+        artist = data['name'].replace('&nbsp;', ' ')
+        data['name'] = artist
+        
+        # Filter data to include only fields defined
+        # in SingerProfile dataclass
+        filtered_data = {
+            key: value
+            for key, value in data.items() 
+            if key in target_singer_keys
+        }
+        
+        filtered_data['song_list'] = song_list
+        
+        # Add orignal url of the singer
+        filtered_data['original_url'] = (
+            'https://www.kuwo.cn/singer_detail/'
+            + str(id)
+        )
+        
+        # Modify names
+        filtered_data['gender'] = data['gener']
+        filtered_data['height'] = data['tall']
+        filtered_data['region'] = data['country']
+        
+        # Create and return the complete singer profile object
+        return SingerProfile(**filtered_data)
     
     raise TimeoutError
 
-def get_page_detail(page: int, driver: webdriver.Chrome) -> dict[int: str]:
+def get_page_detail(
+    page: int,
+    driver: webdriver.Chrome,
+    capture: ResponseCapture
+) -> dict[int: str]:
     """
     Navigates to a specific singer list page and extracts singer IDs and names.
 
     Args:
         page (int): The target page number to navigate to.
         driver (webdriver.Chrome): Chrome driver to mimic real human.
+        capture (ResponseCapture): Response capture attached to `driver`.
 
     Returns:
         dict[int: str]: A dictionary mapping singer IDs to their names.
     """
-    # Clean former requests
-    if hasattr(driver, 'requests'):
-        del driver.requests
+    # Clean former responses
+    capture.clear()
     
     # Navigate to the specified page number
     if page != 1:
         path = f'//li[@data-v-9fcc0c74][./span[text()="{page}"]]'
-        WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, path))
-            ).click()
+        wait_until(
+            driver, EC.element_to_be_clickable((By.XPATH, path))
+        ).click()
         
     else:
         # Workaround for page 1: navigate to page 2 first, then back to page 1
@@ -220,109 +236,259 @@ def get_page_detail(page: int, driver: webdriver.Chrome) -> dict[int: str]:
         # because direct navigation to page 1 doesn't trigger
         # the required API requests for data retrieval
         path = '//li[@data-v-9fcc0c74][./span[text()="2"]]'
-        WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, path))
-            ).click()
+        wait_until(
+            driver, EC.element_to_be_clickable((By.XPATH, path))
+        ).click()
         path = '//li[@data-v-9fcc0c74][./span[text()="1"]]'
-        WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, path))
-            ).click()
-    
-    time.sleep(1)    
-    
-    # Intercept and process API responses to extract singer information
-    api_substring = "wapi.kuwo.cn/api/www/artist/artistInfo"
+        wait_until(
+            driver, EC.element_to_be_clickable((By.XPATH, path))
+        ).click()
     
+    # Wait for the intercepted singer list of this page
     singer_dict = dict()
     
-    # Parse intercepted network requests to find singer list data
-    for request in driver.requests:
-        if api_substring in request.url:
-            # Decompress gzip-encoded response data
-            singer_dict.clear()
-            with gzip.open(io.BytesIO(request.response.body), 'rb') as f:
-                decompressed_data = f.read().decode('utf-8')
-                data = json.loads(decompressed_data)['data']['artistList']
-                
-                # Extract basic profile information for the target singer
-                # Note: This provides only preliminary data;
-                #       detailed info requires additional API calls
-                for profile in data:
-                    singer_dict[profile['id']] = profile['name']
+    with metrics.measure('wait'):
+        artist_list = capture.wait_for('artist_list', page, WAIT_TIMEOUT)
+    if artist_list is not None:
+        data = artist_list['data']['artistList']
+        
+        # Extract basic profile information for the target singer
+        # Note: This provides only preliminary data;
+        #       detailed info requires additional API calls
+        for profile in data:
+            singer_dict[profile['id']] = profile['name']
                   
     return singer_dict
     
 
-def start_crawler(start_page: int = 1, start_place: int = 0):
-    
+def collect_singers(
+    start_page: int,
+    driver: webdriver.Chrome,
+    capture: ResponseCapture
+) -> list[tuple[int, str, int]]:
     """
-    Initiates the web crawling process, iterating through pages and singers
-    to fetch detailed information. The program will terminate immediately
-    if any singer's data retrieval fails.
+    Listing phase: walks the singers listing and collects every singer
+    to crawl, without opening any detail page.
 
     Args:
-        start_page (int): The page number to begin crawling from (1-based).
-        start_place (int): The position of the singer on the starting page
-                           to begin crawling from (0-based).
-    """
+        start_page (int): The page number to begin from (1-based).
+        driver (webdriver.Chrome): Chrome driver showing the singers page.
+        capture (ResponseCapture): Response capture attached to `driver`.
 
+    Returns:
+        list[tuple[int, str, int]]: (id, name, page) of each singer,
+                                    in listing order.
+    """
+    singers = []
     for page in range(start_page, PAGE_MAX + 1):
-        
-        singer_dict = get_page_detail(page = page, driver = driver)
-        count = 0
-        
+        singer_dict = get_page_detail(
+            page = page, driver = driver, capture = capture
+        )
         for id, name in singer_dict.items():
-            
-            if count < start_place:
-                count += 1
-                continue
-            
-            song_num = 0
-            if page == 1:
-                song_num = POPULAR_SINGER_NUM
-            else:
-                song_num = NORMAL_SINGER_NUM
-        
+            singers.append((id, name, page))
+    return singers
+
+def crawl_singer(
+    id: int,
+    song_num: int,
+    driver: webdriver.Chrome,
+    capture: ResponseCapture,
+    regions: frozenset[str] | None = None
+) -> bool | None:
+    """
+    Detail phase for one singer: fetches and saves the profile,
+    the chosen songs and the pictures.
+
+    Args:
+        id (int): Target id of the singer.
+        song_num (int): Maximum number of songs to keep.
+        driver (webdriver.Chrome): Chrome driver of the worker.
+        capture (ResponseCapture): Response capture attached to `driver`.
+        regions (frozenset[str] | None): Only keep singers from these regions.
+
+    Returns:
+        bool | None: Whether the singer was saved,
+                     None if it was filtered out by region.
+    """
+    with metrics.item('singer', id):
+        try:
             singer_profile = get_singer_detail(
                 id = id,
-                name = name,
-                page = page,
                 song_num = song_num,
-                driver = driver
+                driver = driver,
+                capture = capture,
+                regions = regions
             )
-            
-            if singer_profile.id != -1:
-                singer_profile.save_to_local()
-                singer_profile.save_picture()
+        except (TimeoutError, KeyError, TypeError,
+                exceptions.WebDriverException) as error:
+            metrics.fail(type(error).__name__)
+            return False
 
-                print("page =", page, "place =", count, "successfully saved")
-                count += 1
-                
-            else:
-                # If the crawler failed to get right informaiton
-                raise RuntimeError
-        start_place = 0
+        if singer_profile is None:
+            metrics.count('filtered')
+            return None
+        if singer_profile.id == -1:
+            metrics.fail('empty profile')
+            return False
+        with metrics.measure('save'):
+            singer_profile.save_to_local()
+        with metrics.measure('image'):
+            singer_profile.save_picture()
+    return True
 
-if __name__  == '__main__':
-    
-    # Configure Chrome browser options for headless scraping
-    chrome_options = webdriver.ChromeOptions()
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920x1080")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36"
-    )
+def crawl_singer_paced(
+    id: int,
+    song_num: int,
+    driver: webdriver.Chrome,
+    capture: ResponseCapture,
+    limiter: AdaptiveRateLimiter,
+    regions: frozenset[str] | None = None,
+    attempts: int = SINGER_ATTEMPTS
+) -> bool | None:
+    """
+    Runs `crawl_singer` within a slot of the shared rate limiter and
+    reports how the kuwo API responded. A singer that fails is tried
+    again, each attempt taking a new slot.
+
+    Args:
+        id (int): Target id of the singer.
+        song_num (int): Maximum number of songs to keep.
+        driver (webdriver.Chrome): Chrome driver of the worker.
+        capture (ResponseCapture): Response capture attached to `driver`.
+        limiter (AdaptiveRateLimiter): Limiter shared by all workers,
+                                       or a proxy to it.
+        regions (frozenset[str] | None): Only keep singers from these regions.
+        attempts (int): Attempts before the singer is given up.
+
+    Returns:
+        bool | None: Same as `crawl_singer`, for the last attempt.
+    """
+    saved = False
+    for attempt in range(attempts):
+        if attempt:
+            metrics.count('retries')
+        with metrics.measure('throttle'):
+            limiter.acquire()
+        saved = False
+        try:
+            saved = crawl_singer(id, song_num, driver, capture, regions)
+        finally:
+            outcome = OK
+            if saved is False:
+                # An answered but unusable singer is treated like an empty
+                # payload, a missing or failed answer by its status
+                outcome = classify_status(capture.status('artist_info', id))
+                if outcome == OK:
+                    outcome = EMPTY
+                metrics.count(f'outcome_{outcome}')
+            limiter.release(outcome)
+        if saved is not False:
+            break
+    return saved
+
+def detail_worker(
+    singers: queue.Queue,
+    failed: list[tuple[int, str, int]],
+    driver: webdriver.Chrome,
+    capture: ResponseCapture,
+    limiter: AdaptiveRateLimiter
+):
+    """
+    Takes singers off the shared queue until it is empty.
+
+    Args:
+        singers (queue.Queue): (id, name, page) tuples still to crawl.
+        failed (list[tuple[int, str, int]]): Receives singers that failed.
+        driver (webdriver.Chrome): Chrome driver owned by this worker.
+        capture (ResponseCapture): Response capture attached to `driver`.
+        limiter (AdaptiveRateLimiter): Limiter shared by all workers.
+    """
+    while True:
+        try:
+            id, name, page = singers.get_nowait()
+        except queue.Empty:
+            return
+        song_num = POPULAR_SINGER_NUM if page == 1 else NORMAL_SINGER_NUM
+        if crawl_singer_paced(id, song_num, driver, capture, limiter) is False:
+            failed.append((id, name, page))
+
+def start_crawler(
+    start_page: int = 1,
+    start_place: int = 0,
+    workers: int = WORKERS
+) -> list[tuple[int, str, int]]:
     
-    # Initialize WebDriver and navigate to the singers page
-    driver = webdriver.Chrome()
-    driver.get("https://www.kuwo.cn/singers")
-    time.sleep(1)
+    """
+    Initiates the web crawling process. The singers listing is read
+    first, then the singers' details are fetched by a pool of
+    workers, each with its own browser.
+
+    Args:
+        start_page (int): The page number to begin crawling from (1-based).
+        start_place (int): The position of the singer on the starting page
+                           to begin crawling from (0-based).
+        workers (int): Number of browsers fetching singer details.
+
+    Returns:
+        list[tuple[int, str, int]]: (id, name, page) of the singers
+                                    that could not be saved.
+    """
+    driver = create_driver(SINGER_PROFILE)
+    capture = ResponseCapture(driver, metrics = metrics)
+    try:
+        driver.get("https://www.kuwo.cn/singers")
+        singers = collect_singers(start_page, driver, capture)
+    finally:
+        driver.quit()
+
+    # Skip the singers before the starting place of the first page
+    first_page_size = sum(1 for singer in singers if singer[2] == start_page)
+    singers = singers[min(start_place, first_page_size):]
+    metrics.count('listed', len(singers))
+
+    pending = queue.Queue()
+    for singer in singers:
+        pending.put(singer)
+    failed: list[tuple[int, str, int]] = []
+
+    # Workers share one limiter that adapts to how kuwo responds
+    limiter = AdaptiveRateLimiter(concurrency = 2, max_concurrency = workers)
+    drivers = [create_driver(SINGER_PROFILE) for _ in range(workers)]
+    try:
+        threads = [
+            threading.Thread(
+                target = detail_worker,
+                args = (
+                    pending, failed, drivers[i],
+                    ResponseCapture(drivers[i], metrics = metrics), limiter
+                )
+            )
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        print(limiter.state())
+        for worker_driver in drivers:
+            worker_driver.quit()
+    return failed
+
+if __name__  == '__main__':
     
     start_page = int(input())
     start_place = int(input())
-    start_crawler(start_page, start_place)
-    driver.quit()
\ No newline at end of file
+    
+    # Export item traces and print a live summary while crawling
+    metrics.export_jsonl()
+    metrics.start_reporter()
+    if METRICS_PORT is not None:
+        metrics.serve_prometheus(METRICS_PORT)
+    try:
+        failed = start_crawler(start_page, start_place)
+        for id, name, page in failed:
+            print(f"Failed: id = {id}, name = {name}, page = {page}")
+    finally:
+        print(metrics.report())
+        metrics.close()
\ No newline at end of file
@@ -1,122 +1,144 @@
-import json
 from Song import SongProfile, CommentProfile
+from response_capture import ResponseCapture
+from crawler_browser import create_driver, SONG_PROFILE
+from crawl_metrics import CrawlMetrics
+from record_io import BatchWriter
+from record_store import get_store
+from rate_limiter import AdaptiveRateLimiter, classify_status
+from rate_limiter import OK, EMPTY, TIMEOUT
 from seleniumwire import webdriver
 import selenium.common.exceptions as exceptions
 import time
-import gzip
-import io
-import random
-import os
+import queue
 import threading
 
+# Maximum number of seconds to wait for the lyric and comment responses
+RESPONSE_TIMEOUT = 10
+
+# Page loads per song before it is given up
+SONG_ATTEMPTS = 3
+
+# Set to a port to expose /metrics on localhost while crawling
+METRICS_PORT: int | None = None
+
+# Shared spans, counters and throughput of the crawl
+metrics = CrawlMetrics()
+
 def filter_lyric(
     id: int,
-    requests: webdriver.Chrome.requests
+    capture: ResponseCapture
 ) -> str:
     """
-    Filter lyric from requests.
+    Filter lyric from captured responses.
 
     Args:
         id (int): kuwo_id of the song.
-        requests (webdriver.Chrome.requests): Requests from
-            certain url.
+        capture (ResponseCapture): Responses captured while
+            loading the song's page.
             
     Returns:
         A string of lyric.
     """
     
-    
-    # Define API endpoints for detailed song information
-    lyric_substring = f'getlyric?musicId={id}' 
-    
     # Extract lyric from music API response
     lyric: str = ''
     try:
-        for request in requests:
-            if lyric_substring in request.url:
-                lyric_with_time = json.loads(
-                    request.response.body
-                )['data']['lrclist']
-                
-                # Form a whole sentence with \n
-                for line in lyric_with_time:
-                    lyric += f'{line['lineLyric']}\n'
+        data = capture.get('lyric', id)
+        if data is not None:
+            lyric_with_time = data['data']['lrclist']
+            
+            # Form a whole sentence with \n
+            for line in lyric_with_time:
+                lyric += f'{line['lineLyric']}\n'
         return lyric
         
     except (KeyError, TypeError):
+        metrics.fail('lyric')
         print(f'id = {id} failed!')
                     
 def filter_comments(
     id: int,
-    requests: webdriver.Chrome.requests
+    capture: ResponseCapture
 ) -> list[CommentProfile]:
     """
-    Filter comments from requests.
+    Filter comments from captured responses.
 
     Args:
         id (int): kuwo_id of the song.
-        requests (webdriver.Chrome.requests): Requests from
-            certain url.
+        capture (ResponseCapture): Responses captured while
+            loading the song's page.
             
     Returns:
         A list of profiles of comments
     """
-    # Define API endpoints for detailed song information
-    comment_substring = 'type=get_rec_comment'
-    
     comment_list: list[CommentProfile] = []
     
     try:
-        for request in requests:
-            if comment_substring in request.url:
-                with gzip.open(
-                    io.BytesIO(request.response.body), 'rb'
-                ) as f:
-                    # Find comments
-                    decompressed_data = f.read().decode('utf-8')
-                    datalist = json.loads(decompressed_data)['rows']
-                    
-                    # Form CommentProfile
-                    for comment in datalist:
-                        filtered_data = dict()
-                        filtered_data['content'] = comment['msg']
-                        filtered_data['username'] = comment['u_name']
-                        filtered_data['time'] = comment['time']
-                        comment_list.append(
-                            CommentProfile(**filtered_data)
-                        )
+        data = capture.get('comment', id)
+        if data is not None:
+            # Form CommentProfile
+            for comment in data['rows']:
+                filtered_data = dict()
+                filtered_data['content'] = comment['msg']
+                filtered_data['username'] = comment['u_name']
+                filtered_data['time'] = comment['time']
+                comment_list.append(
+                    CommentProfile(**filtered_data)
+                )
         return comment_list
     except (KeyError, TypeError):
-        print(f'id = {id} failed!')                
+        metrics.fail('comments')
+        print(f'id = {id} failed!')
     
 
 def get_song_lyric_and_comment(
     id: int,
-    driver: webdriver.Chrome
-) -> webdriver.Chrome.requests:
+    driver: webdriver.Chrome,
+    capture: ResponseCapture
+) -> str:
     """
-    Scrape song's lyric and comments from target id.
+    Load the song's page and wait until its lyric and comments
+    are captured.
 
     Args:
         id (int): kuwo_id of the song.
         driver (webdriver.Chrome): Chrome driver to mimic real
                                    human.
+        capture (ResponseCapture): Response capture attached to `driver`.
     
     Returns:
-        webdriver.Chrome.requests from certain url.
+        The outcome for the rate limiter: OK, TIMEOUT when the page or
+        the lyric did not load, THROTTLED on 429/5xx responses and
+        EMPTY when the lyric came back without lines.
     """
-    if hasattr(driver, 'requests'):
-        del driver.requests
+    capture.clear()
     
     try:
-        driver.get(f"https://www.kuwo.cn/play_detail/{id}")
+        with metrics.measure('navigate'):
+            driver.get(f"https://www.kuwo.cn/play_detail/{id}")
     except exceptions.WebDriverException:
+        metrics.fail('navigate')
         print(f'id = {id} failed!')
-        return None
+        return TIMEOUT
+    
+    # Return as soon as both responses have landed
+    with metrics.measure('wait'):
+        deadline = time.monotonic() + RESPONSE_TIMEOUT
+        for kind in ('lyric', 'comment'):
+            capture.wait_for(
+                kind, id, max(0.0, deadline - time.monotonic())
+            )
+    
+    outcome = classify_status(capture.status('lyric', id))
+    if outcome != OK:
+        return outcome
     
-    # Wait for some time
-    time.sleep(random.uniform(0.5, 1.0))
-    return driver.requests
+    # An empty lyric is how throttling usually shows up on this API
+    data = capture.get('lyric', id)
+    lyric_data = data.get('data') if isinstance(data, dict) else None
+    if not isinstance(lyric_data, dict) or not lyric_data.get('lrclist'):
+        return EMPTY
+    return OK
 
 def read_song_profile(id: int) -> SongProfile:
     """
@@ -128,11 +150,14 @@ def read_song_profile(id: int) -> SongProfile:
     Returns:
         SongProfile: A SongProfile
     """
-    with open(f'./Song/{id}/data.json', 'r', encoding = 'utf-8') as f:
-        data = json.loads(f.read())
-        return SongProfile(**data)
+    return SongProfile.from_dict(get_store('song').load(id))
     
-def complete_song(id: int, driver: webdriver.Chrome):
+def complete_song(
+    id: int,
+    driver: webdriver.Chrome,
+    capture: ResponseCapture,
+    writer: BatchWriter | None = None
+) -> str:
     """
     Complete song's profile
 
@@ -140,55 +165,106 @@ def complete_song(id: int, driver: webdriver.Chrome):
         id (int): ID of the song
         driver (webdriver.Chrome): Chrome driver to mimic real
                                    human.
+        capture (ResponseCapture): Response capture attached to `driver`.
+        writer (BatchWriter | None): Batch writer shared by the workers,
+                                     the profile is synced at once if None.
+    
+    Returns:
+        The outcome of loading the song's page for the rate limiter.
     """
-    song_profile = read_song_profile(id)
-    requests = get_song_lyric_and_comment(id, driver)
-    song_profile.comments = filter_comments(id, requests)
-    song_profile.lyrics = filter_lyric(id, requests)
-    song_profile.save_to_local()
-    print(f'Song {id} successfully saved')
+    with metrics.item('song', id):
+        song_profile = read_song_profile(id)
+        outcome = get_song_lyric_and_comment(id, driver, capture)
+        song_profile.comments = filter_comments(id, capture)
+        song_profile.lyrics = filter_lyric(id, capture)
+        with metrics.measure('save'):
+            song_profile.save_to_local(writer = writer)
+    return outcome
+
+def song_worker(
+    song_ids: queue.Queue,
+    limiter: AdaptiveRateLimiter,
+    writer: BatchWriter,
+    driver: webdriver.Chrome,
+    capture: ResponseCapture
+):
+    """
+    Completes songs from the shared queue until it is empty, pacing
+    every page load through the shared rate limiter. A song whose page
+    did not load properly is tried again, up to SONG_ATTEMPTS times.
+
+    Args:
+        song_ids (queue.Queue): IDs of the songs still to complete.
+        limiter (AdaptiveRateLimiter): Limiter shared by all workers.
+        writer (BatchWriter): Batch writer shared by all workers.
+        driver (webdriver.Chrome): Chrome driver owned by this worker.
+        capture (ResponseCapture): Response capture attached to `driver`.
+    """
+    while True:
+        try:
+            id = song_ids.get_nowait()
+        except queue.Empty:
+            return
+        for attempt in range(SONG_ATTEMPTS):
+            if attempt:
+                metrics.count('retries')
+            with metrics.measure('throttle'):
+                limiter.acquire()
+            outcome = TIMEOUT
+            try:
+                outcome = complete_song(id, driver, capture, writer)
+            finally:
+                limiter.release(outcome)
+            if outcome == OK:
+                break
+            metrics.count(f'outcome_{outcome}')
                     
 if __name__ == '__main__':
-    # Configure Chrome browser options for headless scraping
-    chrome_options = webdriver.ChromeOptions()
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920x1080")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36"
-    )
-    
     MAX_THREADS = 5
     
-    threads = []
+    # Pace page loads adaptively instead of sleeping between batches
+    limiter = AdaptiveRateLimiter(
+        rate = 1.0, concurrency = 2, max_concurrency = MAX_THREADS
+    )
+    
+    # Profiles are synced to disk in batches
+    writer = BatchWriter(batch_size = 50)
     
     # Initialize WebDriver
     drivers = []
+    captures = []
     for i in range(MAX_THREADS):
-        drivers.append(webdriver.Chrome())
-    
-    song_ids_to_process = []
-    for item_name in os.listdir('./Song'):
-        song_ids_to_process.append(int(item_name))
-    
-    for i in range(0, len(song_ids_to_process), MAX_THREADS):
-        batch_ids = song_ids_to_process[i:i + MAX_THREADS]
-        current_batch_threads = []
-        for j, song_id in enumerate(batch_ids):
-            thread = threading.Thread(target=complete_song, args=(song_id, drivers[j]))
-            threads.append(thread)
-            current_batch_threads.append(thread)
+        drivers.append(create_driver(SONG_PROFILE))
+        captures.append(ResponseCapture(drivers[i], metrics = metrics))
+    
+    # Export item traces and print a live summary while crawling
+    metrics.export_jsonl()
+    metrics.start_reporter()
+    if METRICS_PORT is not None:
+        metrics.serve_prometheus(METRICS_PORT)
+    
+    song_ids_to_process = queue.Queue()
+    for song_id in get_store('song').ids():
+        song_ids_to_process.put(song_id)
+    
+    threads = [
+        threading.Thread(
+            target = song_worker,
+            args = (
+                song_ids_to_process, limiter, writer, drivers[i], captures[i]
+            )
+        )
+        for i in range(MAX_THREADS)
+    ]
+    try:
+        for thread in threads:
             thread.start()
-        
-        for thread in current_batch_threads:
+        for thread in threads:
             thread.join()
-        
-        print(f"Batch {int(i/MAX_THREADS + 1)} completed")
-        time.sleep(random.uniform(2, 3))
-    
-    for i in range(MAX_THREADS):
-        drivers[i].quit()
-    
\ No newline at end of file
+    finally:
+        writer.flush()
+        print(limiter.state())
+        print(metrics.report())
+        metrics.close()
+        for i in range(MAX_THREADS):
+            drivers[i].quit()
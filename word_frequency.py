@@ -0,0 +1,267 @@
+from collections import Counter
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from segmentation import TokenCache, segment_many, text_hash
+
+# Define the default location of the word frequency database
+cache_path = './Cache/word_frequency.sqlite3'
+
+def get_stopwords(file_path: str = 'stopwords.txt') -> frozenset[str]:
+    """
+    Loads the set of stopwords.
+
+    Args:
+        file_path (str): Path of the stopwords file, one word per line.
+
+    Returns:
+        frozenset[str]: The stopwords.
+    """
+    with open(file_path, 'r', encoding = 'utf-8') as f:
+        return frozenset(line.strip() for line in f)
+
+def preprocess_lyrics(lyrics: str) -> str:
+    """
+    Removes lines with colons (credits such as 词：/曲：) and keeps
+    only Chinese characters of the remaining lines.
+
+    Args:
+        lyrics (str): Raw lyrics of a song.
+
+    Returns:
+        str: Chinese characters of the lyrics, ready for segmentation.
+    """
+    cleaned_lines = [
+        line for line in (lyrics or '').split('\n')
+        if ':' not in line and '：' not in line
+    ]
+    return re.sub(r'[^一-龥]', '', '\n'.join(cleaned_lines))
+
+def count_words(tokens: list[str], stopwords: frozenset[str]) -> Counter:
+    """
+    Counts the tokens of one song that are not stopwords.
+
+    Args:
+        tokens (list[str]): Token stream of the song.
+        stopwords (frozenset[str]): Words to leave out.
+
+    Returns:
+        Counter: Word frequencies of the song (a shard).
+    """
+    shard = Counter()
+    for token in tokens:
+        word = token.strip()
+        if word and word not in stopwords:
+            shard[word] += 1
+    return shard
+
+def merge_shards(shards) -> Counter:
+    """
+    Merges per-song shards into one frequency table.
+
+    Args:
+        shards (Iterable[Counter]): Shards to merge.
+
+    Returns:
+        Counter: The summed frequencies.
+    """
+    total = Counter()
+    for shard in shards:
+        total.update(shard)
+    return total
+
+def compute_shards(
+    songs: dict[int, str],
+    stopwords: frozenset[str],
+    workers: int | None = None,
+    cache: TokenCache | None = None
+) -> dict[int, Counter]:
+    """
+    Computes word frequency shards of songs without any persistence.
+
+    Segmentation goes through the shared token cache, so its process
+    pool only ever sees lyrics that were never segmented before.
+
+    Args:
+        songs (dict[int, str]): Lyrics keyed by song id.
+        stopwords (frozenset[str]): Words to leave out.
+        workers (int | None): Worker processes used for segmentation.
+        cache (TokenCache | None): Token cache to use, defaults to the
+                                   process-wide one.
+
+    Returns:
+        dict[int, Counter]: Shards keyed by song id.
+    """
+    song_ids = list(songs.keys())
+    texts = [preprocess_lyrics(songs[song_id]) for song_id in song_ids]
+    token_streams = segment_many(texts, workers = workers, cache = cache)
+    return {
+        song_id: count_words(tokens, stopwords)
+        for song_id, tokens in zip(song_ids, token_streams)
+    }
+
+class FrequencyStore:
+    """
+    SQLite-backed per-song word frequency shards and their global sum.
+
+    The global table is maintained incrementally: updating a song
+    subtracts its old shard and adds the new one, so a crawl of a few
+    new songs never touches the shards of the rest of the corpus.
+
+    Attributes:
+        path (str): Location of the SQLite database file.
+        stopwords (frozenset[str]): Words left out of every shard.
+        token_cache (TokenCache | None): Token cache used to segment
+                                         lyrics, the process-wide one
+                                         by default.
+    """
+    def __init__(
+        self,
+        path: str = cache_path,
+        stopwords: frozenset[str] | None = None,
+        token_cache: TokenCache | None = None
+    ):
+        self.path = path
+        self.token_cache = token_cache
+        self.stopwords = (
+            stopwords if stopwords is not None else get_stopwords()
+        )
+        # Shards counted with another stopword list are stale
+        self._stopwords_hash = hashlib.sha1(
+            '\n'.join(sorted(self.stopwords)).encode('utf-8')
+        ).hexdigest()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+        self._conn = sqlite3.connect(path)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS shards ('
+                'song_id INTEGER PRIMARY KEY, lyric_hash TEXT NOT NULL, '
+                'stopwords_hash TEXT NOT NULL, counts TEXT NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS totals ('
+                'word TEXT PRIMARY KEY, count INTEGER NOT NULL)'
+            )
+
+    def update(
+        self,
+        songs: dict[int, str],
+        prune: bool = False,
+        workers: int | None = None
+    ) -> int:
+        """
+        Brings shards and the global table up to date with `songs`.
+
+        Args:
+            songs (dict[int, str]): Lyrics keyed by song id.
+            prune (bool): Also drop shards of songs missing from `songs`.
+            workers (int | None): Worker processes used for segmentation.
+
+        Returns:
+            int: Number of shards that were added, replaced or dropped.
+        """
+        known = {
+            song_id: (lyric_hash, stopwords_hash)
+            for song_id, lyric_hash, stopwords_hash in self._conn.execute(
+                'SELECT song_id, lyric_hash, stopwords_hash FROM shards'
+            )
+        }
+
+        hashes = {
+            song_id: text_hash(lyrics or '')
+            for song_id, lyrics in songs.items()
+        }
+        changed = {
+            song_id: songs[song_id]
+            for song_id, lyric_hash in hashes.items()
+            if known.get(song_id) != (lyric_hash, self._stopwords_hash)
+        }
+        removed = (
+            [song_id for song_id in known if song_id not in songs]
+            if prune else []
+        )
+        if not changed and not removed:
+            return 0
+
+        new_shards = compute_shards(
+            changed, self.stopwords, workers, self.token_cache
+        )
+
+        # Apply the difference between old and new shards to the totals
+        delta = merge_shards(new_shards.values())
+        delta.subtract(merge_shards(
+            self._load_shards(list(changed.keys()) + removed).values()
+        ))
+
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO shards VALUES (?, ?, ?, ?)',
+                [
+                    (
+                        song_id, hashes[song_id], self._stopwords_hash,
+                        json.dumps(shard, ensure_ascii = False)
+                    )
+                    for song_id, shard in new_shards.items()
+                ]
+            )
+            self._conn.executemany(
+                'DELETE FROM shards WHERE song_id = ?',
+                [(song_id,) for song_id in removed]
+            )
+            self._conn.executemany(
+                'INSERT INTO totals (word, count) VALUES (?, ?) '
+                'ON CONFLICT(word) DO UPDATE '
+                'SET count = count + excluded.count',
+                [(word, count) for word, count in delta.items() if count]
+            )
+            self._conn.execute('DELETE FROM totals WHERE count <= 0')
+        return len(changed) + len(removed)
+
+    def _load_shards(self, song_ids: list[int]) -> dict[int, Counter]:
+        """Reads stored shards of the given songs."""
+        shards: dict[int, Counter] = {}
+        for i in range(0, len(song_ids), 500):
+            chunk = song_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._conn.execute(
+                f'SELECT song_id, counts FROM shards '
+                f'WHERE song_id IN ({placeholders})',
+                chunk
+            )
+            for song_id, counts in rows:
+                shards[song_id] = Counter(json.loads(counts))
+        return shards
+
+    def song_counts(self, song_id: int) -> Counter:
+        """Returns the stored shard of one song."""
+        return self._load_shards([song_id]).get(song_id, Counter())
+
+    def most_common(self, n: int | None = None) -> list[tuple[str, int]]:
+        """
+        Reads the top of the global frequency table.
+
+        Args:
+            n (int | None): Number of words, all words if None.
+
+        Returns:
+            list[tuple[str, int]]: (word, count) pairs, most frequent first.
+        """
+        query = 'SELECT word, count FROM totals ORDER BY count DESC, word'
+        if n is None:
+            return list(self._conn.execute(query))
+        return list(self._conn.execute(query + ' LIMIT ?', (n,)))
+
+    def close(self):
+        """Closes the underlying database connection."""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()